@@ -5,14 +5,17 @@ from alembic import context
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
-from backend.configurations.config import Base
+from backend.configurations.config import Base, DATABASE_URL
 from backend.core.entities import (
+    StoredImage,
     User,
     Room,
     InventoryCategory,
     InventoryItem,
     Log,
-    Consumable
+    Consumable,
+    ConsumableMovement,
+    ConsumableSnapshot
 )
 
 config = context.config
@@ -22,6 +25,16 @@ if config.config_file_name is not None:
 
 target_metadata = Base.metadata
 
+if not config.get_main_option("sqlalchemy.url"):
+    config.set_main_option("sqlalchemy.url", DATABASE_URL.replace("%", "%%"))
+
+def include_object(obj, name, type_, reflected, compare_to):
+    # Индексы только для PostgreSQL (ddl_if) при autogenerate на других СУБД не сравниваем
+    ddl_if = getattr(obj, "_ddl_if", None)
+    if type_ == "index" and ddl_if is not None and ddl_if.dialect:
+        return context.get_context().dialect.name == ddl_if.dialect
+    return True
+
 def run_migrations_offline():
     """Run migrations in 'offline' mode."""
     url = config.get_main_option("sqlalchemy.url")
@@ -32,6 +45,7 @@ def run_migrations_offline():
         dialect_opts={"paramstyle": "named"},
         compare_type=True,
         compare_server_default=True,
+        include_object=include_object,
     )
 
     with context.begin_transaction():
@@ -39,23 +53,30 @@ def run_migrations_offline():
 
 def run_migrations_online():
     """Run migrations in 'online' mode."""
-    connectable = config.attributes.get("connection", None)
+    # Соединение передает backend/configurations/migrations.py при старте приложения
+    connection = config.attributes.get("connection", None)
+    if connection is not None:
+        _run_migrations(connection)
+        return
 
-    if connectable is None:
-        from sqlalchemy import create_engine
-        url = config.get_main_option("sqlalchemy.url")
-        connectable = create_engine(url)
+    from sqlalchemy import create_engine
+    url = config.get_main_option("sqlalchemy.url")
+    connectable = create_engine(url)
 
     with connectable.connect() as connection:
-        context.configure(
-            connection=connection,
-            target_metadata=target_metadata,
-            compare_type=True,
-            compare_server_default=True,
-        )
-
-        with context.begin_transaction():
-            context.run_migrations()
+        _run_migrations(connection)
+
+def _run_migrations(connection):
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        compare_type=True,
+        compare_server_default=True,
+        include_object=include_object,
+    )
+
+    with context.begin_transaction():
+        context.run_migrations()
 
 if context.is_offline_mode():
     run_migrations_offline()
@@ -0,0 +1,137 @@
+"""initial schema
+
+Revision ID: 0001_initial
+Revises:
+Create Date: 2026-10-18 10:00:00
+
+Таблицы в том виде, в каком их создавал Base.metadata.create_all до появления миграций.
+Существующую базу, созданную create_all, не пересоздаем, а отмечаем:
+    alembic stamp 0001_initial && alembic upgrade head
+(при старте приложения это делает backend/configurations/migrations.py)
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001_initial'
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'images',
+        sa.Column('key', sa.String(64), primary_key=True),
+        sa.Column('media_type', sa.String(50), nullable=False),
+        sa.Column('size', sa.Integer(), nullable=False),
+        sa.Column('thumbnail_key', sa.String(64), nullable=True),
+        sa.Column('thumbnail_media_type', sa.String(50), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+    )
+    op.create_table(
+        'users',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('username', sa.String(50), nullable=False, unique=True),
+        sa.Column('password_hash', sa.String(260), nullable=False),
+        sa.Column('email', sa.String(50), nullable=False, unique=True),
+        sa.Column('full_name', sa.String(100), nullable=False),
+        sa.Column('phone_number', sa.String(11), nullable=False),
+        sa.Column('registered_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('deleted_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('is_admin', sa.Boolean(), nullable=False),
+        sa.Column('is_active', sa.Boolean(), nullable=False),
+        sa.Column('avatar_key', sa.String(64), sa.ForeignKey('images.key'), nullable=True),
+        sa.Column('avatar', sa.LargeBinary(), nullable=True),
+    )
+    op.create_table(
+        'rooms',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('name', sa.String(50), nullable=False, unique=True),
+        sa.Column('description', sa.String(200), nullable=True),
+    )
+    op.create_table(
+        'inventory_category',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('name', sa.String(50), nullable=False, unique=True),
+        sa.Column('short_name', sa.String(10), nullable=False, unique=True),
+        sa.Column('description', sa.String(), nullable=True),
+    )
+    op.create_table(
+        'inventory_items',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('inventory_number', sa.String(50), nullable=False, unique=True),
+        sa.Column('name', sa.String(100), nullable=False),
+        sa.Column('description', sa.String(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('condition', sa.Enum('NORMAL', 'REQUIRES_REPAIR', 'WRITTEN_OFF', name='inventorycondition'),
+                  nullable=False),
+        sa.Column('category_id', sa.Integer(), sa.ForeignKey('inventory_category.id'), nullable=False),
+        sa.Column('room_id', sa.Integer(), sa.ForeignKey('rooms.id'), nullable=True),
+        sa.Column('user_id', sa.Integer(), sa.ForeignKey('users.id'), nullable=True),
+        sa.Column('photo_key', sa.String(64), sa.ForeignKey('images.key'), nullable=True),
+        sa.Column('photo', sa.LargeBinary(), nullable=True),
+        sa.Column('purchase_date', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('purchase_price', sa.DECIMAL(10, 2), nullable=True),
+        sa.Column('warranty_until', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('is_written_off', sa.Boolean(), nullable=False),
+    )
+    op.create_table(
+        'consumables',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('name', sa.String(100), nullable=False),
+        sa.Column('description', sa.String(), nullable=True),
+        sa.Column('quantity', sa.Integer(), nullable=False),
+        sa.Column('min_quantity', sa.Integer(), nullable=False),
+        sa.Column('unit', sa.String(20), nullable=False),
+    )
+    op.create_table(
+        'consumable_movements',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('consumable_id', sa.Integer(), sa.ForeignKey('consumables.id', ondelete='CASCADE'),
+                  nullable=False),
+        sa.Column('delta', sa.Integer(), nullable=False),
+        sa.Column('quantity_after', sa.Integer(), nullable=False),
+        sa.Column('reason', sa.String(20), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('user_id', sa.Integer(), sa.ForeignKey('users.id'), nullable=True),
+    )
+    op.create_index('ix_consumable_movements_consumable_created', 'consumable_movements',
+                    ['consumable_id', 'created_at'])
+    op.create_table(
+        'consumable_snapshots',
+        sa.Column('consumable_id', sa.Integer(), sa.ForeignKey('consumables.id', ondelete='CASCADE'),
+                  primary_key=True),
+        sa.Column('taken_at', sa.DateTime(timezone=True), primary_key=True),
+        sa.Column('quantity', sa.Integer(), nullable=False),
+        sa.Column('last_movement_id', sa.Integer(), nullable=True),
+    )
+    op.create_table(
+        'logs',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('description', sa.String(), nullable=False),
+        sa.Column('type', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('related_entity_link', sa.String(), nullable=True),
+        sa.Column('user_id', sa.Integer(), sa.ForeignKey('users.id'), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('logs')
+    op.drop_table('consumable_snapshots')
+    op.drop_index('ix_consumable_movements_consumable_created', table_name='consumable_movements')
+    op.drop_table('consumable_movements')
+    op.drop_table('consumables')
+    op.drop_table('inventory_items')
+    op.drop_table('inventory_category')
+    op.drop_table('rooms')
+    op.drop_table('users')
+    op.drop_table('images')
+    sa.Enum(name='inventorycondition').drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,72 @@
+"""indexes for hot lookup columns
+
+Revision ID: 0002_lookup_indexes
+Revises: 0001_initial
+Create Date: 2026-10-18 10:30:00
+
+Индексы создаются вне транзакции (в PostgreSQL — CREATE INDEX CONCURRENTLY),
+чтобы не блокировать запись в большие таблицы logs и inventory_items.
+IF NOT EXISTS — часть индексов могла уже создать create_all
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002_lookup_indexes'
+down_revision: Union[str, Sequence[str], None] = '0001_initial'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Должно совпадать с backend.core.entities.item_search_document()
+ITEM_SEARCH_DOCUMENT = (
+    "to_tsvector('simple'::regconfig, coalesce(inventory_number, '') || ' ' || "
+    "coalesce(name, '') || ' ' || coalesce(description, ''))"
+)
+
+# (имя, таблица, колонки, параметры)
+INDEXES = (
+    ('ix_inventory_items_category_id', 'inventory_items', ['category_id'], {}),
+    ('ix_inventory_items_room_id', 'inventory_items', ['room_id'], {}),
+    ('ix_inventory_items_user_id', 'inventory_items', ['user_id'], {}),
+    ('ix_inventory_items_condition', 'inventory_items', ['condition'], {}),
+    ('ix_logs_created_at_id', 'logs', ['created_at', 'id'], {}),
+    ('ix_logs_type_created_at', 'logs', ['type', sa.text('created_at DESC')], {}),
+    ('ix_logs_user_id_created_at', 'logs', ['user_id', sa.text('created_at DESC')], {}),
+    ('ix_consumables_low_stock', 'consumables', ['id'], {
+        'postgresql_where': sa.text('quantity <= min_quantity'),
+        'sqlite_where': sa.text('quantity <= min_quantity'),
+    }),
+)
+
+POSTGRESQL_INDEXES = (
+    ('ix_inventory_items_search', 'inventory_items', [sa.text(ITEM_SEARCH_DOCUMENT)],
+     {'postgresql_using': 'gin'}),
+    ('ix_inventory_items_number_trgm', 'inventory_items', ['inventory_number'],
+     {'postgresql_using': 'gin', 'postgresql_ops': {'inventory_number': 'gin_trgm_ops'}}),
+)
+
+
+def _indexes():
+    if op.get_bind().dialect.name == 'postgresql':
+        return INDEXES + POSTGRESQL_INDEXES
+    return INDEXES
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+
+    with op.get_context().autocommit_block():
+        for name, table, columns, options in _indexes():
+            op.create_index(name, table, columns, if_not_exists=True, postgresql_concurrently=True, **options)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in reversed(_indexes()):
+            op.drop_index(name, table_name=table, if_exists=True, postgresql_concurrently=True)
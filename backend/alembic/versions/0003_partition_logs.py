@@ -0,0 +1,116 @@
+"""monthly partitions for logs
+
+Revision ID: 0003_partition_logs
+Revises: 0002_lookup_indexes
+Create Date: 2026-10-18 11:00:00
+
+Только PostgreSQL: logs пересоздается как таблица, разбитая по месяцам created_at
+(PARTITION BY RANGE), существующие записи переносятся в месячные партиции logs_pYYYYMM.
+Первичный ключ партиционированной таблицы обязан включать ключ разбиения — (id, created_at).
+Дальше партиции создает и удаляет backend/services/log_retention.py.
+Перенос переписывает весь журнал: на большой базе выполнять в окно обслуживания
+"""
+from datetime import datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from pytz import timezone
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003_partition_logs'
+down_revision: Union[str, Sequence[str], None] = '0002_lookup_indexes'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+PARTITIONS_AHEAD = 3
+MOSCOW = timezone('Europe/Moscow')
+
+LOG_INDEXES = (
+    "CREATE INDEX ix_logs_created_at_id ON logs (created_at, id)",
+    "CREATE INDEX ix_logs_type_created_at ON logs (type, created_at DESC)",
+    "CREATE INDEX ix_logs_user_id_created_at ON logs (user_id, created_at DESC)",
+)
+LOG_INDEX_NAMES = ('ix_logs_created_at_id', 'ix_logs_type_created_at', 'ix_logs_user_id_created_at')
+LOG_COLUMNS = "id, description, type, created_at, related_entity_link, user_id"
+
+
+def _month(year: int, month: int) -> datetime:
+    year, month = year + (month - 1) // 12, (month - 1) % 12 + 1
+    return MOSCOW.localize(datetime(year, month, 1))
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+
+    for name in LOG_INDEX_NAMES:
+        op.execute(f"DROP INDEX IF EXISTS {name}")
+    op.execute("ALTER TABLE logs RENAME TO logs_unpartitioned")
+    op.execute("ALTER TABLE logs_unpartitioned RENAME CONSTRAINT logs_pkey TO logs_unpartitioned_pkey")
+
+    op.execute("""
+        CREATE TABLE logs (
+            id INTEGER NOT NULL DEFAULT nextval('logs_id_seq'),
+            description VARCHAR NOT NULL,
+            type INTEGER NOT NULL,
+            created_at TIMESTAMP WITH TIME ZONE NOT NULL,
+            related_entity_link VARCHAR,
+            user_id INTEGER REFERENCES users (id),
+            PRIMARY KEY (id, created_at)
+        ) PARTITION BY RANGE (created_at)
+    """)
+    # Последовательность id переходит к новой таблице, иначе удалится вместе со старой
+    op.execute("ALTER SEQUENCE logs_id_seq OWNED BY logs.id")
+    op.execute("CREATE TABLE logs_default PARTITION OF logs DEFAULT")
+
+    # В режиме --sql данных не видно: партиции создаются с текущего месяца,
+    # более старые записи попадут в logs_default
+    oldest = None
+    if not op.get_context().as_sql:
+        oldest = bind.execute(sa.text("SELECT min(created_at) FROM logs_unpartitioned")).scalar()
+    now = datetime.now(MOSCOW)
+    first = (oldest or now).astimezone(MOSCOW)
+    month = _month(first.year, first.month)
+    last = _month(now.year, now.month + PARTITIONS_AHEAD)
+    while month <= last:
+        upper = _month(month.year, month.month + 1)
+        op.execute(
+            f"CREATE TABLE logs_p{month:%Y%m} PARTITION OF logs "
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{upper.isoformat()}')"
+        )
+        month = upper
+
+    op.execute(f"INSERT INTO logs ({LOG_COLUMNS}) SELECT {LOG_COLUMNS} FROM logs_unpartitioned")
+    op.execute("DROP TABLE logs_unpartitioned")
+    # Индексы на родительской таблице создаются во всех партициях, включая будущие
+    for statement in LOG_INDEXES:
+        op.execute(statement)
+    op.execute("ANALYZE logs")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    op.execute("""
+        CREATE TABLE logs_plain (
+            id INTEGER NOT NULL DEFAULT nextval('logs_id_seq') PRIMARY KEY,
+            description VARCHAR NOT NULL,
+            type INTEGER NOT NULL,
+            created_at TIMESTAMP WITH TIME ZONE NOT NULL,
+            related_entity_link VARCHAR,
+            user_id INTEGER REFERENCES users (id)
+        )
+    """)
+    op.execute(f"INSERT INTO logs_plain ({LOG_COLUMNS}) SELECT {LOG_COLUMNS} FROM logs")
+    op.execute("ALTER SEQUENCE logs_id_seq OWNED BY logs_plain.id")
+    op.execute("DROP TABLE logs")
+    op.execute("ALTER TABLE logs_plain RENAME TO logs")
+    op.execute("ALTER TABLE logs RENAME CONSTRAINT logs_plain_pkey TO logs_pkey")
+    for statement in LOG_INDEXES:
+        op.execute(statement)
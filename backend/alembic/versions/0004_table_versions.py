@@ -0,0 +1,38 @@
+"""table versions for conditional GET
+
+Revision ID: 0004_table_versions
+Revises: 0003_partition_logs
+Create Date: 2026-10-18 12:30:00
+
+Строки создаются при первом изменении таблицы (backend/services/conditional.py)
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004_table_versions'
+down_revision: Union[str, Sequence[str], None] = '0003_partition_logs'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Базы, созданные create_all до миграций, отмечаются ревизией 0001_initial, а таблица уже есть
+    if sa.inspect(op.get_bind()).has_table('table_versions'):
+        return
+    op.create_table(
+        'table_versions',
+        sa.Column('table_name', sa.String(length=64), nullable=False),
+        sa.Column('version', sa.BigInteger(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint('table_name')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('table_versions')
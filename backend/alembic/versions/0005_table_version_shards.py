@@ -0,0 +1,58 @@
+"""shard table version counters
+
+Revision ID: 0005_table_version_shards
+Revises: 0004_table_versions
+Create Date: 2026-10-18 13:00:00
+
+Версия таблицы хранится в нескольких строках (table_name, shard) и равна их сумме:
+коммиты увеличивают случайную строку и не выстраиваются в очередь за блокировкой одной.
+Существующие версии становятся строкой shard = 0, поэтому суммы продолжают прежние значения
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0005_table_version_shards'
+down_revision: Union[str, Sequence[str], None] = '0004_table_versions'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Базу, созданную create_all по текущим моделям, отмечают ревизией 0001_initial — колонка уже есть
+    columns = {column['name'] for column in sa.inspect(op.get_bind()).get_columns('table_versions')}
+    if 'shard' in columns:
+        return
+    shard = sa.Column('shard', sa.Integer(), nullable=False, server_default='0')
+    if op.get_bind().dialect.name == 'postgresql':
+        op.add_column('table_versions', shard)
+        op.drop_constraint('table_versions_pkey', 'table_versions', type_='primary')
+        op.create_primary_key('table_versions_pkey', 'table_versions', ['table_name', 'shard'])
+        return
+    # SQLite меняет первичный ключ только пересозданием таблицы
+    with op.batch_alter_table('table_versions', recreate='always') as batch:
+        batch.add_column(shard)
+        batch.create_primary_key('table_versions_pkey', ['table_name', 'shard'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Суммы переносятся в строку shard = 0, чтобы версии не уменьшились
+    op.execute(
+        "UPDATE table_versions SET version = "
+        "(SELECT sum(v.version) FROM table_versions v WHERE v.table_name = table_versions.table_name) "
+        "WHERE shard = 0"
+    )
+    op.execute("DELETE FROM table_versions WHERE shard <> 0")
+    if op.get_bind().dialect.name == 'postgresql':
+        op.drop_constraint('table_versions_pkey', 'table_versions', type_='primary')
+        op.create_primary_key('table_versions_pkey', 'table_versions', ['table_name'])
+        op.drop_column('table_versions', 'shard')
+        return
+    with op.batch_alter_table('table_versions', recreate='always') as batch:
+        batch.drop_column('shard')
+        batch.create_primary_key('table_versions_pkey', ['table_name'])
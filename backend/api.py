@@ -1,12 +1,22 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 import uvicorn
 
 from backend.endpoints.init_endpoints import init_router
-from backend.endpoints.endpoints import router
-from backend.configurations.database import Base, engine
-
-Base.metadata.create_all(bind=engine)
+from backend.endpoints.endpoints import router, auth_router
+from backend.configurations.config import RUN_MIGRATIONS_ON_STARTUP
+from backend.configurations.database import dispose_async_engine
+from backend.configurations.migrations import upgrade_database
+from backend.services.audit_log import audit_log
+from backend.services.compression import CompressionMiddleware
+from backend.services.conditional import NotModified, not_modified_handler
+from backend.services.executors import auth_executor
+from backend.services.importer import import_jobs
+from backend.services.stock_snapshots import stock_snapshots
+from backend.services.log_retention import log_maintenance
+from backend.services.report_jobs import report_jobs
 
 origins = [
     "http://localhost:3000",
@@ -14,10 +24,30 @@ origins = [
     "http://localhost:1234",
 ]
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if RUN_MIGRATIONS_ON_STARTUP:
+        upgrade_database()
+    audit_log.start()
+    stock_snapshots.start()
+    log_maintenance.start()
+    report_jobs.start()
+    yield
+    report_jobs.stop()
+    log_maintenance.stop()
+    stock_snapshots.stop()
+    auth_executor.shutdown()
+    import_jobs.shutdown()
+    audit_log.stop()
+    await dispose_async_engine()
+
+
 app = FastAPI(
     title="Inventory Management System",
     description="API for managing inventory items, rooms, users and consumables",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 app.add_middleware(
@@ -27,7 +57,10 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(CompressionMiddleware)
+app.add_exception_handler(NotModified, not_modified_handler)
 
+app.include_router(auth_router, prefix="/api")
 app.include_router(router, prefix="/api")
 app.include_router(init_router)
 
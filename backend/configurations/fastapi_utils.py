@@ -0,0 +1,65 @@
+from typing import Optional
+
+from fastapi import Cookie, Depends, HTTPException, Response
+
+from backend.configurations.config import (
+    JWT_COOKIE_NAME, JWT_COOKIE_SECURE, DEFAULT_JWT_EXPIRES_SECONDS
+)
+from backend.configurations.database import async_session
+from backend.core.async_repositories import AsyncUserRepository
+from backend.services.security import create_jwt_token, validate_jwt_token_cached
+
+
+def issue_session(response: Response, user_id: int, is_admin: bool, full_name: str) -> str:
+    """
+    Выдает JWT с правами пользователя в claims и кладет его в cookie
+    """
+    token = create_jwt_token({
+        'sub': str(user_id),
+        'user_id': user_id,
+        'is_admin': is_admin,
+        'full_name': full_name
+    })
+    response.set_cookie(
+        key=JWT_COOKIE_NAME,
+        value=token,
+        max_age=DEFAULT_JWT_EXPIRES_SECONDS,
+        httponly=True,
+        secure=JWT_COOKIE_SECURE,
+        samesite='lax'
+    )
+    return token
+
+
+def clear_session(response: Response):
+    response.delete_cookie(key=JWT_COOKIE_NAME, httponly=True, secure=JWT_COOKIE_SECURE, samesite='lax')
+
+
+async def get_current_session(token: Optional[str] = Cookie(None, alias=JWT_COOKIE_NAME)) -> dict:
+    """
+    Зависимость FastAPI: проверяет JWT из cookie и возвращает его claims.
+    is_admin и активность пользователя читаются из БД (один запрос по первичному ключу):
+    снятие прав и блокировка действуют сразу, а не когда истечет токен.
+    Асинхронная, чтобы не занимать пул потоков на каждом запросе
+    """
+    if not token:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    try:
+        claims = validate_jwt_token_cached(token)
+    except ValueError as e:
+        raise HTTPException(status_code=401, detail=str(e))
+
+    async with async_session() as db:
+        user = await AsyncUserRepository(db).get_access(claims['user_id'])
+    if user is None or not user.is_active or user.deleted_at is not None:
+        raise HTTPException(status_code=401, detail="User is not active")
+    return {**claims, 'is_admin': user.is_admin}
+
+
+async def require_admin(session: dict = Depends(get_current_session)) -> dict:
+    """
+    Зависимость FastAPI: пропускает только администраторов
+    """
+    if not session.get('is_admin'):
+        raise HTTPException(status_code=403, detail="Admin privileges required")
+    return session
@@ -0,0 +1,51 @@
+"""
+Схема БД создается и обновляется только миграциями Alembic (backend/alembic).
+upgrade_database() — то же, что alembic upgrade head; вызывается при старте приложения
+(RUN_MIGRATIONS_ON_STARTUP) или при деплое:
+
+    python -m backend.configurations.migrations
+
+База, созданная раньше через Base.metadata.create_all (без таблицы alembic_version),
+сначала отмечается ревизией 0001_initial, дальше применяются остальные миграции
+"""
+import os
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
+
+from backend.configurations.database import engine
+
+SCRIPT_LOCATION = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "alembic")
+BASELINE_REVISION = "0001_initial"
+# Ключ pg_advisory_lock: воркеры uvicorn стартуют одновременно, миграции выполняет один из них
+MIGRATION_LOCK_KEY = 7_305_114_018
+
+
+def upgrade_database(db_engine: Engine = engine):
+    with db_engine.connect() as connection:
+        postgresql = connection.dialect.name == "postgresql"
+        if postgresql:
+            # Перенос журнала (0003) дольше обычного statement_timeout
+            connection.execute(text("SET statement_timeout = 0"))
+            connection.execute(text("SELECT pg_advisory_lock(:key)"), {"key": MIGRATION_LOCK_KEY})
+        tables = set(inspect(connection).get_table_names())
+        # Миграции управляют транзакциями сами (0002 создает индексы вне транзакции)
+        connection.commit()
+
+        config = Config()
+        config.set_main_option("script_location", SCRIPT_LOCATION)
+        config.attributes["connection"] = connection
+        try:
+            if "alembic_version" not in tables and "users" in tables:
+                command.stamp(config, BASELINE_REVISION)
+            command.upgrade(config, "head")
+        finally:
+            if postgresql:
+                connection.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": MIGRATION_LOCK_KEY})
+                connection.commit()
+
+
+if __name__ == "__main__":
+    upgrade_database()
@@ -0,0 +1,243 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from backend.core.entities import (
+    User, Room, InventoryCategory, InventoryItem,
+    Consumable, Log, InventoryCondition
+)
+from backend.core.item_search import (
+    decode_search_cursor, search_after, search_conditions, search_cursor_values, search_order, search_sort_keys
+)
+from backend.core.pagination import build_page, keyset, async_total_count
+from backend.core.rows import (
+    InventoryItemRow, ConsumableRow, LogRow, select_item_rows, select_consumable_rows, select_log_rows
+)
+from backend.core.schemas import InventoryItemSearch, TotalMode
+from typing import AsyncIterator, Optional, List, Tuple
+from datetime import datetime
+
+# Асинхронные версии репозиториев для горячих эндпоинтов чтения.
+# Методы повторяют синхронные из repositories.py, но выполняются на event loop
+
+
+class AsyncUserRepository:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_access(self, user_id: int):
+        """
+        Права и состояние учетной записи (is_admin, is_active, deleted_at) для проверки сессии
+        """
+        result = await self.db.execute(
+            select(User.is_admin, User.is_active, User.deleted_at).where(User.id == user_id)
+        )
+        return result.first()
+
+
+class AsyncRoomRepository:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_by_id(self, room_id: int) -> Optional[Room]:
+        return await self.db.get(Room, room_id)
+
+    async def get_all(self, skip: int = 0, limit: int = 100) -> List[Room]:
+        result = await self.db.execute(select(Room).order_by(Room.id).offset(skip).limit(limit))
+        return list(result.scalars().all())
+
+    async def get_page(self, after_id: Optional[int] = None, limit: int = 100) -> List[Room]:
+        query = keyset(select(Room), [Room.id], None if after_id is None else [after_id], limit)
+        return list((await self.db.execute(query)).scalars().all())
+
+    async def count(self, mode: TotalMode = TotalMode.EXACT) -> Tuple[Optional[int], bool]:
+        return await async_total_count(self.db, select(Room.id), mode)
+
+    async def stream(self, yield_per: int = 1000) -> AsyncIterator[Room]:
+        result = await self.db.stream_scalars(
+            select(Room).order_by(Room.id).execution_options(yield_per=yield_per)
+        )
+        async for room in result:
+            yield room
+
+class AsyncInventoryCategoryRepository:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_by_id(self, category_id: int) -> Optional[InventoryCategory]:
+        return await self.db.get(InventoryCategory, category_id)
+
+    async def get_all(self, skip: int = 0, limit: int = 100) -> List[InventoryCategory]:
+        result = await self.db.execute(select(InventoryCategory).order_by(InventoryCategory.id).offset(skip).limit(limit))
+        return list(result.scalars().all())
+
+    async def get_page(self, after_id: Optional[int] = None, limit: int = 100) -> List[InventoryCategory]:
+        query = keyset(select(InventoryCategory), [InventoryCategory.id], None if after_id is None else [after_id], limit)
+        return list((await self.db.execute(query)).scalars().all())
+
+    async def count(self, mode: TotalMode = TotalMode.EXACT) -> Tuple[Optional[int], bool]:
+        return await async_total_count(self.db, select(InventoryCategory.id), mode)
+
+    async def stream(self, yield_per: int = 1000) -> AsyncIterator[InventoryCategory]:
+        result = await self.db.stream_scalars(
+            select(InventoryCategory).order_by(InventoryCategory.id).execution_options(yield_per=yield_per)
+        )
+        async for category in result:
+            yield category
+
+class AsyncInventoryItemRepository:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def _rows(self, query) -> List[InventoryItemRow]:
+        result = await self.db.execute(query)
+        return [InventoryItemRow(*row) for row in result]
+
+    async def get_by_id_with_details(self, item_id: int) -> Optional[InventoryItemRow]:
+        rows = await self._rows(select_item_rows().where(InventoryItem.id == item_id))
+        return rows[0] if rows else None
+
+    async def get_all_with_details(self, skip: int = 0, limit: int = 100) -> List[InventoryItemRow]:
+        return await self._rows(select_item_rows().order_by(InventoryItem.id).offset(skip).limit(limit))
+
+    async def get_page_with_details(self, after_id: Optional[int] = None, limit: int = 100) -> List[InventoryItemRow]:
+        return await self._rows(
+            keyset(select_item_rows(), [InventoryItem.id], None if after_id is None else [after_id], limit)
+        )
+
+    async def search(self, search: InventoryItemSearch) -> dict:
+        """
+        Страница результатов поиска (build_page) с курсором по ключам сортировки
+        и общим числом найденных по search.total. Поврежденный курсор дает ValueError
+        """
+        dialect = self.db.bind.dialect.name
+        conditions = search_conditions(search, dialect)
+        keys = search_sort_keys(search, dialect)
+        # Ключи сортировки выбираются отдельными колонками: из них строится курсор
+        query = select_item_rows().add_columns(*(key.expression for key in keys)).where(*conditions)
+        if search.after is not None:
+            query = query.where(search_after(keys, decode_search_cursor(search, keys, search.after)))
+        result = await self.db.execute(query.order_by(*search_order(keys)).limit(search.limit + 1))
+        rows = [(InventoryItemRow(*row[:-len(keys)]), list(row[-len(keys):])) for row in result]
+
+        total, estimated = await async_total_count(self.db, select(InventoryItem.id).where(*conditions), search.total)
+        page = build_page(rows, search.limit, key=lambda row: search_cursor_values(search, row[1]),
+                          total=total, total_estimated=estimated)
+        page["items"] = [item for item, _ in page["items"]]
+        return page
+
+    @staticmethod
+    def filter_conditions(room_id: Optional[int] = None, category_id: Optional[int] = None,
+                          user_id: Optional[int] = None, condition: Optional[InventoryCondition] = None) -> list:
+        conditions = []
+        if room_id is not None:
+            conditions.append(InventoryItem.room_id == room_id)
+        if category_id is not None:
+            conditions.append(InventoryItem.category_id == category_id)
+        if user_id is not None:
+            conditions.append(InventoryItem.user_id == user_id)
+        if condition is not None:
+            conditions.append(InventoryItem.condition == condition)
+        return conditions
+
+    async def get_page_where(self, conditions: list, after_id: Optional[int] = None,
+                             limit: int = 100) -> List[InventoryItemRow]:
+        return await self._rows(keyset(
+            select_item_rows().where(*conditions),
+            [InventoryItem.id], None if after_id is None else [after_id], limit
+        ))
+
+    async def count_where(self, conditions: list, mode: TotalMode = TotalMode.EXACT) -> Tuple[Optional[int], bool]:
+        return await async_total_count(self.db, select(InventoryItem.id).where(*conditions), mode)
+
+    async def stream_with_details(self, conditions: list, yield_per: int = 1000) -> AsyncIterator[InventoryItemRow]:
+        result = await self.db.stream(
+            select_item_rows().where(*conditions)
+            .order_by(InventoryItem.id)
+            .execution_options(yield_per=yield_per)
+        )
+        async for row in result:
+            yield InventoryItemRow(*row)
+
+    async def get_by_condition(self, condition: InventoryCondition, after_id: Optional[int] = None,
+                               limit: int = 100) -> List[InventoryItemRow]:
+        return await self.get_page_where([InventoryItem.condition == condition], after_id, limit)
+
+class AsyncConsumableRepository:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_by_id(self, consumable_id: int) -> Optional[Consumable]:
+        return await self.db.get(Consumable, consumable_id)
+
+    async def _rows(self, query) -> List[ConsumableRow]:
+        result = await self.db.execute(query)
+        return [ConsumableRow(*row) for row in result]
+
+    async def get_all(self, skip: int = 0, limit: int = 100) -> List[ConsumableRow]:
+        return await self._rows(select_consumable_rows().order_by(Consumable.id).offset(skip).limit(limit))
+
+    async def get_page(self, after_id: Optional[int] = None, limit: int = 100) -> List[ConsumableRow]:
+        return await self._rows(
+            keyset(select_consumable_rows(), [Consumable.id], None if after_id is None else [after_id], limit)
+        )
+
+    async def count(self, mode: TotalMode = TotalMode.EXACT) -> Tuple[Optional[int], bool]:
+        return await async_total_count(self.db, select(Consumable.id), mode)
+
+    async def stream(self, yield_per: int = 1000) -> AsyncIterator[ConsumableRow]:
+        result = await self.db.stream(
+            select_consumable_rows().order_by(Consumable.id).execution_options(yield_per=yield_per)
+        )
+        async for row in result:
+            yield ConsumableRow(*row)
+
+    async def get_low_stock(self, after_id: Optional[int] = None, limit: int = 100) -> List[ConsumableRow]:
+        query = select_consumable_rows().where(Consumable.quantity <= Consumable.min_quantity)
+        return await self._rows(keyset(query, [Consumable.id], None if after_id is None else [after_id], limit))
+
+class AsyncLogRepository:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_by_id(self, log_id: int) -> Optional[Log]:
+        return await self.db.get(Log, log_id)
+
+    async def _rows(self, query) -> List[LogRow]:
+        result = await self.db.execute(query)
+        return [LogRow(*row) for row in result]
+
+    async def get_all(self, skip: int = 0, limit: int = 100, conditions: Optional[list] = None) -> List[LogRow]:
+        query = select_log_rows().where(*(conditions or [])).order_by(Log.created_at.desc(), Log.id.desc())
+        return await self._rows(query.offset(skip).limit(limit))
+
+    @staticmethod
+    def filter_conditions(log_type: Optional[int] = None, user_id: Optional[int] = None,
+                          date_from: Optional[datetime] = None, date_to: Optional[datetime] = None) -> list:
+        conditions = []
+        if log_type is not None:
+            conditions.append(Log.type == log_type)
+        if user_id is not None:
+            conditions.append(Log.user_id == user_id)
+        if date_from is not None:
+            conditions.append(Log.created_at >= date_from)
+        if date_to is not None:
+            conditions.append(Log.created_at < date_to)
+        return conditions
+
+    async def get_page(self, before: Optional[Tuple[datetime, int]] = None, limit: int = 100,
+                       conditions: Optional[list] = None) -> List[LogRow]:
+        return await self._rows(keyset(
+            select_log_rows().where(*(conditions or [])), [Log.created_at, Log.id], before, limit, descending=True
+        ))
+
+    async def count(self, mode: TotalMode = TotalMode.EXACT,
+                    conditions: Optional[list] = None) -> Tuple[Optional[int], bool]:
+        return await async_total_count(self.db, select(Log.id).where(*(conditions or [])), mode)
+
+    async def stream(self, conditions: Optional[list] = None, yield_per: int = 1000) -> AsyncIterator[LogRow]:
+        result = await self.db.stream(
+            select_log_rows().where(*(conditions or []))
+            .order_by(Log.created_at.desc(), Log.id.desc())
+            .execution_options(yield_per=yield_per)
+        )
+        async for row in result:
+            yield LogRow(*row)
@@ -1,5 +1,6 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, DECIMAL, Enum as SQLAlchemyEnum
-from sqlalchemy.orm import relationship
+from sqlalchemy import BigInteger, Column, Integer, String, Boolean, DateTime, ForeignKey, DECIMAL, Enum as SQLAlchemyEnum
+from sqlalchemy import DDL, Index, event, or_, text
+from sqlalchemy.orm import relationship, deferred, column_property
 from backend.configurations.config import Base
 from datetime import datetime
 from pytz import timezone
@@ -7,6 +8,31 @@ from sqlalchemy import LargeBinary
 from enum import Enum as PyEnum, Enum
 
 
+class StoredImage(Base):
+    """
+    Изображение в хранилище blob'ов (backend/services/blob_store.py).
+    Ключ — SHA-256 содержимого, поэтому одинаковые файлы хранятся один раз
+    """
+    __tablename__ = 'images'
+    key = Column(String(64), primary_key=True)
+    media_type = Column(String(50), nullable=False)
+    size = Column(Integer, nullable=False)
+    thumbnail_key = Column(String(64), nullable=True)
+    thumbnail_media_type = Column(String(50), nullable=True)
+    created_at = Column(DateTime(timezone=True), nullable=False,
+                        default=lambda: datetime.now(timezone('Europe/Moscow')))
+
+    @staticmethod
+    def create(key, media_type, size, thumbnail_key=None, thumbnail_media_type=None):
+        return StoredImage(
+            key=key,
+            media_type=media_type,
+            size=size,
+            thumbnail_key=thumbnail_key,
+            thumbnail_media_type=thumbnail_media_type
+        )
+
+
 class User(Base):
     __tablename__ = 'users'
 
@@ -21,7 +47,11 @@ class User(Base):
     deleted_at = Column(DateTime(timezone=True), nullable=True)
     is_admin = Column(Boolean, nullable=False, default=False)
     is_active = Column(Boolean, nullable=False, default=True)
-    avatar = Column(LargeBinary, nullable=True)
+    avatar_key = Column(String(64), ForeignKey('images.key'), nullable=True)
+    # Устаревшее хранение внутри таблицы, переносится в хранилище миграцией
+    # (backend/services/image_migration.py); загружается только при явном обращении
+    avatar = deferred(Column(LargeBinary, nullable=True))
+    has_avatar = column_property(or_(avatar_key.isnot(None), avatar.expression.isnot(None)))
 
     items = relationship("InventoryItem", back_populates="user")
 
@@ -74,6 +104,18 @@ class InventoryCategory(Base):
         )
 
 
+def item_search_document(table_prefix: str = "") -> str:
+    """
+    Выражение tsvector для полнотекстового поиска по предметам (PostgreSQL).
+    Запрос должен использовать то же выражение, что и GIN-индекс, иначе индекс не применится;
+    словарь simple — без стемминга, названия и номера смешивают русский, английский и цифры
+    """
+    return (
+        f"to_tsvector('simple'::regconfig, coalesce({table_prefix}inventory_number, '') || ' ' || "
+        f"coalesce({table_prefix}name, '') || ' ' || coalesce({table_prefix}description, ''))"
+    )
+
+
 class InventoryItem(Base):
     __tablename__ = 'inventory_items'
     id = Column(Integer, primary_key=True)
@@ -87,12 +129,30 @@ class InventoryItem(Base):
     category_id = Column(Integer, ForeignKey('inventory_category.id'), nullable=False)
     room_id = Column(Integer, ForeignKey('rooms.id'), nullable=True)
     user_id = Column(Integer, ForeignKey('users.id'), nullable=True)
-    photo = Column(LargeBinary, nullable=True)
+    photo_key = Column(String(64), ForeignKey('images.key'), nullable=True)
+    # Устаревшее хранение внутри таблицы, переносится в хранилище миграцией
+    # (backend/services/image_migration.py); загружается только при явном обращении
+    photo = deferred(Column(LargeBinary, nullable=True))
+    has_photo = column_property(or_(photo_key.isnot(None), photo.expression.isnot(None)))
     purchase_date = Column(DateTime(timezone=True), nullable=True)
     purchase_price = Column(DECIMAL(10, 2), nullable=True)
     warranty_until = Column(DateTime(timezone=True), nullable=True)
     is_written_off = Column(Boolean, nullable=False, default=False)
 
+    __table_args__ = (
+        # Фильтры списков и поиска; внешние ключи PostgreSQL сам не индексирует
+        Index('ix_inventory_items_category_id', 'category_id'),
+        Index('ix_inventory_items_room_id', 'room_id'),
+        Index('ix_inventory_items_user_id', 'user_id'),
+        Index('ix_inventory_items_condition', 'condition'),
+        # Поиск (backend/core/item_search.py): слова — через tsvector,
+        # части инвентарных номеров — через триграммы (ILIKE '%...%')
+        Index('ix_inventory_items_search', text(item_search_document()),
+              postgresql_using='gin').ddl_if(dialect='postgresql'),
+        Index('ix_inventory_items_number_trgm', 'inventory_number', postgresql_using='gin',
+              postgresql_ops={'inventory_number': 'gin_trgm_ops'}).ddl_if(dialect='postgresql'),
+    )
+
     category = relationship("InventoryCategory", back_populates="items")
     room = relationship("Room", back_populates="items")
     user = relationship("User", back_populates="items")
@@ -100,7 +160,7 @@ class InventoryItem(Base):
     @staticmethod
     def create(inventory_number, name, description, category_id, condition,
               room_id=None, user_id=None, photo=None, purchase_date=None,
-              purchase_price=None, warranty_until=None):
+              purchase_price=None, warranty_until=None, photo_key=None):
         return InventoryItem(
             inventory_number=inventory_number,
             name=name,
@@ -110,11 +170,20 @@ class InventoryItem(Base):
             room_id=room_id,
             user_id=user_id,
             photo=photo,
+            photo_key=photo_key,
             purchase_date=purchase_date,
             purchase_price=purchase_price,
             warranty_until=warranty_until
         )
 
+
+# gin_trgm_ops из расширения pg_trgm должен существовать до создания индекса
+event.listen(
+    InventoryItem.__table__, 'before_create',
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect='postgresql')
+)
+
+
 class Consumable(Base):
     __tablename__ = 'consumables'
     id = Column(Integer, primary_key=True)
@@ -124,6 +193,16 @@ class Consumable(Base):
     min_quantity = Column(Integer, nullable=False, default=1)
     unit = Column(String(20), nullable=False, default='шт.')
 
+    __table_args__ = (
+        # Частичный индекс содержит только строки с низким остатком:
+        # /consumables/low_stock/ читает их, не просматривая весь справочник
+        Index(
+            'ix_consumables_low_stock', 'id',
+            postgresql_where=quantity <= min_quantity,
+            sqlite_where=quantity <= min_quantity
+        ),
+    )
+
     @staticmethod
     def create(name, description=None, quantity=0, min_quantity=1, unit='шт.'):
         return Consumable(
@@ -135,6 +214,48 @@ class Consumable(Base):
         )
 
 
+class ConsumableMovement(Base):
+    """
+    Журнал движения расходников: строки только добавляются.
+    quantity_after — остаток сразу после движения
+    """
+    __tablename__ = 'consumable_movements'
+    id = Column(Integer, primary_key=True)
+    consumable_id = Column(Integer, ForeignKey('consumables.id', ondelete='CASCADE'), nullable=False)
+    delta = Column(Integer, nullable=False)
+    quantity_after = Column(Integer, nullable=False)
+    reason = Column(String(20), nullable=False)  # create, increase, decrease, adjust, correction, import
+    created_at = Column(DateTime(timezone=True), nullable=False,
+                        default=lambda: datetime.now(timezone('Europe/Moscow')))
+    user_id = Column(Integer, ForeignKey('users.id'), nullable=True)
+
+    __table_args__ = (
+        Index('ix_consumable_movements_consumable_created', 'consumable_id', 'created_at'),
+    )
+
+    @staticmethod
+    def create(consumable_id, delta, quantity_after, reason, user_id=None):
+        return ConsumableMovement(
+            consumable_id=consumable_id,
+            delta=delta,
+            quantity_after=quantity_after,
+            reason=reason,
+            user_id=user_id
+        )
+
+
+class ConsumableSnapshot(Base):
+    """
+    Остаток расходника на момент снимка. last_movement_id — последнее движение,
+    учтенное в quantity: остаток на дату = снимок + движения после него
+    """
+    __tablename__ = 'consumable_snapshots'
+    consumable_id = Column(Integer, ForeignKey('consumables.id', ondelete='CASCADE'), primary_key=True)
+    taken_at = Column(DateTime(timezone=True), primary_key=True)
+    quantity = Column(Integer, nullable=False)
+    last_movement_id = Column(Integer, nullable=True)
+
+
 class LogType(PyEnum):
     INFO = 1
     WARNING = 2
@@ -143,6 +264,8 @@ class LogType(PyEnum):
 
 
 class Log(Base):
+    # В PostgreSQL таблица разбита на месячные партиции по created_at и имеет ключ (id, created_at)
+    # (миграция 0003_partition_logs, обслуживание — backend/services/log_retention.py)
     __tablename__ = 'logs'
     id = Column(Integer, primary_key=True)
     description = Column(String, nullable=False)
@@ -152,6 +275,14 @@ class Log(Base):
     related_entity_link = Column(String, nullable=True)
     user_id = Column(Integer, ForeignKey('users.id'), nullable=True)
 
+    __table_args__ = (
+        # Лента журнала: ORDER BY created_at DESC, id DESC (курсор по той же паре)
+        Index('ix_logs_created_at_id', 'created_at', 'id'),
+        # Выборки по типу и по пользователю сразу в порядке ленты
+        Index('ix_logs_type_created_at', 'type', created_at.desc()),
+        Index('ix_logs_user_id_created_at', 'user_id', created_at.desc()),
+    )
+
     user = relationship("User")
 
     @staticmethod
@@ -161,4 +292,17 @@ class Log(Base):
             type=type,
             related_entity_link=related_entity_link,
             user_id=user_id
-        )
\ No newline at end of file
+        )
+
+class TableVersion(Base):
+    """
+    Версия таблицы для условных GET (ETag / Last-Modified, backend/services/conditional.py).
+    Счетчик разбит на несколько строк (shard): коммит увеличивает одну случайную,
+    версия таблицы — сумма по строкам, поэтому параллельные писатели не ждут одну блокировку
+    """
+    __tablename__ = 'table_versions'
+    table_name = Column(String(64), primary_key=True)
+    shard = Column(Integer, primary_key=True, default=0)
+    version = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), nullable=False,
+                        default=lambda: datetime.now(timezone('Europe/Moscow')))
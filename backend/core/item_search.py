@@ -0,0 +1,191 @@
+import re
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, List, NamedTuple
+
+from sqlalchemy import DateTime, Float, Integer, Numeric, and_, func, literal_column, or_
+
+from backend.core.entities import InventoryItem, InventoryCategory, Room, item_search_document
+from backend.core.schemas import InventoryItemSearch, ItemSortField, SortOrder
+
+MAX_SEARCH_TOKENS = 8
+
+_SORT_COLUMNS = {
+    ItemSortField.ID: InventoryItem.id,
+    ItemSortField.NAME: InventoryItem.name,
+    ItemSortField.INVENTORY_NUMBER: InventoryItem.inventory_number,
+    ItemSortField.CATEGORY_NAME: InventoryCategory.name,
+    ItemSortField.ROOM_NAME: Room.name,
+    ItemSortField.PURCHASE_DATE: InventoryItem.purchase_date,
+    ItemSortField.PURCHASE_PRICE: InventoryItem.purchase_price,
+    ItemSortField.CREATED_AT: InventoryItem.created_at,
+    ItemSortField.UPDATED_AT: InventoryItem.updated_at,
+}
+
+
+def _tokens(q: str) -> List[str]:
+    return re.findall(r"\w+", q)[:MAX_SEARCH_TOKENS]
+
+
+def _like_pattern(value: str) -> str:
+    escaped = value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def _ts_query(tokens: List[str]):
+    # Каждое слово — как префикс: "ноут hp" находит "Ноутбук HP ProBook"
+    return func.to_tsquery(literal_column("'simple'::regconfig"), " & ".join(f"{token}:*" for token in tokens))
+
+
+def _ts_document():
+    return literal_column(item_search_document(f"{InventoryItem.__tablename__}."))
+
+
+class SortKey(NamedTuple):
+    expression: Any
+    descending: bool
+    nulls_last: bool = False
+
+
+def search_text_condition(q: str, dialect: str):
+    """
+    Условие полнотекстового поиска. В PostgreSQL — tsvector по GIN-индексу
+    или вхождение в инвентарный номер по триграммному индексу; в остальных
+    СУБД каждое слово ищется через ILIKE (без индекса, для разработки;
+    SQLite не различает регистр только у латиницы)
+    """
+    tokens = _tokens(q)
+    if not tokens:
+        return None
+
+    if dialect == "postgresql":
+        return or_(
+            _ts_document().op("@@")(_ts_query(tokens)),
+            InventoryItem.inventory_number.ilike(_like_pattern(q.strip()), escape="\\")
+        )
+
+    return and_(*(
+        or_(
+            InventoryItem.inventory_number.ilike(_like_pattern(token), escape="\\"),
+            InventoryItem.name.ilike(_like_pattern(token), escape="\\"),
+            InventoryItem.description.ilike(_like_pattern(token), escape="\\"),
+        )
+        for token in tokens
+    ))
+
+
+def search_conditions(search: InventoryItemSearch, dialect: str) -> list:
+    """
+    Условия WHERE по фильтрам поиска. Затрагивают только inventory_items,
+    поэтому годятся и для выборки с join'ами, и для подсчета total
+    """
+    conditions = []
+    if search.q:
+        condition = search_text_condition(search.q, dialect)
+        if condition is not None:
+            conditions.append(condition)
+    if search.category_ids:
+        conditions.append(InventoryItem.category_id.in_(search.category_ids))
+    if search.room_ids:
+        conditions.append(InventoryItem.room_id.in_(search.room_ids))
+    if search.user_ids:
+        conditions.append(InventoryItem.user_id.in_(search.user_ids))
+    if search.conditions:
+        conditions.append(InventoryItem.condition.in_(search.conditions))
+    if search.is_written_off is not None:
+        conditions.append(InventoryItem.is_written_off == search.is_written_off)
+    if search.purchased_from is not None:
+        conditions.append(InventoryItem.purchase_date >= search.purchased_from)
+    if search.purchased_to is not None:
+        conditions.append(InventoryItem.purchase_date <= search.purchased_to)
+    if search.price_min is not None:
+        conditions.append(InventoryItem.purchase_price >= search.price_min)
+    if search.price_max is not None:
+        conditions.append(InventoryItem.purchase_price <= search.price_max)
+    return conditions
+
+
+def search_sort_keys(search: InventoryItemSearch, dialect: str) -> List[SortKey]:
+    """
+    Ключи сортировки поиска; id в конце делает порядок однозначным между страницами
+    и служит последним ключом курсора
+    """
+    descending = search.order == SortOrder.DESC
+    by_id = SortKey(InventoryItem.id, descending)
+
+    if search.sort == ItemSortField.RELEVANCE:
+        tokens = _tokens(search.q or "")
+        if dialect != "postgresql" or not tokens:
+            return [by_id]
+        # Релевантность всегда по убыванию: сначала лучшие совпадения
+        rank = func.ts_rank(_ts_document(), _ts_query(tokens), type_=Float)
+        return [SortKey(rank, True), SortKey(InventoryItem.id, False)]
+
+    if search.sort == ItemSortField.ID:
+        return [by_id]
+    return [SortKey(_SORT_COLUMNS[search.sort], descending, nulls_last=True), by_id]
+
+
+def search_order(keys: List[SortKey]) -> list:
+    order = []
+    for key in keys:
+        clause = key.expression.desc() if key.descending else key.expression.asc()
+        order.append(clause.nulls_last() if key.nulls_last else clause)
+    return order
+
+
+def search_after(keys: List[SortKey], after: list):
+    """
+    Условие «строка идет после строки с ключами after» в порядке search_order:
+    keyset для произвольной сортировки, включая колонки с NULL в конце
+    """
+    key, rest = keys[0], keys[1:]
+    value = after[0]
+    if value is None:
+        # Курсор уже в хвосте из NULL: дальше только NULL, порядок внутри — по остальным ключам
+        return and_(key.expression.is_(None), search_after(rest, after[1:]))
+    beyond = key.expression < value if key.descending else key.expression > value
+    if not rest:
+        return beyond
+    condition = or_(beyond, and_(key.expression == value, search_after(rest, after[1:])))
+    return or_(condition, key.expression.is_(None)) if key.nulls_last else condition
+
+
+def search_cursor_values(search: InventoryItemSearch, values: list) -> list:
+    """
+    Значения ключей последней строки в виде, пригодном для encode_cursor.
+    Сортировка и направление идут первыми: курсор от другой сортировки отвергается
+    """
+    return [search.sort.value, search.order.value] + [
+        value.isoformat() if isinstance(value, datetime) else str(value) if isinstance(value, Decimal) else value
+        for value in values
+    ]
+
+
+def _cursor_value(key: SortKey, value):
+    if value is None:
+        if not key.nulls_last:
+            raise ValueError('Invalid cursor')
+        return None
+    column_type = key.expression.type
+    if isinstance(column_type, DateTime) and isinstance(value, str):
+        return datetime.fromisoformat(value)
+    if isinstance(column_type, Float) and isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(column_type, Numeric) and isinstance(value, str):
+        return Decimal(value)
+    if isinstance(column_type, Integer) and isinstance(value, int):
+        return value
+    if not isinstance(column_type, (DateTime, Numeric, Integer)) and isinstance(value, str):
+        return value
+    raise ValueError('Invalid cursor')
+
+
+def decode_search_cursor(search: InventoryItemSearch, keys: List[SortKey], values: list) -> list:
+    """
+    Значения курсора (после decode_cursor) в типах ключей сортировки.
+    Курсор от другой сортировки или поврежденный дает ValueError
+    """
+    if len(values) != len(keys) + 2 or values[:2] != [search.sort.value, search.order.value]:
+        raise ValueError('Invalid cursor')
+    return [_cursor_value(key, value) for key, value in zip(keys, values[2:])]
@@ -0,0 +1,142 @@
+import base64
+import json
+from datetime import datetime
+from typing import Callable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import Select, func, select, text, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from backend.core.schemas import TotalMode
+
+
+def encode_cursor(values: list) -> str:
+    """
+    Кодирует ключ последней строки страницы в непрозрачный курсор
+    """
+    raw = json.dumps(values, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str) -> list:
+    """
+    Декодирует курсор, выданный encode_cursor. Бросает ValueError, если курсор поврежден
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except (ValueError, UnicodeError):
+        raise ValueError('Invalid cursor')
+    if not isinstance(values, list):
+        raise ValueError('Invalid cursor')
+    return values
+
+
+def decode_id_cursor(cursor: str) -> Optional[int]:
+    """
+    Курсор по id. Пустая строка означает первую страницу
+    """
+    if not cursor:
+        return None
+    values = decode_cursor(cursor)
+    if len(values) != 1 or not isinstance(values[0], int):
+        raise ValueError('Invalid cursor')
+    return values[0]
+
+
+def decode_created_at_cursor(cursor: str) -> Optional[Tuple[datetime, int]]:
+    """
+    Курсор по (created_at, id). Пустая строка означает первую страницу
+    """
+    if not cursor:
+        return None
+    values = decode_cursor(cursor)
+    if len(values) != 2 or not isinstance(values[0], str) or not isinstance(values[1], int):
+        raise ValueError('Invalid cursor')
+    return datetime.fromisoformat(values[0]), values[1]
+
+
+def build_page(rows: List, limit: int, key: Callable[[object], list],
+               total: Optional[int] = None, total_estimated: bool = False) -> dict:
+    """
+    Собирает страницу из выборки размером limit + 1: лишняя строка
+    означает, что есть следующая страница. limit должен быть положительным:
+    по пустой странице нельзя построить курсор
+    """
+    if limit < 1:
+        raise ValueError(f"Page limit must be positive, got {limit}")
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(key(rows[-1]))
+    # Все поля страницы, включая пустые: ответ через fast_json не дополняется значениями по умолчанию схемы
+    return {"items": rows, "next_cursor": next_cursor, "total": total, "total_estimated": total_estimated}
+
+
+def keyset(query, columns: Sequence, after: Optional[Sequence], limit: int, descending: bool = False):
+    """
+    Страница по ключу columns, начиная после значения after:
+    WHERE (columns) > after ORDER BY columns LIMIT limit (при descending — в обратную сторону).
+    Подходит и для select(), и для Session.query()
+    """
+    if after is not None:
+        if len(columns) == 1:
+            query = query.where(columns[0] < after[0] if descending else columns[0] > after[0])
+        else:
+            # Отдельное условие на первую колонку помогает выбрать индекс и отсечь партиции
+            query = query.where(
+                columns[0] <= after[0] if descending else columns[0] >= after[0],
+                tuple_(*columns) < tuple_(*after) if descending else tuple_(*columns) > tuple_(*after)
+            )
+    order = [column.desc() for column in columns] if descending else list(columns)
+    return query.order_by(*order).limit(limit)
+
+
+def count_statement(query: Select) -> Select:
+    return select(func.count()).select_from(query.order_by(None).limit(None).offset(None).subquery())
+
+
+def estimate_statement(query: Select, dialect):
+    """
+    EXPLAIN для оценки числа строк планировщиком; None, если СУБД оценку не дает
+    """
+    if dialect.name != "postgresql":
+        return None
+    sql = query.order_by(None).limit(None).offset(None).compile(
+        dialect=dialect, compile_kwargs={"literal_binds": True}
+    )
+    return text(f"EXPLAIN (FORMAT JSON) {sql}")
+
+
+def _plan_rows(plan) -> int:
+    # psycopg разбирает json сам, asyncpg отдает строку
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def total_count(db: Session, query: Select, mode: TotalMode) -> Tuple[Optional[int], bool]:
+    """
+    Общее число строк выборки: (число, оценка ли это). Оценка не читает таблицу,
+    поэтому для больших таблиц стоит просить ее, а не точный COUNT
+    """
+    if mode == TotalMode.NONE:
+        return None, False
+    if mode == TotalMode.ESTIMATED:
+        statement = estimate_statement(query, db.get_bind().dialect)
+        if statement is not None:
+            return _plan_rows(db.execute(statement).scalar()), True
+    return db.execute(count_statement(query)).scalar(), False
+
+
+async def async_total_count(db: AsyncSession, query: Select, mode: TotalMode) -> Tuple[Optional[int], bool]:
+    """
+    То же, что total_count, для AsyncSession
+    """
+    if mode == TotalMode.NONE:
+        return None, False
+    if mode == TotalMode.ESTIMATED:
+        statement = estimate_statement(query, db.bind.dialect)
+        if statement is not None:
+            return _plan_rows((await db.execute(statement)).scalar()), True
+    return (await db.execute(count_statement(query))).scalar(), False
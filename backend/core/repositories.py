@@ -1,11 +1,24 @@
+from sqlalchemy import DateTime, delete, func, insert, inspect, literal, select, update
 from sqlalchemy.orm import Session
+from backend.core.pagination import keyset, total_count
+from backend.core.rows import InventoryItemRow, select_item_rows
+from backend.core.schemas import TotalMode
 from backend.core.entities import (
     User, Room, InventoryCategory, InventoryItem,
-    Consumable, Log, InventoryCondition
+    Consumable, ConsumableMovement, ConsumableSnapshot, Log, InventoryCondition
 )
-from typing import Optional, List
+from typing import Optional, List, Tuple, Iterable, Set, Dict
 from datetime import datetime
 
+def get_existing_ids(db: Session, entity, ids: Iterable[int]) -> Set[int]:
+    """
+    Какие из переданных id есть в таблице — одним запросом с IN
+    """
+    ids = set(ids)
+    if not ids:
+        return set()
+    return {row_id for row_id, in db.query(entity.id).filter(entity.id.in_(ids))}
+
 class UserRepository:
     def __init__(self, db: Session):
         self.db = db
@@ -19,9 +32,21 @@ class UserRepository:
     def get_by_email(self, email: str) -> Optional[User]:
         return self.db.query(User).filter(User.email == email).first()
 
+    def get_avatar_key(self, user_id: int) -> Optional[str]:
+        return self.db.query(User.avatar_key).filter(User.id == user_id).scalar()
+
+    def get_avatar(self, user_id: int) -> Optional[bytes]:
+        return self.db.query(User.avatar).filter(User.id == user_id).scalar()
+
     def get_all(self, skip: int = 0, limit: int = 100) -> List[User]:
         return self.db.query(User).offset(skip).limit(limit).all()
 
+    def get_page(self, after_id: Optional[int] = None, limit: int = 100) -> List[User]:
+        query = self.db.query(User)
+        if after_id is not None:
+            query = query.filter(User.id > after_id)
+        return query.order_by(User.id).limit(limit).all()
+
     def create(self, user: User) -> User:
         self.db.add(user)
         self.db.commit()
@@ -49,8 +74,14 @@ class RoomRepository:
     def get_by_name(self, name: str) -> Optional[Room]:
         return self.db.query(Room).filter(Room.name == name).first()
 
-    def get_all(self) -> List[Room]:
-        return self.db.query(Room).all()
+    def get_all(self, skip: int = 0, limit: int = 100) -> List[Room]:
+        return self.db.query(Room).order_by(Room.id).offset(skip).limit(limit).all()
+
+    def get_page(self, after_id: Optional[int] = None, limit: int = 100) -> List[Room]:
+        return keyset(self.db.query(Room), [Room.id], None if after_id is None else [after_id], limit).all()
+
+    def count(self, mode: TotalMode = TotalMode.EXACT) -> Tuple[Optional[int], bool]:
+        return total_count(self.db, select(Room.id), mode)
 
     def create(self, room: Room) -> Room:
         self.db.add(room)
@@ -79,8 +110,14 @@ class InventoryCategoryRepository:
     def get_by_name(self, name: str) -> Optional[InventoryCategory]:
         return self.db.query(InventoryCategory).filter(InventoryCategory.name == name).first()
 
-    def get_all(self) -> List[InventoryCategory]:
-        return self.db.query(InventoryCategory).all()
+    def get_all(self, skip: int = 0, limit: int = 100) -> List[InventoryCategory]:
+        return self.db.query(InventoryCategory).order_by(InventoryCategory.id).offset(skip).limit(limit).all()
+
+    def get_page(self, after_id: Optional[int] = None, limit: int = 100) -> List[InventoryCategory]:
+        return keyset(self.db.query(InventoryCategory), [InventoryCategory.id], None if after_id is None else [after_id], limit).all()
+
+    def count(self, mode: TotalMode = TotalMode.EXACT) -> Tuple[Optional[int], bool]:
+        return total_count(self.db, select(InventoryCategory.id), mode)
 
     def create(self, category: InventoryCategory) -> InventoryCategory:
         self.db.add(category)
@@ -109,69 +146,45 @@ class InventoryItemRepository:
     def get_by_number(self, inventory_number: str) -> Optional[InventoryItem]:
         return self.db.query(InventoryItem).filter(InventoryItem.inventory_number == inventory_number).first()
 
-    def get_by_id_with_details(self, item_id: int) -> Optional[dict]:
-        result = (
-            self.db.query(
-                InventoryItem,
-                InventoryCategory.name.label("category_name"),
-                Room.name.label("room_name")
-            )
-            .join(InventoryCategory, InventoryItem.category_id == InventoryCategory.id)
-            .outerjoin(Room, InventoryItem.room_id == Room.id)
-            .filter(InventoryItem.id == item_id)
-            .first()
-        )
+    def get_photo_key(self, item_id: int) -> Optional[str]:
+        return self.db.query(InventoryItem.photo_key).filter(InventoryItem.id == item_id).scalar()
 
-        if not result:
-            return None
+    def get_photo(self, item_id: int) -> Optional[bytes]:
+        return self.db.query(InventoryItem.photo).filter(InventoryItem.id == item_id).scalar()
 
-        item, category_name, room_name = result
-
-        # Преобразуем в словарь с нужными полями
-        return {
-            **item.__dict__,
-            "category_name": category_name,
-            "room_name": room_name
-        }
-
-    def get_all_with_details(self, skip: int = 0, limit: int = 100) -> List[dict]:
-        results = (
-            self.db.query(
-                InventoryItem,
-                InventoryCategory.name.label("category_name"),
-                Room.name.label("room_name")
-            )
-            .join(InventoryCategory, InventoryItem.category_id == InventoryCategory.id)
-            .outerjoin(Room, InventoryItem.room_id == Room.id)
-            .offset(skip)
-            .limit(limit)
-            .all()
-        )
+    def _rows(self, query) -> List[InventoryItemRow]:
+        return [InventoryItemRow(*row) for row in self.db.execute(query)]
+
+    def get_by_id_with_details(self, item_id: int) -> Optional[InventoryItemRow]:
+        rows = self._rows(select_item_rows().where(InventoryItem.id == item_id))
+        return rows[0] if rows else None
 
-        # Преобразуем кортежи в словари с нужными полями
-        return [
-            {
-                **item.__dict__,
-                "category_name": category_name,
-                "room_name": room_name
-            }
-            for item, category_name, room_name in results
-        ]
+    def get_page_with_details(self, after_id: Optional[int] = None, limit: int = 100) -> List[InventoryItemRow]:
+        return self._rows(keyset(select_item_rows(), [InventoryItem.id], None if after_id is None else [after_id], limit))
+
+    def get_all_with_details(self, skip: int = 0, limit: int = 100) -> List[InventoryItemRow]:
+        return self._rows(select_item_rows().order_by(InventoryItem.id).offset(skip).limit(limit))
 
     def get_all(self, skip: int = 0, limit: int = 100) -> List[InventoryItem]:
         return self.db.query(InventoryItem).offset(skip).limit(limit).all()
 
-    def get_by_room(self, room_id: int) -> List[InventoryItem]:
-        return self.db.query(InventoryItem).filter(InventoryItem.room_id == room_id).all()
+    def _get_page_where(self, condition, after_id: Optional[int], limit: int) -> List[InventoryItem]:
+        query = self.db.query(InventoryItem).filter(condition)
+        return keyset(query, [InventoryItem.id], None if after_id is None else [after_id], limit).all()
+
+    def get_by_room(self, room_id: int, after_id: Optional[int] = None, limit: int = 100) -> List[InventoryItem]:
+        return self._get_page_where(InventoryItem.room_id == room_id, after_id, limit)
 
-    def get_by_category(self, category_id: int) -> List[InventoryItem]:
-        return self.db.query(InventoryItem).filter(InventoryItem.category_id == category_id).all()
+    def get_by_category(self, category_id: int, after_id: Optional[int] = None,
+                        limit: int = 100) -> List[InventoryItem]:
+        return self._get_page_where(InventoryItem.category_id == category_id, after_id, limit)
 
-    def get_by_user(self, user_id: int) -> List[InventoryItem]:
-        return self.db.query(InventoryItem).filter(InventoryItem.user_id == user_id).all()
+    def get_by_user(self, user_id: int, after_id: Optional[int] = None, limit: int = 100) -> List[InventoryItem]:
+        return self._get_page_where(InventoryItem.user_id == user_id, after_id, limit)
 
-    def get_by_condition(self, condition: InventoryCondition) -> List[InventoryItem]:
-        return self.db.query(InventoryItem).filter(InventoryItem.condition == condition).all()
+    def get_by_condition(self, condition: InventoryCondition, after_id: Optional[int] = None,
+                         limit: int = 100) -> List[InventoryItem]:
+        return self._get_page_where(InventoryItem.condition == condition, after_id, limit)
 
     def create(self, item: InventoryItem) -> InventoryItem:
         self.db.add(item)
@@ -191,6 +204,55 @@ class InventoryItemRepository:
             self.db.delete(item)
             self.db.commit()
 
+    def get_ids_by_numbers(self, numbers: Iterable[str]) -> Dict[str, int]:
+        numbers = set(numbers)
+        if not numbers:
+            return {}
+        rows = (
+            self.db.query(InventoryItem.inventory_number, InventoryItem.id)
+            .filter(InventoryItem.inventory_number.in_(numbers))
+        )
+        return dict(rows)
+
+    def get_numbers_by_ids(self, item_ids: Iterable[int]) -> Dict[int, str]:
+        item_ids = set(item_ids)
+        if not item_ids:
+            return {}
+        rows = (
+            self.db.query(InventoryItem.id, InventoryItem.inventory_number)
+            .filter(InventoryItem.id.in_(item_ids))
+        )
+        return dict(rows)
+
+    # Пакетные операции не делают commit: вызывающий выполняет их в одной транзакции
+
+    def create_many(self, rows: List[dict]) -> Dict[str, int]:
+        """
+        Многострочный INSERT; возвращает id по inventory_number
+        """
+        if not rows:
+            return {}
+        result = self.db.execute(
+            insert(InventoryItem).returning(InventoryItem.inventory_number, InventoryItem.id),
+            rows
+        )
+        return dict(result.all())
+
+    def update_many(self, rows: List[dict]):
+        """
+        UPDATE по первичному ключу; каждая строка — словарь с id и изменяемыми полями
+        """
+        if rows:
+            self.db.execute(update(InventoryItem), rows)
+
+    def delete_many(self, item_ids: Iterable[int]):
+        item_ids = list(item_ids)
+        if item_ids:
+            self.db.execute(
+                delete(InventoryItem).where(InventoryItem.id.in_(item_ids)),
+                execution_options={"synchronize_session": False}
+            )
+
     def write_off(self, item_id: int):
         item = self.get_by_id(item_id)
         if item:
@@ -209,19 +271,37 @@ class ConsumableRepository:
     def get_by_name(self, name: str) -> Optional[Consumable]:
         return self.db.query(Consumable).filter(Consumable.name == name).first()
 
-    def get_all(self) -> List[Consumable]:
-        return self.db.query(Consumable).all()
+    def get_all(self, skip: int = 0, limit: int = 100) -> List[Consumable]:
+        return self.db.query(Consumable).order_by(Consumable.id).offset(skip).limit(limit).all()
+
+    def get_page(self, after_id: Optional[int] = None, limit: int = 100) -> List[Consumable]:
+        return keyset(self.db.query(Consumable), [Consumable.id], None if after_id is None else [after_id], limit).all()
+
+    def count(self, mode: TotalMode = TotalMode.EXACT) -> Tuple[Optional[int], bool]:
+        return total_count(self.db, select(Consumable.id), mode)
 
-    def get_low_stock(self) -> List[Consumable]:
-        return self.db.query(Consumable).filter(Consumable.quantity <= Consumable.min_quantity).all()
+    def get_low_stock(self, after_id: Optional[int] = None, limit: int = 100) -> List[Consumable]:
+        query = self.db.query(Consumable).filter(Consumable.quantity <= Consumable.min_quantity)
+        return keyset(query, [Consumable.id], None if after_id is None else [after_id], limit).all()
 
-    def create(self, consumable: Consumable) -> Consumable:
+    def create(self, consumable: Consumable, user_id: Optional[int] = None) -> Consumable:
         self.db.add(consumable)
+        self.db.flush()
+        if consumable.quantity:
+            self.db.add(ConsumableMovement.create(
+                consumable.id, consumable.quantity, consumable.quantity, "create", user_id
+            ))
         self.db.commit()
         self.db.refresh(consumable)
         return consumable
 
-    def update(self, consumable: Consumable) -> Consumable:
+    def update(self, consumable: Consumable, user_id: Optional[int] = None) -> Consumable:
+        # Остаток, заданный вручную, попадает в журнал как корректировка
+        history = inspect(consumable).attrs.quantity.history
+        if history.deleted and history.added and history.added[0] != history.deleted[0]:
+            self.db.add(ConsumableMovement.create(
+                consumable.id, history.added[0] - history.deleted[0], history.added[0], "correction", user_id
+            ))
         self.db.commit()
         self.db.refresh(consumable)
         return consumable
@@ -232,17 +312,130 @@ class ConsumableRepository:
             self.db.delete(consumable)
             self.db.commit()
 
-    def increase_quantity(self, consumable_id: int, amount: int):
-        consumable = self.get_by_id(consumable_id)
-        if consumable:
-            consumable.quantity += amount
-            self.db.commit()
+    def get_quantities(self, consumable_ids: Iterable[int]) -> Dict[int, int]:
+        return dict(
+            self.db.query(Consumable.id, Consumable.quantity).filter(Consumable.id.in_(set(consumable_ids)))
+        )
 
-    def decrease_quantity(self, consumable_id: int, amount: int):
-        consumable = self.get_by_id(consumable_id)
-        if consumable:
-            consumable.quantity = max(0, consumable.quantity - amount)
-            self.db.commit()
+    def adjust_quantity(self, consumable_id: int, delta: int, reason: str = "adjust",
+                        user_id: Optional[int] = None) -> Optional[Tuple[str, int]]:
+        """
+        Меняет остаток одним UPDATE ... RETURNING, не читая строку заранее,
+        и добавляет движение в журнал в той же транзакции.
+        Проверка остатка при списании стоит в WHERE, поэтому одновременные
+        списания не теряются и не уводят остаток в минус.
+        Возвращает (название, новый остаток); None — строки нет или остатка не хватает.
+        Коммит — за вызывающим
+        """
+        statement = update(Consumable).where(Consumable.id == consumable_id)
+        if delta < 0:
+            statement = statement.where(Consumable.quantity >= -delta)
+        row = self.db.execute(
+            statement.values(quantity=Consumable.quantity + delta)
+            .returning(Consumable.name, Consumable.quantity)
+            .execution_options(synchronize_session=False)
+        ).first()
+        if row is None:
+            return None
+        self.db.execute(insert(ConsumableMovement).values(
+            consumable_id=consumable_id, delta=delta, quantity_after=row.quantity,
+            reason=reason, user_id=user_id
+        ))
+        return row.name, row.quantity
+
+    def adjust_quantities(self, deltas: Dict[int, int],
+                          user_id: Optional[int] = None) -> Dict[int, Tuple[str, int]]:
+        """
+        adjust_quantity для нескольких расходников в текущей транзакции.
+        Строки блокируются в порядке id, чтобы встречные пакеты не ловили взаимоблокировку.
+        В результат попадают только успешно измененные id
+        """
+        results = {}
+        for consumable_id in sorted(deltas):
+            result = self.adjust_quantity(consumable_id, deltas[consumable_id], "adjust", user_id)
+            if result is not None:
+                results[consumable_id] = result
+        return results
+
+    def increase_quantity(self, consumable_id: int, amount: int,
+                          user_id: Optional[int] = None) -> Optional[Tuple[str, int]]:
+        result = self.adjust_quantity(consumable_id, amount, "increase", user_id)
+        self.db.commit()
+        return result
+
+    def decrease_quantity(self, consumable_id: int, amount: int,
+                          user_id: Optional[int] = None) -> Optional[Tuple[str, int]]:
+        result = self.adjust_quantity(consumable_id, -amount, "decrease", user_id)
+        self.db.commit()
+        return result
+
+class ConsumableMovementRepository:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_page(self, consumable_id: int, before_id: Optional[int] = None,
+                 limit: int = 100) -> List[ConsumableMovement]:
+        query = self.db.query(ConsumableMovement).filter(ConsumableMovement.consumable_id == consumable_id)
+        if before_id is not None:
+            query = query.filter(ConsumableMovement.id < before_id)
+        return query.order_by(ConsumableMovement.id.desc()).limit(limit).all()
+
+    def take_snapshots(self, taken_at: datetime) -> int:
+        """
+        Снимок остатков всех расходников одним INSERT ... SELECT.
+        Остаток и номер последнего движения читаются одним запросом и согласованы
+        между собой: движение и изменение остатка коммитятся вместе
+        """
+        last_movement_id = (
+            select(func.max(ConsumableMovement.id))
+            .where(ConsumableMovement.consumable_id == Consumable.id)
+            .scalar_subquery()
+        )
+        result = self.db.execute(
+            insert(ConsumableSnapshot).from_select(
+                ["consumable_id", "taken_at", "quantity", "last_movement_id"],
+                select(Consumable.id, literal(taken_at, DateTime(timezone=True)), Consumable.quantity,
+                       last_movement_id)
+            )
+        )
+        return result.rowcount
+
+    def get_last_snapshot_time(self) -> Optional[datetime]:
+        return self.db.query(func.max(ConsumableSnapshot.taken_at)).scalar()
+
+    def get_stock_at(self, consumable_id: int, at: datetime) -> int:
+        """
+        Остаток на момент at: ближайший снимок не позже at плюс движения после него
+        """
+        snapshot = (
+            self.db.query(ConsumableSnapshot)
+            .filter(ConsumableSnapshot.consumable_id == consumable_id, ConsumableSnapshot.taken_at <= at)
+            .order_by(ConsumableSnapshot.taken_at.desc())
+            .first()
+        )
+        query = self.db.query(func.coalesce(func.sum(ConsumableMovement.delta), 0)).filter(
+            ConsumableMovement.consumable_id == consumable_id,
+            ConsumableMovement.created_at <= at
+        )
+        quantity = 0
+        if snapshot is not None:
+            quantity = snapshot.quantity
+            if snapshot.last_movement_id is not None:
+                query = query.filter(ConsumableMovement.id > snapshot.last_movement_id)
+        return quantity + query.scalar()
+
+    def get_consumed(self, consumable_id: int, since: datetime, until: datetime) -> int:
+        """
+        Сколько списано за период (ручные корректировки не учитываются)
+        """
+        consumed = self.db.query(func.coalesce(func.sum(ConsumableMovement.delta), 0)).filter(
+            ConsumableMovement.consumable_id == consumable_id,
+            ConsumableMovement.created_at > since,
+            ConsumableMovement.created_at <= until,
+            ConsumableMovement.delta < 0,
+            ConsumableMovement.reason.in_(("decrease", "adjust"))
+        ).scalar()
+        return -consumed
 
 class LogRepository:
     def __init__(self, db: Session):
@@ -254,14 +447,25 @@ class LogRepository:
     def get_all(self, skip: int = 0, limit: int = 100) -> List[Log]:
         return self.db.query(Log).order_by(Log.created_at.desc()).offset(skip).limit(limit).all()
 
-    def get_by_type(self, log_type: int) -> List[Log]:
-        return self.db.query(Log).filter(Log.type == log_type).order_by(Log.created_at.desc()).all()
+    def get_page(self, before: Optional[Tuple[datetime, int]] = None, limit: int = 100) -> List[Log]:
+        return keyset(self.db.query(Log), [Log.created_at, Log.id], before, limit, descending=True).all()
 
-    def get_by_user(self, user_id: int) -> List[Log]:
-        return self.db.query(Log).filter(Log.user_id == user_id).order_by(Log.created_at.desc()).all()
+    def get_by_type(self, log_type: int, before: Optional[Tuple[datetime, int]] = None,
+                    limit: int = 100) -> List[Log]:
+        query = self.db.query(Log).filter(Log.type == log_type)
+        return keyset(query, [Log.created_at, Log.id], before, limit, descending=True).all()
+
+    def get_by_user(self, user_id: int, before: Optional[Tuple[datetime, int]] = None,
+                    limit: int = 100) -> List[Log]:
+        query = self.db.query(Log).filter(Log.user_id == user_id)
+        return keyset(query, [Log.created_at, Log.id], before, limit, descending=True).all()
 
     def create(self, log: Log) -> Log:
         self.db.add(log)
         self.db.commit()
         self.db.refresh(log)
-        return log
\ No newline at end of file
+        return log
+
+    def create_many(self, rows: List[dict]):
+        self.db.execute(insert(Log), rows)
+        self.db.commit()
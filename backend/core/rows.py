@@ -0,0 +1,80 @@
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import Float, select
+
+from backend.core.entities import InventoryItem, InventoryCategory, Room, Consumable, Log, InventoryCondition
+
+# Строки списков для быстрого ответа (backend/services/fast_json.py): выбираются
+# кортежами колонок без загрузки ORM-объектов и отдаются без повторной валидации.
+# Порядок и имена полей совпадают с InventoryItemResponse, ConsumableResponse и LogResponse,
+# поэтому JSON такой же, как при сериализации через Pydantic
+
+
+@dataclass(slots=True)
+class InventoryItemRow:
+    inventory_number: str
+    name: str
+    description: Optional[str]
+    category_id: int
+    condition: InventoryCondition
+    room_id: Optional[int]
+    user_id: Optional[int]
+    has_photo: bool
+    purchase_date: Optional[datetime]
+    purchase_price: Optional[float]
+    warranty_until: Optional[datetime]
+    id: int
+    created_at: datetime
+    updated_at: Optional[datetime]
+    is_written_off: bool
+    category_name: str
+    room_name: Optional[str]
+
+
+@dataclass(slots=True)
+class ConsumableRow:
+    name: str
+    description: Optional[str]
+    quantity: int
+    min_quantity: int
+    unit: str
+    id: int
+
+
+@dataclass(slots=True)
+class LogRow:
+    id: int
+    description: str
+    type: int
+    created_at: datetime
+    related_entity_link: Optional[str]
+    user_id: Optional[int]
+
+
+def select_item_rows():
+    return (
+        select(
+            InventoryItem.inventory_number, InventoryItem.name, InventoryItem.description,
+            InventoryItem.category_id, InventoryItem.condition, InventoryItem.room_id, InventoryItem.user_id,
+            InventoryItem.has_photo, InventoryItem.purchase_date,
+            # DECIMAL -> float сразу в СУБД: в ответе цена числом, как у Pydantic-модели
+            InventoryItem.purchase_price.cast(Float), InventoryItem.warranty_until,
+            InventoryItem.id, InventoryItem.created_at, InventoryItem.updated_at, InventoryItem.is_written_off,
+            InventoryCategory.name, Room.name
+        )
+        .join(InventoryCategory, InventoryItem.category_id == InventoryCategory.id)
+        .outerjoin(Room, InventoryItem.room_id == Room.id)
+    )
+
+
+def select_consumable_rows():
+    return select(
+        Consumable.name, Consumable.description, Consumable.quantity,
+        Consumable.min_quantity, Consumable.unit, Consumable.id
+    )
+
+
+def select_log_rows():
+    return select(Log.id, Log.description, Log.type, Log.created_at, Log.related_entity_link, Log.user_id)
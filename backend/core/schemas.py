@@ -1,6 +1,6 @@
 from pydantic import BaseModel
 from datetime import datetime
-from typing import Optional
+from typing import Optional, List
 from enum import Enum
 
 class InventoryCondition(str, Enum):
@@ -32,11 +32,15 @@ class UserResponse(UserBase):
     registered_at: datetime
     deleted_at: Optional[datetime] = None
     is_active: bool
-    avatar: Optional[bytes] = None
+    has_avatar: bool = False  # сам файл: GET /users/{id}/avatar
 
     class Config:
         orm_mode = True
 
+class UserPage(BaseModel):
+    items: List[UserResponse]
+    next_cursor: Optional[str] = None
+
 class RoomBase(BaseModel):
     name: str
     description: Optional[str] = None
@@ -50,6 +54,17 @@ class RoomResponse(RoomBase):
     class Config:
         orm_mode = True
 
+class TotalMode(str, Enum):
+    NONE = "none"  # без общего числа строк
+    ESTIMATED = "estimated"  # оценка планировщика PostgreSQL, в остальных СУБД — точный COUNT
+    EXACT = "exact"  # точный COUNT(*)
+
+class RoomPage(BaseModel):
+    items: List[RoomResponse]
+    next_cursor: Optional[str] = None
+    total: Optional[int] = None
+    total_estimated: bool = False
+
 class InventoryCategoryBase(BaseModel):
     name: str
     short_name: str
@@ -64,6 +79,12 @@ class InventoryCategoryResponse(InventoryCategoryBase):
     class Config:
         orm_mode = True
 
+class InventoryCategoryPage(BaseModel):
+    items: List[InventoryCategoryResponse]
+    next_cursor: Optional[str] = None
+    total: Optional[int] = None
+    total_estimated: bool = False
+
 class InventoryItemBase(BaseModel):
     inventory_number: str
     name: str
@@ -72,7 +93,7 @@ class InventoryItemBase(BaseModel):
     condition: InventoryCondition
     room_id: Optional[int] = None
     user_id: Optional[int] = None
-    photo: Optional[bytes] = None
+    has_photo: bool = False  # сам файл: GET /inventory/items/{id}/photo
     purchase_date: Optional[datetime] = None
     purchase_price: Optional[float] = None
     warranty_until: Optional[datetime] = None
@@ -104,6 +125,29 @@ class InventoryItemUpdate(BaseModel):
     warranty_until: Optional[datetime] = None
     is_written_off: Optional[bool] = None
 
+class InventoryItemBulkUpdate(InventoryItemUpdate):
+    id: int
+
+class InventoryItemBulkRequest(BaseModel):
+    create: List[InventoryItemCreate] = []
+    update: List[InventoryItemBulkUpdate] = []
+    delete: List[int] = []
+
+class BulkCreatedRow(BaseModel):
+    index: int  # позиция строки в списке create запроса
+    id: int
+
+class BulkRowError(BaseModel):
+    operation: str  # create / update / delete
+    index: int  # позиция строки в соответствующем списке запроса
+    detail: str
+
+class InventoryItemBulkResult(BaseModel):
+    created: List[BulkCreatedRow] = []
+    updated: List[int] = []
+    deleted: List[int] = []
+    errors: List[BulkRowError] = []
+
 class InventoryItemResponse(InventoryItemBase):
     id: int
     created_at: datetime
@@ -116,6 +160,13 @@ class InventoryItemResponse(InventoryItemBase):
         orm_mode = True
 
 
+class InventoryItemPage(BaseModel):
+    items: List[InventoryItemResponse]
+    next_cursor: Optional[str] = None
+    total: Optional[int] = None
+    total_estimated: bool = False
+
+
 class InventoryItemResponseForDetails(InventoryItemBase):
     id: int
     created_at: datetime
@@ -127,6 +178,45 @@ class InventoryItemResponseForDetails(InventoryItemBase):
     class Config:
         from_attributes = True  # Для Pydantic v2 (бывшее orm_mode)
 
+class ItemSortField(str, Enum):
+    ID = "id"
+    NAME = "name"
+    INVENTORY_NUMBER = "inventory_number"
+    CATEGORY_NAME = "category_name"
+    ROOM_NAME = "room_name"
+    PURCHASE_DATE = "purchase_date"
+    PURCHASE_PRICE = "purchase_price"
+    CREATED_AT = "created_at"
+    UPDATED_AT = "updated_at"
+    RELEVANCE = "relevance"  # только вместе с q
+
+class SortOrder(str, Enum):
+    ASC = "asc"
+    DESC = "desc"
+
+class InventoryItemSearch(BaseModel):
+    q: Optional[str] = None
+    category_ids: List[int] = []
+    room_ids: List[int] = []
+    user_ids: List[int] = []
+    conditions: List[InventoryCondition] = []
+    is_written_off: Optional[bool] = None
+    purchased_from: Optional[datetime] = None
+    purchased_to: Optional[datetime] = None
+    price_min: Optional[float] = None
+    price_max: Optional[float] = None
+    sort: ItemSortField = ItemSortField.ID
+    order: SortOrder = SortOrder.ASC
+    limit: int = 50
+    after: Optional[list] = None  # ключи последней строки предыдущей страницы (из курсора)
+    total: TotalMode = TotalMode.EXACT
+
+class InventoryItemSearchPage(BaseModel):
+    items: List[InventoryItemResponse]
+    next_cursor: Optional[str] = None
+    total: Optional[int] = None
+    total_estimated: bool = False
+
 class ConsumableBase(BaseModel):
     name: str
     description: Optional[str] = None
@@ -150,6 +240,56 @@ class ConsumableResponse(ConsumableBase):
     class Config:
         orm_mode = True
 
+class ConsumablePage(BaseModel):
+    items: List[ConsumableResponse]
+    next_cursor: Optional[str] = None
+    total: Optional[int] = None
+    total_estimated: bool = False
+
+class ConsumableMovementResponse(BaseModel):
+    id: int
+    consumable_id: int
+    delta: int
+    quantity_after: int
+    reason: str
+    created_at: datetime
+    user_id: Optional[int] = None
+
+    class Config:
+        orm_mode = True
+
+class ConsumableMovementPage(BaseModel):
+    items: List[ConsumableMovementResponse]
+    next_cursor: Optional[str] = None
+
+class ConsumableStockAt(BaseModel):
+    id: int
+    at: datetime
+    quantity: int
+
+class ConsumableConsumption(BaseModel):
+    id: int
+    days: int
+    consumed: int
+    per_day: float
+    quantity: int
+    days_left: Optional[float] = None  # на сколько дней хватит остатка при текущем расходе
+
+class ConsumableAdjustment(BaseModel):
+    id: int
+    delta: int  # > 0 — поступление, < 0 — списание
+
+class ConsumableAdjustRequest(BaseModel):
+    items: List[ConsumableAdjustment]
+
+class ConsumableQuantity(BaseModel):
+    id: int
+    name: str
+    quantity: int
+
+class ConsumableAdjustResult(BaseModel):
+    items: List[ConsumableQuantity]
+
 class LogResponse(BaseModel):
     id: int
     description: str
@@ -161,6 +301,12 @@ class LogResponse(BaseModel):
     class Config:
         orm_mode = True
 
+class LogPage(BaseModel):
+    items: List[LogResponse]
+    next_cursor: Optional[str] = None
+    total: Optional[int] = None
+    total_estimated: bool = False
+
 class ReportType(str, Enum):
     USERS = "users"
     ROOMS = "rooms"
@@ -171,6 +317,17 @@ class ReportType(str, Enum):
     LOW_STOCK = "low_stock"
     INVENTORY_BY_CONDITION = "inventory_by_condition"
 
+class ReportJobCreate(BaseModel):
+    report_type: ReportType
+    condition: Optional[str] = None
+    date_from: Optional[datetime] = None
+    date_to: Optional[datetime] = None
+
+
+class ImportKind(str, Enum):
+    INVENTORY_ITEMS = "inventory_items"
+    CONSUMABLES = "consumables"
+
 
 class AuthResponse(BaseModel):
     is_admin: bool
@@ -1,39 +1,66 @@
-import io
-
-import bcrypt
-from fastapi import APIRouter, Depends, HTTPException, Response
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Request, Response, UploadFile
+from fastapi.responses import FileResponse, StreamingResponse
 from pydantic import BaseModel
 from rest_framework import status
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List, Optional
-from datetime import datetime
+from typing import List, Optional, Union
+from datetime import datetime, timedelta
 from enum import Enum
+from pytz import timezone
 
 from backend.core.entities import (
     User, Room, InventoryCategory, InventoryItem,
-    Consumable, Log, InventoryCondition, LogType
+    Consumable, ConsumableMovement, Log, InventoryCondition, LogType
 )
 from backend.core.repositories import (
     UserRepository, RoomRepository, InventoryCategoryRepository,
-    InventoryItemRepository, ConsumableRepository, LogRepository
+    InventoryItemRepository, ConsumableRepository, ConsumableMovementRepository, LogRepository
 )
 from backend.core.schemas import (
     UserCreate, UserUpdate, UserResponse,
-    RoomCreate, RoomResponse,
-    InventoryCategoryCreate, InventoryCategoryResponse,
+    RoomCreate, RoomResponse, RoomPage, TotalMode,
+    InventoryCategoryCreate, InventoryCategoryResponse, InventoryCategoryPage,
     InventoryItemCreate, InventoryItemUpdate, InventoryItemResponse,
-    ConsumableCreate, ConsumableUpdate, ConsumableResponse,
-    LogResponse, ReportType, AuthResponse, LoginRequest, InventoryItemResponseForDetails
+    ConsumableCreate, ConsumableUpdate, ConsumableResponse, ConsumablePage, ConsumableAdjustRequest, ConsumableAdjustResult,
+    ConsumableMovementPage, ConsumableStockAt, ConsumableConsumption,
+    LogResponse, ReportType, AuthResponse, LoginRequest, InventoryItemResponseForDetails,
+    UserPage, InventoryItemPage, LogPage, InventoryItemBulkRequest, InventoryItemBulkResult,
+    ImportKind, ReportJobCreate, InventoryItemSearch, InventoryItemSearchPage, ItemSortField, SortOrder
 )
+from backend.core.async_repositories import (
+    AsyncRoomRepository, AsyncInventoryCategoryRepository, AsyncInventoryItemRepository,
+    AsyncConsumableRepository, AsyncLogRepository
+)
+from backend.core.pagination import build_page, decode_cursor, decode_id_cursor, decode_created_at_cursor
 
-from openpyxl import Workbook
-from openpyxl.styles import Font, Alignment, PatternFill, Border, Side
-
-from backend.configurations.database import get_db
-from backend.services.export import *
-from backend.services.security import hash_data
-
-router = APIRouter()
+from backend.configurations.config import (
+    ITEMS_SEARCH_MAX_LIMIT, LIST_MAX_LIMIT, NDJSON_FETCH_SIZE, REPORT_JOB_MAX_WAIT_SECONDS
+)
+from backend.configurations.database import SessionLocal, get_db, get_async_db, all_pool_metrics
+from backend.configurations.fastapi_utils import get_current_session, require_admin, issue_session, clear_session
+from backend.services.report_stream import ADMIN_REPORTS, XLSX_MEDIA_TYPE, build_report, stream_report
+from backend.services.report_jobs import report_jobs
+from backend.services.images import image_response, store_image
+from backend.services.item_bulk import apply_bulk_items
+from backend.services.importer import import_jobs
+from backend.services.ndjson import ndjson_response
+from backend.services.conditional import conditional_get
+from backend.services.fast_json import fast_json
+from backend.services.reference_cache import ROOMS, CATEGORIES, cached_json, reference_cache, serialize
+from backend.services.security import hash_data, verify_password, needs_rehash
+from backend.services.audit_log import audit_log
+from backend.services.executors import auth_executor
+
+auth_router = APIRouter()
+router = APIRouter(dependencies=[Depends(get_current_session)])
+
+# Условные GET (ETag / Last-Modified): от каких таблиц зависит ответ
+users_conditional = conditional_get(User)
+items_conditional = conditional_get(InventoryItem, InventoryCategory, Room)
+consumables_conditional = conditional_get(Consumable)
+movements_conditional = conditional_get(Consumable, ConsumableMovement)
+logs_conditional = conditional_get(Log)
 
 
 class InventoryCondition(str, Enum):
@@ -42,19 +69,37 @@ class InventoryCondition(str, Enum):
     WRITTEN_OFF = "WRITTEN_OFF"
 
 
-@router.post("/login", response_model=AuthResponse)
-async def login(
-    credentials: LoginRequest,
-    db: Session = Depends(get_db)
-):
-    username = credentials.username
-    password = credentials.password
+def _id_cursor(cursor: str) -> Optional[int]:
+    try:
+        return decode_id_cursor(cursor)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _created_at_cursor(cursor: str):
+    try:
+        return decode_created_at_cursor(cursor)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _authenticate(username: str, password: str) -> AuthResponse:
+    # Выполняется в auth_executor: bcrypt и запросы к БД не блокируют event loop.
+    # Сессия своя, а не из get_db: при обрыве соединения клиента get_db закроет
+    # сессию запроса, пока поток еще с ней работает
+    db = SessionLocal()
+    try:
+        return _authenticate_with(db, username, password)
+    finally:
+        db.close()
+
+
+def _authenticate_with(db: Session, username: str, password: str) -> AuthResponse:
     user_repo = UserRepository(db)
     user = user_repo.get_by_username(username)
-    log_repo = LogRepository(db)
 
     if not user:
-        log_repo.create(Log.create(
+        audit_log.submit(Log.create(
             description=f"Failed login attempt - user not found: {username}",
             type=LogType.WARNING.value,
             related_entity_link=f"/users/?username={username}"
@@ -63,8 +108,8 @@ async def login(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid username or password"
         )
-    if not bcrypt.checkpw(password.encode('utf-8'), user.password_hash.encode('utf-8')):
-        log_repo.create(Log.create(
+    if not verify_password(user.id, password, user.password_hash):
+        audit_log.submit(Log.create(
             description=f"Failed login attempt - wrong password for user: {username}",
             type=LogType.WARNING.value,
             related_entity_link=f"/users/{user.id}"
@@ -73,7 +118,20 @@ async def login(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid username or password"
         )
-    log_repo.create(Log.create(
+    if not user.is_active or user.deleted_at is not None:
+        audit_log.submit(Log.create(
+            description=f"Failed login attempt - user is deactivated: {username}",
+            type=LogType.WARNING.value,
+            related_entity_link=f"/users/{user.id}"
+        ))
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="User account is deactivated"
+        )
+    if needs_rehash(user.password_hash):
+        user.password_hash = hash_data(password)
+        user_repo.update(user)
+    audit_log.submit(Log.create(
         description=f"User logged in: {username}",
         type=LogType.INFO.value,
         related_entity_link=f"/users/{user.id}",
@@ -87,7 +145,20 @@ async def login(
     )
 
 
-@router.post("/users/", response_model=UserResponse)
+@auth_router.post("/login", response_model=AuthResponse)
+async def login(credentials: LoginRequest, response: Response):
+    auth = await auth_executor.run(_authenticate, credentials.username, credentials.password)
+    issue_session(response, auth.user_id, auth.is_admin, auth.full_name)
+    return auth
+
+
+@auth_router.post("/logout")
+def logout(response: Response):
+    clear_session(response)
+    return {"message": "Logged out"}
+
+
+@router.post("/users/", response_model=UserResponse, dependencies=[Depends(require_admin)])
 def create_user(user: UserCreate, db: Session = Depends(get_db)):
     repo = UserRepository(db)
     db_user = repo.get_by_username(user.username)
@@ -107,13 +178,19 @@ def create_user(user: UserCreate, db: Session = Depends(get_db)):
     return repo.create(new_user)
 
 
-@router.get("/users/", response_model=List[UserResponse])
-def read_users(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+@router.get("/users/", response_model=Union[List[UserResponse], UserPage], dependencies=[Depends(users_conditional)])
+def read_users(skip: int = 0, limit: int = Query(100, ge=1, le=LIST_MAX_LIMIT), cursor: Optional[str] = None,
+               db: Session = Depends(get_db)):
     repo = UserRepository(db)
-    return repo.get_all(skip=skip, limit=limit)
+    if cursor is None:
+        return repo.get_all(skip=skip, limit=limit)
 
+    after_id = _id_cursor(cursor)
+    users = repo.get_page(after_id=after_id, limit=limit + 1)
+    return build_page(users, limit, key=lambda user: [user.id])
 
-@router.get("/users/{user_id}", response_model=UserResponse)
+
+@router.get("/users/{user_id}", response_model=UserResponse, dependencies=[Depends(users_conditional)])
 def read_user(user_id: int, db: Session = Depends(get_db)):
     repo = UserRepository(db)
     db_user = repo.get_by_id(user_id)
@@ -122,20 +199,35 @@ def read_user(user_id: int, db: Session = Depends(get_db)):
     return db_user
 
 
-@router.put("/users/{user_id}", response_model=UserResponse)
+@router.get("/users/{user_id}/avatar")
+def read_user_avatar(user_id: int, request: Request, thumbnail: bool = False, db: Session = Depends(get_db)):
+    repo = UserRepository(db)
+    return image_response(
+        request, db, repo.get_avatar_key(user_id), lambda: repo.get_avatar(user_id),
+        thumbnail=thumbnail, not_found="Avatar not found"
+    )
+
+
+@router.put("/users/{user_id}", response_model=UserResponse, dependencies=[Depends(require_admin)])
 def update_user(user_id: int, user: UserUpdate, db: Session = Depends(get_db)):
     repo = UserRepository(db)
     db_user = repo.get_by_id(user_id)
     if db_user is None:
         raise HTTPException(status_code=404, detail="User not found")
 
-    for key, value in user.dict(exclude_unset=True).items():
+    update_data = user.dict(exclude_unset=True)
+    if "avatar" in update_data:
+        avatar = update_data.pop("avatar")
+        db_user.avatar_key = store_image(db, avatar) if avatar else None
+        db_user.avatar = None
+
+    for key, value in update_data.items():
         setattr(db_user, key, value)
 
     return repo.update(db_user)
 
 
-@router.delete("/users/{user_id}")
+@router.delete("/users/{user_id}", dependencies=[Depends(require_admin)])
 def delete_user(user_id: int, db: Session = Depends(get_db)):
     repo = UserRepository(db)
     db_user = repo.get_by_id(user_id)
@@ -156,19 +248,38 @@ def create_room(room: RoomCreate, db: Session = Depends(get_db)):
     return repo.create(new_room)
 
 
-@router.get("/rooms/", response_model=List[RoomResponse])
-def read_rooms(db: Session = Depends(get_db)):
-    repo = RoomRepository(db)
-    return repo.get_all()
+@router.get("/rooms/", response_model=Union[List[RoomResponse], RoomPage])
+async def read_rooms(request: Request, skip: int = 0, limit: int = Query(100, ge=1, le=LIST_MAX_LIMIT),
+                     cursor: Optional[str] = None, total: TotalMode = TotalMode.NONE,
+                     db: AsyncSession = Depends(get_async_db)):
+    repo = AsyncRoomRepository(db)
+    if cursor is None:
+        async def load():
+            return serialize(RoomResponse, await repo.get_all(skip=skip, limit=limit), many=True)
+        return await cached_json(request, ROOMS, f"list:{skip}:{limit}", load)
+
+    rooms = await repo.get_page(after_id=_id_cursor(cursor), limit=limit + 1)
+    count, estimated = await repo.count(total)
+    return build_page(rooms, limit, key=lambda room: [room.id], total=count, total_estimated=estimated)
+
+
+@router.get("/rooms/stream")
+async def stream_rooms():
+    return ndjson_response(
+        lambda db: AsyncRoomRepository(db).stream(NDJSON_FETCH_SIZE), RoomResponse, "rooms.ndjson"
+    )
 
 
 @router.get("/rooms/{room_id}", response_model=RoomResponse)
-def read_room(room_id: int, db: Session = Depends(get_db)):
-    repo = RoomRepository(db)
-    db_room = repo.get_by_id(room_id)
-    if db_room is None:
+async def read_room(room_id: int, request: Request, db: AsyncSession = Depends(get_async_db)):
+    async def load():
+        db_room = await AsyncRoomRepository(db).get_by_id(room_id)
+        return None if db_room is None else serialize(RoomResponse, db_room)
+
+    response = await cached_json(request, ROOMS, f"id:{room_id}", load)
+    if response is None:
         raise HTTPException(status_code=404, detail="Room not found")
-    return db_room
+    return response
 
 
 @router.put("/rooms/{room_id}", response_model=RoomResponse)
@@ -208,19 +319,39 @@ def create_category(category: InventoryCategoryCreate, db: Session = Depends(get
     return repo.create(new_category)
 
 
-@router.get("/inventory/categories/", response_model=List[InventoryCategoryResponse])
-def read_categories(db: Session = Depends(get_db)):
-    repo = InventoryCategoryRepository(db)
-    return repo.get_all()
+@router.get("/inventory/categories/", response_model=Union[List[InventoryCategoryResponse], InventoryCategoryPage])
+async def read_categories(request: Request, skip: int = 0, limit: int = Query(100, ge=1, le=LIST_MAX_LIMIT),
+                          cursor: Optional[str] = None, total: TotalMode = TotalMode.NONE,
+                          db: AsyncSession = Depends(get_async_db)):
+    repo = AsyncInventoryCategoryRepository(db)
+    if cursor is None:
+        async def load():
+            return serialize(InventoryCategoryResponse, await repo.get_all(skip=skip, limit=limit), many=True)
+        return await cached_json(request, CATEGORIES, f"list:{skip}:{limit}", load)
+
+    categories = await repo.get_page(after_id=_id_cursor(cursor), limit=limit + 1)
+    count, estimated = await repo.count(total)
+    return build_page(categories, limit, key=lambda category: [category.id], total=count, total_estimated=estimated)
+
+
+@router.get("/inventory/categories/stream")
+async def stream_categories():
+    return ndjson_response(
+        lambda db: AsyncInventoryCategoryRepository(db).stream(NDJSON_FETCH_SIZE),
+        InventoryCategoryResponse, "categories.ndjson"
+    )
 
 
 @router.get("/inventory/categories/{category_id}", response_model=InventoryCategoryResponse)
-def read_category(category_id: int, db: Session = Depends(get_db)):
-    repo = InventoryCategoryRepository(db)
-    db_category = repo.get_by_id(category_id)
-    if db_category is None:
+async def read_category(category_id: int, request: Request, db: AsyncSession = Depends(get_async_db)):
+    async def load():
+        db_category = await AsyncInventoryCategoryRepository(db).get_by_id(category_id)
+        return None if db_category is None else serialize(InventoryCategoryResponse, db_category)
+
+    response = await cached_json(request, CATEGORIES, f"id:{category_id}", load)
+    if response is None:
         raise HTTPException(status_code=404, detail="Category not found")
-    return db_category
+    return response
 
 
 @router.put("/inventory/categories/{category_id}", response_model=InventoryCategoryResponse)
@@ -291,7 +422,7 @@ def create_item(item: InventoryItemCreate, db: Session = Depends(get_db)):
         condition=condition,
         room_id=item.room_id,
         user_id=item.user_id,
-        photo=item.photo,
+        photo_key=store_image(db, item.photo) if item.photo else None,
         purchase_date=item.purchase_date,
         purchase_price=item.purchase_price,
         warranty_until=item.warranty_until
@@ -300,15 +431,92 @@ def create_item(item: InventoryItemCreate, db: Session = Depends(get_db)):
     return repo.create(new_item)
 
 
-@router.get("/inventory/items/", response_model=List[InventoryItemResponse])
-def read_items(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    repo = InventoryItemRepository(db)
-    items = repo.get_all_with_details(skip=skip, limit=limit)
-    return items
+@router.post("/inventory/items/bulk", response_model=InventoryItemBulkResult)
+def bulk_items(
+        request: InventoryItemBulkRequest,
+        session: dict = Depends(get_current_session),
+        db: Session = Depends(get_db)
+):
+    result = apply_bulk_items(db, request)
+    audit_log.submit(Log.create(
+        description=(
+            f"Bulk inventory change: created {len(result['created'])}, updated {len(result['updated'])}, "
+            f"deleted {len(result['deleted'])}, rejected {len(result['errors'])}"
+        ),
+        type=LogType.INFO.value,
+        related_entity_link="/inventory/items/",
+        user_id=session.get("user_id")
+    ))
+    return result
+
+
+@router.get("/inventory/items/", response_model=Union[List[InventoryItemResponse], InventoryItemPage],
+            dependencies=[Depends(items_conditional)])
+async def read_items(response: Response, skip: int = 0, limit: int = Query(100, ge=1, le=LIST_MAX_LIMIT),
+                     cursor: Optional[str] = None, db: AsyncSession = Depends(get_async_db)):
+    repo = AsyncInventoryItemRepository(db)
+    if cursor is None:
+        items = await repo.get_all_with_details(skip=skip, limit=limit)
+        return fast_json(items, response)
+
+    after_id = _id_cursor(cursor)
+    items = await repo.get_page_with_details(after_id=after_id, limit=limit + 1)
+    return fast_json(build_page(items, limit, key=lambda item: [item.id]), response)
+
+
+@router.get("/inventory/items/search", response_model=InventoryItemSearchPage, dependencies=[Depends(items_conditional)])
+async def search_items(
+        response: Response,
+        q: Optional[str] = None,
+        category_id: List[int] = Query([]),
+        room_id: List[int] = Query([]),
+        user_id: List[int] = Query([]),
+        condition: List[InventoryCondition] = Query([]),
+        is_written_off: Optional[bool] = None,
+        purchased_from: Optional[datetime] = None,
+        purchased_to: Optional[datetime] = None,
+        price_min: Optional[float] = None,
+        price_max: Optional[float] = None,
+        sort: ItemSortField = ItemSortField.ID,
+        order: SortOrder = SortOrder.ASC,
+        limit: int = Query(50, ge=1, le=ITEMS_SEARCH_MAX_LIMIT),
+        cursor: Optional[str] = None,
+        total: TotalMode = TotalMode.EXACT,
+        db: AsyncSession = Depends(get_async_db)
+):
+    try:
+        search = InventoryItemSearch(
+            q=q, category_ids=category_id, room_ids=room_id, user_ids=user_id, conditions=condition,
+            is_written_off=is_written_off, purchased_from=purchased_from, purchased_to=purchased_to,
+            price_min=price_min, price_max=price_max, sort=sort, order=order,
+            limit=limit, after=decode_cursor(cursor) if cursor else None, total=total
+        )
+        page = await AsyncInventoryItemRepository(db).search(search)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return fast_json(page, response)
 
 
-@router.get("/inventory/items/condition/{condition}", response_model=List[InventoryItemResponse])
-def read_items_by_condition(condition: str, db: Session = Depends(get_db)):
+@router.get("/inventory/items/stream")
+async def stream_items(
+        room_id: Optional[int] = None,
+        category_id: Optional[int] = None,
+        user_id: Optional[int] = None,
+        condition: Optional[InventoryCondition] = None
+):
+    conditions = AsyncInventoryItemRepository.filter_conditions(room_id, category_id, user_id, condition)
+    return ndjson_response(
+        lambda db: AsyncInventoryItemRepository(db).stream_with_details(conditions, NDJSON_FETCH_SIZE),
+        InventoryItemResponse, "inventory_items.ndjson"
+    )
+
+
+@router.get("/inventory/items/condition/{condition}",
+            response_model=Union[List[InventoryItemResponse], InventoryItemPage], dependencies=[Depends(items_conditional)])
+async def read_items_by_condition(condition: str, response: Response,
+                                  limit: int = Query(100, ge=1, le=LIST_MAX_LIMIT),
+                                  cursor: Optional[str] = None, total: TotalMode = TotalMode.NONE,
+                                  db: AsyncSession = Depends(get_async_db)):
     try:
         condition_enum = InventoryCondition(condition.upper())
     except ValueError:
@@ -318,20 +526,34 @@ def read_items_by_condition(condition: str, db: Session = Depends(get_db)):
             detail=f"Invalid condition. Must be one of: {', '.join(valid_conditions)}"
         )
 
-    repo = InventoryItemRepository(db)
-    items = repo.get_by_condition(condition_enum)
-    return items
+    repo = AsyncInventoryItemRepository(db)
+    if cursor is None:
+        return fast_json(await repo.get_by_condition(condition_enum, limit=limit), response)
 
+    items = await repo.get_by_condition(condition_enum, after_id=_id_cursor(cursor), limit=limit + 1)
+    count, estimated = await repo.count_where([InventoryItem.condition == condition_enum], total)
+    return fast_json(build_page(items, limit, key=lambda item: [item.id], total=count, total_estimated=estimated),
+                     response)
 
-@router.get("/inventory/items/{item_id}", response_model=InventoryItemResponseForDetails)
-def read_item(item_id: int, db: Session = Depends(get_db)):
-    repo = InventoryItemRepository(db)
-    db_item = repo.get_by_id_with_details(item_id)  # Используем новый метод
+
+@router.get("/inventory/items/{item_id}", response_model=InventoryItemResponseForDetails, dependencies=[Depends(items_conditional)])
+async def read_item(item_id: int, db: AsyncSession = Depends(get_async_db)):
+    repo = AsyncInventoryItemRepository(db)
+    db_item = await repo.get_by_id_with_details(item_id)
     if db_item is None:
         raise HTTPException(status_code=404, detail="Item not found")
     return db_item
 
 
+@router.get("/inventory/items/{item_id}/photo")
+def read_item_photo(item_id: int, request: Request, thumbnail: bool = False, db: Session = Depends(get_db)):
+    repo = InventoryItemRepository(db)
+    return image_response(
+        request, db, repo.get_photo_key(item_id), lambda: repo.get_photo(item_id),
+        thumbnail=thumbnail, not_found="Photo not found"
+    )
+
+
 @router.put("/inventory/items/{item_id}", response_model=InventoryItemResponse)
 def update_item(item_id: int, item: InventoryItemUpdate, db: Session = Depends(get_db)):
     repo = InventoryItemRepository(db)
@@ -351,6 +573,11 @@ def update_item(item_id: int, item: InventoryItemUpdate, db: Session = Depends(g
             )
 
     update_data = item.dict(exclude_unset=True, exclude={"condition"})
+    if "photo" in update_data:
+        photo = update_data.pop("photo")
+        db_item.photo_key = store_image(db, photo) if photo else None
+        db_item.photo = None
+
     for key, value in update_data.items():
         setattr(db_item, key, value)
 
@@ -383,7 +610,11 @@ def write_off_item(item_id: int, db: Session = Depends(get_db)):
 
 
 @router.post("/consumables/", response_model=ConsumableResponse)
-def create_consumable(consumable: ConsumableCreate, db: Session = Depends(get_db)):
+def create_consumable(
+        consumable: ConsumableCreate,
+        session: dict = Depends(get_current_session),
+        db: Session = Depends(get_db)
+):
     repo = ConsumableRepository(db)
     new_consumable = Consumable.create(
         name=consumable.name,
@@ -392,32 +623,56 @@ def create_consumable(consumable: ConsumableCreate, db: Session = Depends(get_db
         min_quantity=consumable.min_quantity,
         unit=consumable.unit
     )
-    return repo.create(new_consumable)
+    return repo.create(new_consumable, user_id=session.get("user_id"))
 
 
-@router.get("/consumables/", response_model=List[ConsumableResponse])
-def read_consumables(db: Session = Depends(get_db)):
-    repo = ConsumableRepository(db)
-    return repo.get_all()
+@router.get("/consumables/", response_model=Union[List[ConsumableResponse], ConsumablePage],
+            dependencies=[Depends(consumables_conditional)])
+async def read_consumables(response: Response, skip: int = 0, limit: int = Query(100, ge=1, le=LIST_MAX_LIMIT),
+                           cursor: Optional[str] = None, total: TotalMode = TotalMode.NONE,
+                           db: AsyncSession = Depends(get_async_db)):
+    repo = AsyncConsumableRepository(db)
+    if cursor is None:
+        return fast_json(await repo.get_all(skip=skip, limit=limit), response)
 
+    consumables = await repo.get_page(after_id=_id_cursor(cursor), limit=limit + 1)
+    count, estimated = await repo.count(total)
+    return fast_json(build_page(consumables, limit, key=lambda consumable: [consumable.id],
+                                total=count, total_estimated=estimated), response)
 
-@router.get("/consumables/low_stock/", response_model=List[ConsumableResponse])
-def read_low_stock_consumables(db: Session = Depends(get_db)):
-    repo = ConsumableRepository(db)
-    return repo.get_low_stock()
 
+@router.get("/consumables/stream")
+async def stream_consumables():
+    return ndjson_response(
+        lambda db: AsyncConsumableRepository(db).stream(NDJSON_FETCH_SIZE), ConsumableResponse, "consumables.ndjson"
+    )
 
-@router.get("/consumables/{consumable_id}", response_model=ConsumableResponse)
-def read_consumable(consumable_id: int, db: Session = Depends(get_db)):
-    repo = ConsumableRepository(db)
-    db_consumable = repo.get_by_id(consumable_id)
+
+@router.get("/consumables/low_stock/", response_model=List[ConsumableResponse],
+            dependencies=[Depends(consumables_conditional)])
+async def read_low_stock_consumables(response: Response, limit: int = Query(LIST_MAX_LIMIT, ge=1, le=LIST_MAX_LIMIT),
+                                     db: AsyncSession = Depends(get_async_db)):
+    # Заканчивающихся расходников обычно немного: одна страница без курсора
+    repo = AsyncConsumableRepository(db)
+    return fast_json(await repo.get_low_stock(limit=limit), response)
+
+
+@router.get("/consumables/{consumable_id}", response_model=ConsumableResponse, dependencies=[Depends(consumables_conditional)])
+async def read_consumable(consumable_id: int, db: AsyncSession = Depends(get_async_db)):
+    repo = AsyncConsumableRepository(db)
+    db_consumable = await repo.get_by_id(consumable_id)
     if db_consumable is None:
         raise HTTPException(status_code=404, detail="Consumable not found")
     return db_consumable
 
 
 @router.put("/consumables/{consumable_id}", response_model=ConsumableResponse)
-def update_consumable(consumable_id: int, consumable: ConsumableUpdate, db: Session = Depends(get_db)):
+def update_consumable(
+        consumable_id: int,
+        consumable: ConsumableUpdate,
+        session: dict = Depends(get_current_session),
+        db: Session = Depends(get_db)
+):
     repo = ConsumableRepository(db)
     db_consumable = repo.get_by_id(consumable_id)
     if db_consumable is None:
@@ -426,7 +681,50 @@ def update_consumable(consumable_id: int, consumable: ConsumableUpdate, db: Sess
     for key, value in consumable.dict(exclude_unset=True).items():
         setattr(db_consumable, key, value)
 
-    return repo.update(db_consumable)
+    return repo.update(db_consumable, user_id=session.get("user_id"))
+
+
+@router.get("/consumables/{consumable_id}/movements", response_model=ConsumableMovementPage,
+            dependencies=[Depends(movements_conditional)])
+def read_consumable_movements(consumable_id: int, cursor: Optional[str] = None,
+                              limit: int = Query(100, ge=1, le=LIST_MAX_LIMIT), db: Session = Depends(get_db)):
+    if ConsumableRepository(db).get_by_id(consumable_id) is None:
+        raise HTTPException(status_code=404, detail="Consumable not found")
+    before_id = _id_cursor(cursor)
+    movements = ConsumableMovementRepository(db).get_page(consumable_id, before_id=before_id, limit=limit + 1)
+    return build_page(movements, limit, key=lambda movement: [movement.id])
+
+
+@router.get("/consumables/{consumable_id}/stock", response_model=ConsumableStockAt)
+def read_consumable_stock_at(consumable_id: int, at: datetime, db: Session = Depends(get_db)):
+    if ConsumableRepository(db).get_by_id(consumable_id) is None:
+        raise HTTPException(status_code=404, detail="Consumable not found")
+    if at.tzinfo is None:
+        # Время без пояса считаем московским, как и даты в журнале
+        at = timezone('Europe/Moscow').localize(at)
+    quantity = ConsumableMovementRepository(db).get_stock_at(consumable_id, at)
+    return {"id": consumable_id, "at": at, "quantity": quantity}
+
+
+@router.get("/consumables/{consumable_id}/consumption", response_model=ConsumableConsumption)
+def read_consumable_consumption(consumable_id: int, days: int = 30, db: Session = Depends(get_db)):
+    if days <= 0:
+        raise HTTPException(status_code=400, detail="Days must be positive")
+    db_consumable = ConsumableRepository(db).get_by_id(consumable_id)
+    if db_consumable is None:
+        raise HTTPException(status_code=404, detail="Consumable not found")
+
+    until = datetime.now(timezone('Europe/Moscow'))
+    consumed = ConsumableMovementRepository(db).get_consumed(consumable_id, until - timedelta(days=days), until)
+    per_day = consumed / days
+    return {
+        "id": consumable_id,
+        "days": days,
+        "consumed": consumed,
+        "per_day": round(per_day, 3),
+        "quantity": db_consumable.quantity,
+        "days_left": round(db_consumable.quantity / per_day, 1) if per_day else None,
+    }
 
 
 @router.delete("/consumables/{consumable_id}")
@@ -446,108 +744,255 @@ class AmountRequest(BaseModel):
 @router.post("/consumables/increase")
 def increase_consumable(
     request: AmountRequest,
+    session: dict = Depends(get_current_session),
     db: Session = Depends(get_db)
 ):
-    repo = ConsumableRepository(db)
-    db_consumable = repo.get_by_id(request.id)
-    if db_consumable is None:
+    if request.amount <= 0:
+        raise HTTPException(status_code=400, detail="Amount must be positive")
+
+    result = ConsumableRepository(db).increase_quantity(request.id, request.amount, user_id=session.get("user_id"))
+    if result is None:
         raise HTTPException(status_code=404, detail="Consumable not found")
-    repo.increase_quantity(request.id, request.amount)
-    return {"message": f"Quantity increased by {request.amount}"}
+    name, new_quantity = result
+    audit_log.submit(Log.create(
+        description=f"Consumable {name} increased by {request.amount}",
+        type=LogType.INFO.value,
+        related_entity_link=f"/consumables/{request.id}",
+        user_id=session.get("user_id")
+    ))
+    return {"message": f"Quantity increased by {request.amount}", "new_quantity": new_quantity}
 
 
 @router.post("/consumables/decrease")
 def decrease_consumable(
         request: AmountRequest,
+        session: dict = Depends(get_current_session),
         db: Session = Depends(get_db)
 ):
-    repo = ConsumableRepository(db)
-    db_consumable = repo.get_by_id(request.id)
+    if request.amount <= 0:
+        raise HTTPException(status_code=400, detail="Amount must be positive")
 
-    if db_consumable is None:
-        raise HTTPException(status_code=404, detail="Consumable not found")
-
-    if db_consumable.quantity < request.amount:
+    repo = ConsumableRepository(db)
+    result = repo.decrease_quantity(request.id, request.amount, user_id=session.get("user_id"))
+    if result is None:
+        # Строку не изменили: либо ее нет, либо остатка не хватает — выясняем только в этом случае
+        current = repo.get_quantities([request.id]).get(request.id)
+        if current is None:
+            raise HTTPException(status_code=404, detail="Consumable not found")
         raise HTTPException(
             status_code=400,
-            detail=f"Cannot decrease by {request.amount}. Current quantity is {db_consumable.quantity}"
+            detail=f"Cannot decrease by {request.amount}. Current quantity is {current}"
         )
 
-    repo.decrease_quantity(request.id, request.amount)
+    name, new_quantity = result
+    audit_log.submit(Log.create(
+        description=f"Consumable {name} decreased by {request.amount}",
+        type=LogType.INFO.value,
+        related_entity_link=f"/consumables/{request.id}",
+        user_id=session.get("user_id")
+    ))
 
     return {
         "message": f"Quantity decreased by {request.amount}",
-        "new_quantity": db_consumable.quantity - request.amount
+        "new_quantity": new_quantity
     }
 
 
-@router.get("/logs/", response_model=List[LogResponse])
-def read_logs(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    repo = LogRepository(db)
-    return repo.get_all(skip=skip, limit=limit)
+@router.post("/consumables/adjust", response_model=ConsumableAdjustResult)
+def adjust_consumables(
+        request: ConsumableAdjustRequest,
+        session: dict = Depends(get_current_session),
+        db: Session = Depends(get_db)
+):
+    """
+    Поступление и списание нескольких расходников в одной транзакции:
+    либо применяются все изменения, либо ни одно
+    """
+    deltas = {}
+    for row in request.items:
+        deltas[row.id] = deltas.get(row.id, 0) + row.delta
 
+    repo = ConsumableRepository(db)
+    results = repo.adjust_quantities(deltas, user_id=session.get("user_id"))
+    failed = [consumable_id for consumable_id in deltas if consumable_id not in results]
+    if failed:
+        db.rollback()
+        current = repo.get_quantities(failed)
+        raise HTTPException(status_code=400, detail=[
+            {
+                "id": consumable_id,
+                "detail": "Consumable not found" if consumable_id not in current else
+                f"Cannot decrease by {-deltas[consumable_id]}. Current quantity is {current[consumable_id]}"
+            }
+            for consumable_id in failed
+        ])
+    db.commit()
+
+    audit_log.submit(Log.create(
+        description="Consumables adjusted: " + ", ".join(
+            f"{name} {deltas[consumable_id]:+d}" for consumable_id, (name, _) in results.items()
+        ),
+        type=LogType.INFO.value,
+        related_entity_link="/consumables/",
+        user_id=session.get("user_id")
+    ))
+    return {
+        "items": [
+            {"id": consumable_id, "name": name, "quantity": quantity}
+            for consumable_id, (name, quantity) in results.items()
+        ]
+    }
+
+
+@router.get("/logs/", response_model=Union[List[LogResponse], LogPage],
+            dependencies=[Depends(require_admin), Depends(logs_conditional)])
+async def read_logs(response: Response, skip: int = 0, limit: int = Query(100, ge=1, le=LIST_MAX_LIMIT),
+                    cursor: Optional[str] = None, type: Optional[int] = None, user_id: Optional[int] = None,
+                    total: TotalMode = TotalMode.NONE, db: AsyncSession = Depends(get_async_db)):
+    repo = AsyncLogRepository(db)
+    conditions = AsyncLogRepository.filter_conditions(log_type=type, user_id=user_id)
+    if cursor is None:
+        return fast_json(await repo.get_all(skip=skip, limit=limit, conditions=conditions), response)
+
+    logs = await repo.get_page(before=_created_at_cursor(cursor), limit=limit + 1, conditions=conditions)
+    count, estimated = await repo.count(total, conditions)
+    return fast_json(build_page(logs, limit, key=lambda log: [log.created_at.isoformat(), log.id],
+                                total=count, total_estimated=estimated), response)
+
+
+@router.get("/logs/stream", dependencies=[Depends(require_admin)])
+async def stream_logs(type: Optional[int] = None, user_id: Optional[int] = None,
+                      date_from: Optional[datetime] = None, date_to: Optional[datetime] = None):
+    conditions = AsyncLogRepository.filter_conditions(type, user_id, date_from, date_to)
+    return ndjson_response(
+        lambda db: AsyncLogRepository(db).stream(conditions, NDJSON_FETCH_SIZE), LogResponse, "logs.ndjson"
+    )
 
-@router.get("/logs/{log_id}", response_model=LogResponse)
-def read_log(log_id: int, db: Session = Depends(get_db)):
-    repo = LogRepository(db)
-    db_log = repo.get_by_id(log_id)
+
+@router.get("/logs/{log_id}", response_model=LogResponse,
+            dependencies=[Depends(require_admin), Depends(logs_conditional)])
+async def read_log(log_id: int, db: AsyncSession = Depends(get_async_db)):
+    repo = AsyncLogRepository(db)
+    db_log = await repo.get_by_id(log_id)
     if db_log is None:
         raise HTTPException(status_code=404, detail="Log not found")
     return db_log
 
+@router.post("/import/{kind}", status_code=202, dependencies=[Depends(require_admin)])
+def start_import(
+        kind: ImportKind,
+        file: UploadFile = File(...),
+        session: dict = Depends(get_current_session)
+):
+    return import_jobs.submit(kind, file, session.get("user_id")).to_dict()
+
+
+@router.get("/import/{job_id}", dependencies=[Depends(require_admin)])
+def read_import(job_id: str):
+    job = import_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Import job not found")
+    return job.to_dict()
+
+
+@router.get("/metrics/audit_log", dependencies=[Depends(require_admin)])
+def read_audit_log_metrics():
+    return audit_log.metrics()
+
+
+@router.get("/metrics/auth_executor", dependencies=[Depends(require_admin)])
+def read_auth_executor_metrics():
+    return auth_executor.metrics()
+
+
+@router.get("/metrics/db_pool", dependencies=[Depends(require_admin)])
+def read_db_pool_metrics():
+    return all_pool_metrics()
+
+
+@router.get("/metrics/reference_cache", dependencies=[Depends(require_admin)])
+def read_reference_cache_metrics():
+    return reference_cache.stats()
+
+
+def _check_report_access(report_type: ReportType, session: dict):
+    if report_type in ADMIN_REPORTS and not session.get("is_admin"):
+        raise HTTPException(status_code=403, detail="Admin privileges required")
+
+
 @router.get("/reports/excel")
 def generate_excel_report(
         report_type: ReportType,
         condition: Optional[str] = None,
+        date_from: Optional[datetime] = None,
+        date_to: Optional[datetime] = None,
+        session: dict = Depends(get_current_session),
         db: Session = Depends(get_db)
 ):
-    wb = Workbook()
-    ws = wb.active
-
-    title_font = Font(bold=True, size=12)
-    header_font = Font(bold=True, size=11, color="FFFFFF")
-    header_fill = PatternFill(start_color="4F81BD", end_color="4F81BD", fill_type="solid")
-    header_alignment = Alignment(horizontal="center", vertical="center", wrap_text=True)
-
-    thin_border = Border(
-        left=Side(style="thin"),
-        right=Side(style="thin"),
-        top=Side(style="thin"),
-        bottom=Side(style="thin")
-    )
-
-    if report_type == ReportType.USERS:
-        generate_users_report(ws, db, title_font, header_font, header_fill, header_alignment, thin_border)
-    elif report_type == ReportType.ROOMS:
-        generate_rooms_report(ws, db, title_font, header_font, header_fill, header_alignment, thin_border)
-    elif report_type == ReportType.INVENTORY_CATEGORIES:
-        generate_categories_report(ws, db, title_font, header_font, header_fill, header_alignment, thin_border)
-    elif report_type == ReportType.INVENTORY_ITEMS:
-        generate_inventory_items_report(ws, db, title_font, header_font, header_fill, header_alignment, thin_border)
-    elif report_type == ReportType.CONSUMABLES:
-        generate_consumables_report(ws, db, title_font, header_font, header_fill, header_alignment, thin_border)
-    elif report_type == ReportType.LOGS:
-        generate_logs_report(ws, db, title_font, header_font, header_fill, header_alignment, thin_border)
-    elif report_type == ReportType.LOW_STOCK:
-        generate_low_stock_report(ws, db, title_font, header_font, header_fill, header_alignment, thin_border)
-    elif report_type == ReportType.INVENTORY_BY_CONDITION:
-        if not condition:
-            raise HTTPException(status_code=400,
-                                detail="Condition parameter is required for inventory_by_condition report")
-        generate_inventory_by_condition_report(ws, db, condition, title_font, header_font, header_fill,
-                                               header_alignment, thin_border)
-
-    buffer = io.BytesIO()
-    wb.save(buffer)
-    buffer.seek(0)
+    _check_report_access(report_type, session)
+    report = build_report(db, report_type, condition, date_from, date_to)
+    chunks, size = stream_report(report)
 
     filename = f"{report_type}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
     headers = {
-        'Content-Disposition': f'attachment; filename="{filename}"'
+        'Content-Disposition': f'attachment; filename="{filename}"',
+        'Content-Length': str(size)
     }
 
-    return Response(
-        content=buffer.getvalue(),
-        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    return StreamingResponse(
+        chunks,
+        media_type=XLSX_MEDIA_TYPE,
         headers=headers
     )
+
+
+def _report_job_of(job: Optional[dict], session: dict) -> dict:
+    # Задача общая для одинаковых запросов разных пользователей: доступ — по типу отчета, а не по автору
+    if job is None:
+        raise HTTPException(status_code=404, detail="Report job not found")
+    _check_report_access(ReportType(job["report_type"]), session)
+    return job
+
+
+def _report_job(request: Request, job: dict) -> dict:
+    if job["status"] == "done" and not job["expired"]:
+        job["download_url"] = request.app.url_path_for("download_report_job", job_id=job["id"])
+    return job
+
+
+@router.post("/reports/jobs", status_code=202)
+def create_report_job(
+        report_job: ReportJobCreate,
+        request: Request,
+        session: dict = Depends(get_current_session)
+):
+    _check_report_access(report_job.report_type, session)
+    # Такой же запрос, уже стоящий в очереди или выполняемый, вернет ту же задачу
+    job = report_jobs.submit(
+        report_job.report_type, report_job.condition, report_job.date_from, report_job.date_to,
+        session.get("user_id")
+    )
+    return _report_job(request, job)
+
+
+@router.get("/reports/jobs/{job_id}")
+async def read_report_job(job_id: str, request: Request,
+                          wait: float = Query(0, ge=0, le=REPORT_JOB_MAX_WAIT_SECONDS),
+                          session: dict = Depends(get_current_session)):
+    job = _report_job_of(await report_jobs.wait(job_id, wait), session)
+    return _report_job(request, job)
+
+
+@router.get("/reports/jobs/{job_id}/file", name="download_report_job")
+def download_report_job(job_id: str, session: dict = Depends(get_current_session)):
+    job = _report_job_of(report_jobs.get(job_id), session)
+    if job["expired"]:
+        raise HTTPException(status_code=410, detail="Report file has expired")
+    if job["status"] != "done":
+        raise HTTPException(status_code=409, detail=f"Report is not ready: {job['status']}")
+    return FileResponse(report_jobs.file_path(job_id), media_type=XLSX_MEDIA_TYPE, filename=job["filename"])
+
+
+@router.get("/metrics/report_jobs", dependencies=[Depends(require_admin)])
+def read_report_jobs_metrics():
+    return report_jobs.metrics()
@@ -1,12 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy.orm import Session
 from datetime import datetime, timedelta
 import random
 import logging
 from typing import List
-import bcrypt
 
+from backend.configurations.config import JWT_COOKIE_NAME
 from backend.configurations.database import get_db
+from backend.configurations.fastapi_utils import get_current_session, require_admin
 from backend.core.entities import (
     User, Room, InventoryCategory, InventoryItem,
     Consumable, Log, InventoryCondition, LogType
@@ -15,24 +16,27 @@ from backend.core.repositories import (
     UserRepository, RoomRepository, InventoryCategoryRepository,
     InventoryItemRepository, ConsumableRepository, LogRepository
 )
+from backend.services.security import hash_data
 
 logger = logging.getLogger(__name__)
 init_router = APIRouter(prefix="/init", tags=["initialization"])
 
 
-def hash_data(data: str) -> str:
+async def require_bootstrap_or_admin(request: Request, db: Session = Depends(get_db)):
     """
-    Хеширует данные с помощью bcrypt
+    Пустую базу можно заполнить без входа: пользователей, а значит и администраторов, в ней еще нет.
+    Когда пользователи появились, инициализация доступна только администратору
     """
-    salt = bcrypt.gensalt(rounds=12)
-    hashed = bcrypt.hashpw(data.encode('utf-8'), salt)
-    return hashed.decode('utf-8')
+    if not UserRepository(db).get_all(limit=1):
+        return
+    await require_admin(await get_current_session(request.cookies.get(JWT_COOKIE_NAME)))
 
 
-@init_router.post("/database", summary="Инициализация базы данных тестовыми данными")
+@init_router.post("/database", summary="Инициализация базы данных тестовыми данными",
+                  dependencies=[Depends(require_bootstrap_or_admin)])
 async def initialize_database(
         db: Session = Depends(get_db),
-        force: bool = True,
+        force: bool = False,
         create_users: bool = True,
         create_rooms: bool = True,
         create_categories: bool = True,
@@ -112,6 +116,8 @@ async def initialize_database(
             "details": result
         }
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Ошибка инициализации базы данных: {str(e)}", exc_info=True)
         raise HTTPException(
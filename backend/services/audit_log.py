@@ -0,0 +1,181 @@
+import logging
+import queue
+import threading
+import time
+from datetime import datetime
+from typing import List, Optional
+
+from pytz import timezone
+
+from backend.configurations.config import (
+    AUDIT_LOG_QUEUE_SIZE, AUDIT_LOG_BATCH_SIZE,
+    AUDIT_LOG_FLUSH_INTERVAL_MS, AUDIT_LOG_PUT_TIMEOUT_MS
+)
+from backend.configurations.database import SessionLocal
+from backend.core.entities import Log
+from backend.core.repositories import LogRepository
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class AuditLogWriter:
+    """
+    Фоновая запись журнала: записи попадают в ограниченную очередь,
+    рабочий поток сбрасывает их пачками (многострочный INSERT)
+    раз в flush_interval_ms или по набору batch_size записей.
+
+    Если очередь переполнена дольше put_timeout_ms, запись выполняется
+    синхронно в вызывающем потоке, чтобы журнал не терялся
+    """
+
+    def __init__(
+            self,
+            session_factory=SessionLocal,
+            max_queue_size: int = AUDIT_LOG_QUEUE_SIZE,
+            batch_size: int = AUDIT_LOG_BATCH_SIZE,
+            flush_interval_ms: int = AUDIT_LOG_FLUSH_INTERVAL_MS,
+            put_timeout_ms: int = AUDIT_LOG_PUT_TIMEOUT_MS
+    ):
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval_ms / 1000
+        self.put_timeout = put_timeout_ms / 1000
+        self._queue = queue.Queue(maxsize=max_queue_size)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._stats = {
+            "enqueued": 0,
+            "written": 0,
+            "batches": 0,
+            "failed": 0,
+            "sync_fallbacks": 0,
+            "queue_high_watermark": 0,
+            "last_batch_size": 0,
+            "last_flush_ms": 0.0,
+        }
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if self.running:
+            return
+        self._thread = threading.Thread(target=self._run, name="audit-log-writer", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 10.0):
+        """
+        Останавливает рабочий поток, предварительно записав все накопленные записи
+        """
+        if not self.running:
+            return
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+        self._thread = None
+
+    def submit(self, log: Log):
+        row = self._to_row(log)
+        if not self.running:
+            self._write([row])
+            return
+
+        try:
+            self._queue.put(row, timeout=self.put_timeout)
+        except queue.Full:
+            self._count("sync_fallbacks")
+            self._write([row])
+            return
+
+        with self._lock:
+            self._stats["enqueued"] += 1
+            depth = self._queue.qsize()
+            if depth > self._stats["queue_high_watermark"]:
+                self._stats["queue_high_watermark"] = depth
+
+    def metrics(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+        stats.update({
+            "running": self.running,
+            "queue_depth": self._queue.qsize(),
+            "queue_capacity": self._queue.maxsize,
+            "batch_size": self.batch_size,
+            "flush_interval_ms": int(self.flush_interval * 1000),
+        })
+        return stats
+
+    @staticmethod
+    def _to_row(log: Log) -> dict:
+        # created_at фиксируется в момент события, а не в момент записи пачки
+        return {
+            "description": log.description,
+            "type": log.type,
+            "related_entity_link": log.related_entity_link,
+            "user_id": log.user_id,
+            "created_at": log.created_at or datetime.now(timezone('Europe/Moscow')),
+        }
+
+    def _count(self, key: str, value: int = 1):
+        with self._lock:
+            self._stats[key] += value
+
+    def _write(self, rows: List[dict]):
+        started = time.perf_counter()
+        db = self.session_factory()
+        try:
+            LogRepository(db).create_many(rows)
+        except Exception:
+            db.rollback()
+            self._count("failed", len(rows))
+            logger.error(f"Ошибка записи журнала ({len(rows)} записей)", exc_info=True)
+            return
+        finally:
+            db.close()
+
+        with self._lock:
+            self._stats["written"] += len(rows)
+            self._stats["batches"] += 1
+            self._stats["last_batch_size"] = len(rows)
+            self._stats["last_flush_ms"] = round((time.perf_counter() - started) * 1000, 3)
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is _STOP:
+                break
+
+            batch = [item]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            self._write(batch)
+
+        # Дописываем то, что успели положить в очередь до остановки
+        rest = []
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not _STOP:
+                rest.append(item)
+        for start in range(0, len(rest), self.batch_size):
+            self._write(rest[start:start + self.batch_size])
+
+
+audit_log = AuditLogWriter()
@@ -0,0 +1,153 @@
+import base64
+import binascii
+import hashlib
+from typing import Callable, Iterator, Optional, Tuple
+
+from fastapi import HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
+
+from backend.services.blob_store import BLOB_CHUNK_SIZE
+
+# (первый байт, последний байт) -> куски содержимого
+RangeReader = Callable[[int, int], Iterator[bytes]]
+
+_IMAGE_SIGNATURES = (
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"GIF87a", "image/gif"),
+    (b"GIF89a", "image/gif"),
+    (b"BM", "image/bmp"),
+)
+
+
+def guess_media_type(data: bytes) -> str:
+    for signature, media_type in _IMAGE_SIGNATURES:
+        if data.startswith(signature):
+            return media_type
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "image/webp"
+    return "application/octet-stream"
+
+
+def decode_stored_image(data: bytes) -> Tuple[bytes, str]:
+    """
+    Возвращает байты изображения и его тип.
+    Фронтенд присылает файлы строкой (data URL или голый base64),
+    и в старых записях лежит именно этот текст — раскодируем его
+    """
+    if data.startswith(b"data:") and b";base64," in data[:100]:
+        header, payload = data.split(b",", 1)
+        try:
+            decoded = base64.b64decode(payload, validate=True)
+        except binascii.Error:
+            return data, guess_media_type(data)
+        return decoded, header[5:].split(b";", 1)[0].decode() or guess_media_type(decoded)
+
+    if guess_media_type(data) == "application/octet-stream":
+        try:
+            decoded = base64.b64decode(data, validate=True)
+        except binascii.Error:
+            return data, "application/octet-stream"
+        if guess_media_type(decoded) != "application/octet-stream":
+            return decoded, guess_media_type(decoded)
+
+    return data, guess_media_type(data)
+
+
+def make_etag(data: bytes) -> str:
+    return f'"{hashlib.sha256(data).hexdigest()}"'
+
+
+def etag_matches(header: Optional[str], etag: str) -> bool:
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    tags = [tag.strip() for tag in header.split(",")]
+    return etag in tags or f"W/{etag}" in tags
+
+
+def parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """
+    Разбирает заголовок Range (один диапазон байтов).
+    None — заголовок не поддерживается и отдается весь файл,
+    ValueError — диапазон за пределами файла (416)
+    """
+    unit, _, spec = header.partition("=")
+    if unit.strip() != "bytes" or "," in spec:
+        return None
+    start, _, end = spec.strip().partition("-")
+    if not (start.isdigit() or end.isdigit()) or not (start.isdigit() or start == "") \
+            or not (end.isdigit() or end == ""):
+        return None
+
+    if start == "":
+        length = int(end)
+        if length == 0:
+            raise ValueError("Range not satisfiable")
+        return max(size - length, 0), size - 1
+
+    first = int(start)
+    if first >= size:
+        raise ValueError("Range not satisfiable")
+    last = int(end) if end else size - 1
+    if last < first:
+        return None
+    return first, min(last, size - 1)
+
+
+def _memory_reader(data: bytes) -> RangeReader:
+    view = memoryview(data)
+
+    def read(first: int, last: int) -> Iterator[bytes]:
+        for offset in range(first, last + 1, BLOB_CHUNK_SIZE):
+            yield bytes(view[offset:min(offset + BLOB_CHUNK_SIZE, last + 1)])
+
+    return read
+
+
+def blob_response(request: Request, stored: Optional[bytes], not_found: str) -> Response:
+    """
+    Отдает изображение, хранящееся прямо в строке таблицы
+    """
+    if not stored:
+        raise HTTPException(status_code=404, detail=not_found)
+
+    data, media_type = decode_stored_image(stored)
+    return send_blob(request, len(data), _memory_reader(data), media_type, make_etag(data))
+
+
+def send_blob(request: Request, size: int, read: RangeReader, media_type: str, etag: str) -> Response:
+    """
+    Отдает blob с ETag (304 по If-None-Match) и поддержкой Range (206).
+    Содержимое читается через read кусками, целиком в память не загружается
+    """
+    headers = {
+        "ETag": etag,
+        "Accept-Ranges": "bytes",
+        # Содержимое доступно только после входа, но может кешироваться браузером с проверкой ETag
+        "Cache-Control": "private, no-cache",
+    }
+
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    byte_range = None
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if range_header and (if_range is None or if_range.strip() == etag):
+        try:
+            byte_range = parse_range(range_header, size)
+        except ValueError:
+            return Response(status_code=416, headers={**headers, "Content-Range": f"bytes */{size}"})
+
+    status_code = 200
+    first, last = 0, size - 1
+    if byte_range is not None:
+        first, last = byte_range
+        status_code = 206
+        headers["Content-Range"] = f"bytes {first}-{last}/{size}"
+
+    headers["Content-Length"] = str(last - first + 1)
+    content = read(first, last) if size else iter(())
+    return StreamingResponse(content, status_code=status_code, media_type=media_type, headers=headers)
@@ -0,0 +1,239 @@
+import hashlib
+import os
+import tempfile
+from abc import ABC, abstractmethod
+from datetime import datetime, timezone
+from typing import Iterator, Optional
+
+from backend.configurations.config import (
+    BLOB_STORE_BACKEND, BLOB_STORE_LOCAL_PATH,
+    BLOB_STORE_S3_BUCKET, BLOB_STORE_S3_PREFIX, BLOB_STORE_S3_ENDPOINT_URL
+)
+
+BLOB_CHUNK_SIZE = 64 * 1024
+
+
+def blob_key(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+class BlobStore(ABC):
+    """
+    Хранилище неизменяемых blob'ов, адресуемых SHA-256 содержимого.
+    Одинаковые данные дают один ключ и хранятся один раз
+    """
+
+    def put(self, data: bytes, key: Optional[str] = None) -> str:
+        key = key or blob_key(data)
+        if self.exists(key):
+            # Blob мог остаться от откатившейся транзакции: обновляем время изменения,
+            # чтобы сборка мусора (images.collect_orphan_blobs) не удалила его до коммита
+            self._touch(key)
+        else:
+            self._write(key, data)
+        return key
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[bytes]:
+        ...
+
+    @abstractmethod
+    def size(self, key: str) -> Optional[int]:
+        """
+        Размер blob'а в байтах, None — blob'а нет
+        """
+
+    @abstractmethod
+    def iter_range(self, key: str, first: int, last: int) -> Iterator[bytes]:
+        """
+        Байты first..last (включительно) кусками по BLOB_CHUNK_SIZE
+        """
+
+    @abstractmethod
+    def iter_keys(self, modified_before: datetime) -> Iterator[str]:
+        """
+        Ключи blob'ов, записанных (или обновленных put) раньше modified_before
+        """
+
+    @abstractmethod
+    def exists(self, key: str) -> bool:
+        ...
+
+    @abstractmethod
+    def delete(self, key: str):
+        ...
+
+    @abstractmethod
+    def _write(self, key: str, data: bytes):
+        ...
+
+    @abstractmethod
+    def _touch(self, key: str):
+        ...
+
+
+class LocalBlobStore(BlobStore):
+    """
+    Файлы в каталоге root, разложенные по подкаталогам ab/cd/<ключ>
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, key[:2], key[2:4], key)
+
+    def get(self, key: str) -> Optional[bytes]:
+        try:
+            with open(self._path(key), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def size(self, key: str) -> Optional[int]:
+        try:
+            return os.path.getsize(self._path(key))
+        except FileNotFoundError:
+            return None
+
+    def iter_range(self, key: str, first: int, last: int) -> Iterator[bytes]:
+        with open(self._path(key), "rb") as f:
+            f.seek(first)
+            remaining = last - first + 1
+            while remaining > 0:
+                chunk = f.read(min(BLOB_CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                yield chunk
+
+    def iter_keys(self, modified_before: datetime) -> Iterator[str]:
+        threshold = modified_before.timestamp()
+        for directory, _, names in os.walk(self.root):
+            for name in names:
+                if name.startswith(".tmp-"):
+                    continue
+                try:
+                    modified = os.path.getmtime(os.path.join(directory, name))
+                except FileNotFoundError:
+                    continue
+                if modified < threshold:
+                    yield name
+
+    def exists(self, key: str) -> bool:
+        return os.path.exists(self._path(key))
+
+    def delete(self, key: str):
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def _write(self, key: str, data: bytes):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Пишем во временный файл и переименовываем: читатель не увидит недописанный blob
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def _touch(self, key: str):
+        try:
+            os.utime(self._path(key))
+        except FileNotFoundError:
+            pass
+
+
+class S3BlobStore(BlobStore):
+    """
+    Хранилище в S3-совместимом бакете. Клиент — любой объект с методами
+    put_object/get_object/head_object/delete_object в стиле boto3
+    (AWS S3, MinIO, localstack)
+    """
+
+    def __init__(self, client, bucket: str, prefix: str = ""):
+        self.client = client
+        self.bucket = bucket
+        self.prefix = prefix
+
+    def _object_key(self, key: str) -> str:
+        return f"{self.prefix}{key}"
+
+    def get(self, key: str) -> Optional[bytes]:
+        try:
+            response = self.client.get_object(Bucket=self.bucket, Key=self._object_key(key))
+        except self.client.exceptions.NoSuchKey:
+            return None
+        return response["Body"].read()
+
+    def size(self, key: str) -> Optional[int]:
+        try:
+            response = self.client.head_object(Bucket=self.bucket, Key=self._object_key(key))
+        except self.client.exceptions.ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return None
+            raise
+        return response["ContentLength"]
+
+    def iter_range(self, key: str, first: int, last: int) -> Iterator[bytes]:
+        response = self.client.get_object(
+            Bucket=self.bucket, Key=self._object_key(key), Range=f"bytes={first}-{last}"
+        )
+        body = response["Body"]
+        try:
+            yield from body.iter_chunks(BLOB_CHUNK_SIZE)
+        finally:
+            body.close()
+
+    def iter_keys(self, modified_before: datetime) -> Iterator[str]:
+        if modified_before.tzinfo is None:
+            modified_before = modified_before.replace(tzinfo=timezone.utc)
+        paginator = self.client.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=self.prefix):
+            for obj in page.get("Contents", []):
+                if obj["LastModified"] < modified_before:
+                    yield obj["Key"][len(self.prefix):]
+
+    def exists(self, key: str) -> bool:
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=self._object_key(key))
+        except self.client.exceptions.ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return False
+            raise
+        return True
+
+    def delete(self, key: str):
+        self.client.delete_object(Bucket=self.bucket, Key=self._object_key(key))
+
+    def _write(self, key: str, data: bytes):
+        self.client.put_object(Bucket=self.bucket, Key=self._object_key(key), Body=data)
+
+    def _touch(self, key: str):
+        # Копия объекта в себя обновляет LastModified
+        object_key = self._object_key(key)
+        self.client.copy_object(
+            Bucket=self.bucket, Key=object_key,
+            CopySource={"Bucket": self.bucket, "Key": object_key},
+            MetadataDirective="REPLACE"
+        )
+
+
+def create_blob_store(backend: str = BLOB_STORE_BACKEND) -> BlobStore:
+    if backend == "local":
+        return LocalBlobStore(BLOB_STORE_LOCAL_PATH)
+    if backend == "s3":
+        # boto3 нужен только для этого варианта; учетные данные — из стандартной цепочки boto3
+        import boto3
+        client = boto3.client("s3", endpoint_url=BLOB_STORE_S3_ENDPOINT_URL)
+        return S3BlobStore(client, BLOB_STORE_S3_BUCKET, BLOB_STORE_S3_PREFIX)
+    raise ValueError(f"Unknown blob store backend: {backend}")
+
+
+blob_store = create_blob_store()
@@ -0,0 +1,227 @@
+"""
+Сжатие ответов gzip / brotli.
+
+Кодировка выбирается по Accept-Encoding в порядке COMPRESSION_ENCODINGS. Сжимаются
+только типы из COMPRESSION_CONTENT_TYPES и только ответы не меньше COMPRESSION_MIN_SIZE.
+Потоковые ответы (NDJSON, StreamingResponse) сжимаются по частям: каждая часть
+сбрасывается клиенту сразу, тело целиком в памяти не собирается.
+
+Не сжимаются: ответы с Content-Encoding, Cache-Control: no-transform, 206 и HEAD,
+уже сжатые форматы (XLSX и другие ZIP-контейнеры, gzip, изображения) — в том числе
+по сигнатуре тела, если тип указан неточно
+"""
+import logging
+import zlib
+from typing import Iterable, Optional, Sequence
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from backend.configurations.config import (
+    COMPRESSION_ENCODINGS, COMPRESSION_MIN_SIZE, COMPRESSION_CONTENT_TYPES,
+    COMPRESSION_GZIP_LEVEL, COMPRESSION_BROTLI_QUALITY
+)
+
+logger = logging.getLogger(__name__)
+
+# Контейнеры, которые уже сжаты: повторное сжатие только тратит CPU
+_COMPRESSED_TYPES = (
+    "application/vnd.openxmlformats-officedocument.",
+    "application/zip", "application/gzip", "application/x-gzip",
+    "image/png", "image/jpeg", "image/gif", "image/webp",
+)
+_COMPRESSED_SIGNATURES = (b"PK\x03\x04", b"\x1f\x8b", b"\x89PNG", b"\xff\xd8\xff")
+
+
+class _GzipEncoder:
+    def __init__(self, level: int):
+        # wbits=31: формат gzip, а не «голый» zlib
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes, finish: bool) -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush(
+            zlib.Z_FINISH if finish else zlib.Z_SYNC_FLUSH
+        )
+
+
+class _BrotliEncoder:
+    def __init__(self, quality: int):
+        import brotli
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes, finish: bool) -> bytes:
+        chunk = self._compressor.process(data)
+        return chunk + (self._compressor.finish() if finish else self._compressor.flush())
+
+
+def available_encodings(encodings: Iterable[str]) -> list:
+    result = []
+    for encoding in encodings:
+        if encoding == "br":
+            try:
+                import brotli  # noqa: F401
+            except ImportError:
+                logger.warning("Пакет brotli не установлен: сжатие br отключено")
+                continue
+        elif encoding != "gzip":
+            raise ValueError(f"Unknown compression encoding: {encoding}")
+        result.append(encoding)
+    return result
+
+
+def choose_encoding(accept_encoding: str, encodings: Sequence[str]) -> Optional[str]:
+    """
+    Первая из encodings, которую клиент принимает (q > 0). Порядок задает сервер:
+    br жмет лучше gzip, и клиенты, принимающие оба, обычно ставят им одинаковый q
+    """
+    accepted = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        accepted[name] = quality
+    for encoding in encodings:
+        if accepted.get(encoding, accepted.get("*", 0.0)) > 0:
+            return encoding
+    return None
+
+
+def _media_type(headers: MutableHeaders) -> str:
+    return headers.get("content-type", "").split(";", 1)[0].strip().lower()
+
+
+def _allowed(media_type: str, content_types: Sequence[str]) -> bool:
+    if not media_type or media_type.startswith(_COMPRESSED_TYPES):
+        return False
+    for pattern in content_types:
+        if pattern.endswith("/*") and media_type.startswith(pattern[:-1]) or media_type == pattern:
+            return True
+    return False
+
+
+class CompressionMiddleware:
+    def __init__(self, app: ASGIApp, encodings: Sequence[str] = COMPRESSION_ENCODINGS,
+                 minimum_size: int = COMPRESSION_MIN_SIZE, content_types: Sequence[str] = COMPRESSION_CONTENT_TYPES,
+                 gzip_level: int = COMPRESSION_GZIP_LEVEL, brotli_quality: int = COMPRESSION_BROTLI_QUALITY):
+        self.app = app
+        self.encodings = available_encodings(encodings or ())
+        self.minimum_size = minimum_size
+        self.content_types = tuple(content_types)
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    def encoder(self, encoding: str):
+        if encoding == "br":
+            return _BrotliEncoder(self.brotli_quality)
+        return _GzipEncoder(self.gzip_level)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or not self.encodings:
+            await self.app(scope, receive, send)
+            return
+        encoding = None
+        if scope["method"] != "HEAD":
+            encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""), self.encodings)
+        await self.app(scope, receive, _CompressingSend(self, send, encoding))
+
+
+class _CompressingSend:
+    """
+    Начало ответа придерживается до первых minimum_size байт тела: только тогда
+    известно, стоит ли сжимать. Дальше части тела сжимаются и отправляются по мере поступления
+    """
+
+    def __init__(self, middleware: CompressionMiddleware, send: Send, encoding: Optional[str]):
+        self.middleware = middleware
+        self.send = send
+        self.encoding = encoding
+        self.start: Optional[Message] = None
+        self.buffer = []
+        self.buffered = 0
+        self.encoder = None
+        self.passthrough = False
+
+    async def __call__(self, message: Message):
+        if message["type"] == "http.response.start":
+            await self._on_start(message)
+        elif self.passthrough:
+            await self.send(message)
+        elif message["type"] == "http.response.body":
+            await self._on_body(message.get("body", b""), message.get("more_body", False))
+        else:
+            # Прочие расширения ASGI (например, отправка файла по пути) — без сжатия
+            await self._release()
+            await self.send(message)
+
+    async def _on_start(self, message: Message):
+        headers = MutableHeaders(raw=message["headers"])
+        if (
+            message["status"] < 200 or message["status"] in (204, 206, 304)
+            or "content-encoding" in headers
+            or "no-transform" in headers.get("cache-control", "").lower()
+            or not _allowed(_media_type(headers), self.middleware.content_types)
+        ):
+            self.passthrough = True
+            await self.send(message)
+            return
+
+        # Ответ зависит от Accept-Encoding, даже если этот клиент получит его несжатым
+        headers.add_vary_header("Accept-Encoding")
+        content_length = headers.get("content-length")
+        if self.encoding is None or (content_length is not None and int(content_length) < self.middleware.minimum_size):
+            self.passthrough = True
+            await self.send(message)
+            return
+        self.start = message
+
+    async def _release(self, more_body: bool = True):
+        """Отправляет придержанное начало ответа и накопленное тело без сжатия"""
+        self.passthrough = True
+        await self.send(self.start)
+        body = b"".join(self.buffer)
+        self.buffer = []
+        if body or not more_body:
+            await self.send({"type": "http.response.body", "body": body, "more_body": more_body})
+
+    async def _on_body(self, body: bytes, more_body: bool):
+        if self.encoder is None:
+            self.buffer.append(body)
+            self.buffered += len(body)
+            if self.buffered < self.middleware.minimum_size:
+                if not more_body:
+                    await self._release(more_body)
+                return
+            body = b"".join(self.buffer)
+            if body.startswith(_COMPRESSED_SIGNATURES):
+                await self._release(more_body)
+                return
+            self.buffer = []
+            await self._begin()
+
+        await self.send({
+            "type": "http.response.body",
+            "body": self.encoder.compress(body, finish=not more_body),
+            "more_body": more_body,
+        })
+
+    async def _begin(self):
+        self.encoder = self.middleware.encoder(self.encoding)
+        headers = MutableHeaders(raw=self.start["headers"])
+        headers["Content-Encoding"] = self.encoding
+        del headers["Content-Length"]
+        if "accept-ranges" in headers:
+            del headers["Accept-Ranges"]
+        # Сжатое тело — другое представление: строгий ETag становится слабым
+        etag = headers.get("etag")
+        if etag and not etag.startswith("W/"):
+            headers["ETag"] = f"W/{etag}"
+        await self.send(self.start)
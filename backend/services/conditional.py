@@ -0,0 +1,185 @@
+"""
+Условные GET: ETag и Last-Modified по версиям таблиц.
+
+При коммите транзакции, менявшей таблицу, ее версия в table_versions увеличивается
+в той же транзакции: новая версия становится видна ровно вместе с новыми данными.
+Счетчик таблицы разбит на TABLE_VERSION_SHARDS строк, коммит увеличивает случайную
+из них, а версия — сумма: параллельные коммиты почти никогда не ждут блокировку одной строки.
+Транзакции, которые ничего не изменили (UPDATE без строк, объект без изменений), версию не трогают.
+Эндпоинт объявляет, от каких таблиц зависит его ответ:
+
+    @router.get("/items/", dependencies=[Depends(conditional_get(InventoryItem, Room))])
+
+Зависимость читает версии одним запросом по первичному ключу и при совпавшем
+If-None-Match / If-Modified-Since отвечает 304 без тела (Response, обработчик NotModified
+регистрируется в backend/api.py) еще до выборки строк и сериализации.
+Иначе ETag, Last-Modified и Cache-Control добавляются к обычному ответу.
+
+Изменения через ORM и через session.execute(insert/update/delete) учитываются
+автоматически; запись через Connection в обход Session должна вызвать bump_versions сама
+"""
+import hashlib
+import random
+from datetime import datetime, timedelta
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Dict, Iterable, Optional, Tuple, Union
+
+from fastapi import Depends, Request, Response
+from pytz import timezone, utc
+from sqlalchemy import event, func, insert, select, update
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from backend.configurations.config import TABLE_VERSION_SHARDS
+from backend.configurations.database import get_async_db
+from backend.core.entities import TableVersion
+from backend.services.blob_response import etag_matches
+
+MOSCOW = timezone('Europe/Moscow')
+CACHE_CONTROL = "private, no-cache"
+
+_SESSION_KEY = "conditional_changed_tables"
+
+
+def bump_versions(db: Union[Session, Connection], tables: Iterable[str]):
+    """
+    Увеличивает версии таблиц в текущей транзакции db (одну случайную строку счетчика
+    каждой таблицы). Таблицы — в порядке имен, чтобы параллельные коммиты,
+    попавшие на одни строки, брали блокировки в одном порядке
+    """
+    now = datetime.now(MOSCOW)
+    dialect = db.get_bind().dialect.name if isinstance(db, Session) else db.dialect.name
+    for name in sorted(set(tables)):
+        shard = random.randrange(TABLE_VERSION_SHARDS)
+        if dialect in ("postgresql", "sqlite"):
+            upsert = (postgresql_insert if dialect == "postgresql" else sqlite_insert)(TableVersion)
+            db.execute(
+                upsert.values(table_name=name, shard=shard, version=1, updated_at=now)
+                .on_conflict_do_update(
+                    index_elements=[TableVersion.table_name, TableVersion.shard],
+                    set_={"version": TableVersion.version + 1, "updated_at": now}
+                )
+            )
+            continue
+        updated = db.execute(
+            update(TableVersion)
+            .where(TableVersion.table_name == name, TableVersion.shard == shard)
+            .values(version=TableVersion.version + 1, updated_at=now)
+        ).rowcount
+        if not updated:
+            db.execute(insert(TableVersion).values(table_name=name, shard=shard, version=1, updated_at=now))
+
+
+def _remember(session: Session, tables: Iterable[str]):
+    tables = {name for name in tables if name != TableVersion.__tablename__}
+    if tables:
+        session.info.setdefault(_SESSION_KEY, set()).update(tables)
+
+
+@event.listens_for(Session, "before_flush")
+def _on_before_flush(session: Session, flush_context, instances):
+    # dirty содержит и объекты, у которых атрибуты присвоены теми же значениями
+    changed = (*session.new, *(instance for instance in session.dirty if session.is_modified(instance)),
+               *session.deleted)
+    _remember(session, (instance.__table__.name for instance in changed if hasattr(instance, "__table__")))
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _on_orm_execute(state):
+    if not (state.is_insert or state.is_update or state.is_delete):
+        return None
+    result = state.invoke_statement()
+    # rowcount неизвестен (-1) или нет у результата — считаем, что таблица изменилась
+    if getattr(result, "rowcount", -1) != 0:
+        _remember(state.session, [state.statement.table.name])
+    return result
+
+
+@event.listens_for(Session, "before_commit")
+def _on_before_commit(session: Session):
+    # commit вызывает flush уже после before_commit — сбрасываем раньше, чтобы учесть и эти изменения
+    session.flush()
+    tables = session.info.pop(_SESSION_KEY, None)
+    if tables:
+        bump_versions(session, tables)
+
+
+@event.listens_for(Session, "after_rollback")
+def _on_after_rollback(session: Session):
+    session.info.pop(_SESSION_KEY, None)
+
+
+async def read_versions(db: AsyncSession, tables: Tuple[str, ...]) -> Dict[str, Tuple[int, Optional[datetime]]]:
+    rows = await db.execute(
+        select(TableVersion.table_name, func.sum(TableVersion.version), func.max(TableVersion.updated_at))
+        .where(TableVersion.table_name.in_(tables))
+        .group_by(TableVersion.table_name)
+    )
+    versions = {name: (0, None) for name in tables}
+    for name, version, updated_at in rows:
+        if updated_at is not None and updated_at.tzinfo is None:
+            updated_at = MOSCOW.localize(updated_at)
+        versions[name] = (int(version), updated_at)
+    return versions
+
+
+class NotModified(Exception):
+    """
+    Прерывает обработку запроса ответом 304 (зависимость не может вернуть Response сама)
+    """
+
+    def __init__(self, headers: Dict[str, str]):
+        self.headers = headers
+
+
+async def not_modified_handler(request: Request, exc: NotModified) -> Response:
+    return Response(status_code=304, headers=exc.headers)
+
+
+def _not_modified_since(header: Optional[str], last_modified: Optional[datetime]) -> bool:
+    if not header or last_modified is None:
+        return False
+    try:
+        since = parsedate_to_datetime(header)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = utc.localize(since)
+    return last_modified.replace(microsecond=0) <= since
+
+
+def conditional_get(*entities):
+    """
+    Зависимость для GET-эндпоинта, ответ которого определяется содержимым таблиц entities
+    и параметрами запроса. Не подходит, если ответ зависит еще и от текущего времени
+    """
+    tables = tuple(sorted(entity.__tablename__ for entity in entities))
+
+    async def dependency(request: Request, response: Response, db: AsyncSession = Depends(get_async_db)):
+        versions = await read_versions(db, tables)
+        target = request.url.path + ("?" + request.url.query if request.url.query else "")
+        digest = hashlib.sha256(target.encode("utf-8")).hexdigest()[:16]
+        etag = f'W/"{"-".join(str(versions[name][0]) for name in tables)}.{digest}"'
+        headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+
+        changed = [updated_at for _, updated_at in versions.values() if updated_at is not None]
+        last_modified = max(changed) if changed else None
+        # Last-Modified с точностью до секунды: в ту же секунду, что и изменение, его не отдаем,
+        # иначе следующее изменение в эту же секунду ответило бы 304 на старые данные
+        if last_modified is not None and datetime.now(MOSCOW) - last_modified >= timedelta(seconds=1):
+            headers["Last-Modified"] = formatdate(last_modified.timestamp(), usegmt=True)
+
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match is not None:
+            not_modified = etag_matches(if_none_match, etag) or etag_matches(if_none_match, etag[2:])
+        else:
+            not_modified = "Last-Modified" in headers and \
+                _not_modified_since(request.headers.get("if-modified-since"), last_modified)
+        if not_modified:
+            raise NotModified(headers)
+        response.headers.update(headers)
+
+    return dependency
@@ -0,0 +1,113 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi import HTTPException
+
+from backend.configurations.config import AUTH_EXECUTOR_WORKERS, AUTH_EXECUTOR_MAX_QUEUE
+
+
+class BoundedExecutor:
+    """
+    Пул потоков для блокирующей работы из async-эндпоинтов.
+    Число ожидающих задач ограничено: сверх max_queue запрос получает 503,
+    а не растит очередь бесконечно
+    """
+
+    def __init__(self, name: str, max_workers: int, max_queue: int):
+        self.name = name
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._active = 0
+        self._stats = {
+            "completed": 0,
+            "failed": 0,
+            "rejected": 0,
+            "wait_ms_total": 0.0,
+            "wait_ms_max": 0.0,
+            "run_ms_total": 0.0,
+            "run_ms_max": 0.0,
+        }
+
+    async def run(self, fn, *args, **kwargs):
+        with self._lock:
+            if self._pending >= self.max_queue + self.max_workers:
+                self._stats["rejected"] += 1
+                raise HTTPException(status_code=503, detail="Server is busy, try again later")
+            self._pending += 1
+
+        submitted = time.perf_counter()
+
+        def task():
+            started = time.perf_counter()
+            with self._lock:
+                self._active += 1
+            failed = False
+            try:
+                return fn(*args, **kwargs)
+            except HTTPException:
+                # Ожидаемый ответ (например, 401 при неверном пароле), а не сбой задачи
+                raise
+            except Exception:
+                failed = True
+                raise
+            finally:
+                finished = time.perf_counter()
+                self._record(started - submitted, finished - started, failed)
+
+        try:
+            future = self._executor.submit(task)
+        except BaseException:
+            self._release()
+            raise
+        # Счетчик уменьшается, когда задача завершилась или отменена до запуска:
+        # если запрос отменен, пока задача ждет в очереди, task() так и не выполнится
+        future.add_done_callback(lambda _: self._release())
+        return await asyncio.wrap_future(future)
+
+    def _release(self):
+        with self._lock:
+            self._pending -= 1
+
+    def _record(self, wait: float, run: float, failed: bool):
+        wait_ms = wait * 1000
+        run_ms = run * 1000
+        with self._lock:
+            self._active -= 1
+            self._stats["failed" if failed else "completed"] += 1
+            self._stats["wait_ms_total"] += wait_ms
+            self._stats["run_ms_total"] += run_ms
+            self._stats["wait_ms_max"] = max(self._stats["wait_ms_max"], wait_ms)
+            self._stats["run_ms_max"] = max(self._stats["run_ms_max"], run_ms)
+
+    def metrics(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+            pending = self._pending
+            active = self._active
+        finished = stats["completed"] + stats["failed"]
+        return {
+            "name": self.name,
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "active": active,
+            "queue_depth": pending - active,
+            "completed": stats["completed"],
+            "failed": stats["failed"],
+            "rejected": stats["rejected"],
+            "wait_ms_avg": round(stats["wait_ms_total"] / finished, 3) if finished else 0.0,
+            "wait_ms_max": round(stats["wait_ms_max"], 3),
+            "run_ms_avg": round(stats["run_ms_total"] / finished, 3) if finished else 0.0,
+            "run_ms_max": round(stats["run_ms_max"], 3),
+        }
+
+    def shutdown(self):
+        self._executor.shutdown(wait=True)
+
+
+# Проверка паролей (bcrypt) и сопутствующие запросы к БД при входе
+auth_executor = BoundedExecutor("auth", AUTH_EXECUTOR_WORKERS, AUTH_EXECUTOR_MAX_QUEUE)
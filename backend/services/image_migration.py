@@ -0,0 +1,120 @@
+"""
+Перенос изображений из колонок users.avatar и inventory_items.photo в хранилище blob'ов.
+
+    python -m backend.services.image_migration [--batch-size N] [--keep-inline]
+    python -m backend.services.image_migration --collect-orphans
+
+1. Создает таблицу images и колонки avatar_key/photo_key, если их еще нет.
+2. Пачками читает строки с непустым BLOB и без ключа, кладет изображения
+   в хранилище и проставляет ключ; исходный BLOB обнуляется (--keep-inline — оставить).
+
+Миграцию можно прерывать и запускать повторно: уже перенесенные строки пропускаются.
+Место в таблицах PostgreSQL освобождается только после VACUUM FULL (или pg_repack).
+
+--collect-orphans удаляет из хранилища blob'ы без записи в images (их оставляют
+откатившиеся транзакции загрузки); удобно запускать по cron раз в сутки
+"""
+import argparse
+import logging
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from backend.configurations.config import IMAGE_MIGRATION_BATCH_SIZE
+from backend.configurations.database import SessionLocal, engine
+from backend.core.entities import StoredImage, User, InventoryItem
+from backend.services.images import collect_orphan_blobs, store_image
+
+logger = logging.getLogger(__name__)
+
+# (сущность, колонка со старым BLOB, колонка с ключом)
+INLINE_IMAGE_COLUMNS = (
+    (User, "avatar", "avatar_key"),
+    (InventoryItem, "photo", "photo_key"),
+)
+
+
+def ensure_image_schema(db_engine: Engine = engine):
+    """
+    create_all не добавляет колонки в существующие таблицы, поэтому добавляем их здесь
+    """
+    StoredImage.__table__.create(bind=db_engine, checkfirst=True)
+    inspector = inspect(db_engine)
+    with db_engine.begin() as connection:
+        for entity, _, key_column in INLINE_IMAGE_COLUMNS:
+            table = entity.__tablename__
+            existing = {column["name"] for column in inspector.get_columns(table)}
+            if key_column not in existing:
+                connection.execute(text(
+                    f"ALTER TABLE {table} ADD COLUMN {key_column} VARCHAR(64) REFERENCES images(key)"
+                ))
+
+
+def migrate_inline_images(db: Session, batch_size: int = IMAGE_MIGRATION_BATCH_SIZE,
+                          keep_inline: bool = False) -> dict:
+    stats = {}
+    for entity, blob_column, key_column in INLINE_IMAGE_COLUMNS:
+        blob_attr = getattr(entity, blob_column)
+        key_attr = getattr(entity, key_column)
+        migrated = failed = 0
+        after_id = 0
+        while True:
+            rows = (
+                db.query(entity.id, blob_attr)
+                .filter(entity.id > after_id, blob_attr.isnot(None), key_attr.is_(None))
+                .order_by(entity.id)
+                .limit(batch_size)
+                .all()
+            )
+            if not rows:
+                break
+
+            for row_id, data in rows:
+                try:
+                    key = store_image(db, data)
+                except Exception:
+                    logger.error(f"Не удалось перенести изображение {entity.__tablename__}.id={row_id}", exc_info=True)
+                    failed += 1
+                    continue
+                values = {key_column: key}
+                if not keep_inline:
+                    values[blob_column] = None
+                db.query(entity).filter(entity.id == row_id).update(values, synchronize_session=False)
+                migrated += 1
+
+            db.commit()
+            after_id = rows[-1][0]
+
+        stats[entity.__tablename__] = {"migrated": migrated, "failed": failed}
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Перенос изображений в хранилище blob'ов")
+    parser.add_argument("--batch-size", type=int, default=IMAGE_MIGRATION_BATCH_SIZE)
+    parser.add_argument("--keep-inline", action="store_true", help="не обнулять исходные BLOB-колонки")
+    parser.add_argument("--collect-orphans", action="store_true", help="удалить blob'ы без записи в images")
+    args = parser.parse_args()
+
+    if args.collect_orphans:
+        db = SessionLocal()
+        try:
+            deleted = collect_orphan_blobs(db)
+        finally:
+            db.close()
+        print(f"удалено blob'ов без записи: {deleted}")
+        return
+
+    ensure_image_schema()
+    db = SessionLocal()
+    try:
+        stats = migrate_inline_images(db, batch_size=args.batch_size, keep_inline=args.keep_inline)
+    finally:
+        db.close()
+    for table, result in stats.items():
+        print(f"{table}: перенесено {result['migrated']}, ошибок {result['failed']}")
+
+
+if __name__ == "__main__":
+    main()
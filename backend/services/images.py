@@ -0,0 +1,136 @@
+import io
+import logging
+from datetime import datetime, timedelta, timezone
+from itertools import islice
+from typing import Callable, Optional, Tuple
+
+from fastapi import HTTPException, Request, Response
+from sqlalchemy import or_, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from backend.configurations.config import IMAGE_THUMBNAIL_SIZE, IMAGE_ORPHAN_GRACE_HOURS
+from backend.core.entities import StoredImage
+from backend.services.blob_response import blob_response, decode_stored_image, send_blob
+from backend.services.blob_store import BlobStore, blob_key, blob_store
+
+logger = logging.getLogger(__name__)
+
+
+def make_thumbnail(data: bytes, max_size: int = IMAGE_THUMBNAIL_SIZE) -> Optional[Tuple[bytes, str]]:
+    """
+    Уменьшенная копия изображения (JPEG, или PNG при прозрачности).
+    None — если Pillow не установлен или файл не является изображением
+    """
+    try:
+        from PIL import Image
+    except ImportError:
+        return None
+
+    try:
+        with Image.open(io.BytesIO(data)) as image:
+            if image.width <= max_size and image.height <= max_size:
+                return None
+            image.thumbnail((max_size, max_size))
+            output = io.BytesIO()
+            if image.mode in ("RGBA", "LA", "P"):
+                image.convert("RGBA").save(output, "PNG", optimize=True)
+                media_type = "image/png"
+            else:
+                image.convert("RGB").save(output, "JPEG", quality=85, optimize=True)
+                media_type = "image/jpeg"
+    except (OSError, ValueError):
+        logger.warning("Не удалось построить миниатюру изображения", exc_info=True)
+        return None
+    return output.getvalue(), media_type
+
+
+def store_image(db: Session, stored: bytes, store: BlobStore = blob_store) -> str:
+    """
+    Кладет изображение в хранилище и возвращает его ключ (SHA-256).
+    Повторная загрузка того же файла не создает копий; миниатюра строится один раз.
+    Запись StoredImage добавляется в текущую транзакцию, коммит — за вызывающим.
+    Blob пишется до коммита: если транзакция откатится, он останется без записи
+    и будет удален collect_orphan_blobs
+    """
+    data, media_type = decode_stored_image(stored)
+    key = blob_key(data)
+    if db.get(StoredImage, key) is not None:
+        return key
+
+    store.put(data, key)
+    thumbnail_key = thumbnail_media_type = None
+    thumbnail = make_thumbnail(data)
+    if thumbnail is not None:
+        thumbnail_data, thumbnail_media_type = thumbnail
+        thumbnail_key = store.put(thumbnail_data)
+
+    try:
+        with db.begin_nested():
+            db.add(StoredImage.create(
+                key=key,
+                media_type=media_type,
+                size=len(data),
+                thumbnail_key=thumbnail_key,
+                thumbnail_media_type=thumbnail_media_type
+            ))
+    except IntegrityError:
+        # Тот же файл параллельно загрузил другой запрос
+        pass
+    return key
+
+
+def collect_orphan_blobs(db: Session, store: BlobStore = blob_store,
+                         grace: timedelta = timedelta(hours=IMAGE_ORPHAN_GRACE_HOURS),
+                         batch_size: int = 500) -> int:
+    """
+    Удаляет blob'ы, на которые не ссылается ни одна запись images
+    (остаются после откатившихся транзакций). Blob'ы моложе grace не трогаем:
+    транзакция, которая их записала, может быть еще не закоммичена.
+    Возвращает число удаленных
+    """
+    keys = store.iter_keys(modified_before=datetime.now(timezone.utc) - grace)
+    deleted = 0
+    while True:
+        batch = list(islice(keys, batch_size))
+        if not batch:
+            break
+        referenced = set()
+        for key, thumbnail_key in db.execute(
+            select(StoredImage.key, StoredImage.thumbnail_key)
+            .where(or_(StoredImage.key.in_(batch), StoredImage.thumbnail_key.in_(batch)))
+        ):
+            referenced.update((key, thumbnail_key))
+        for key in batch:
+            if key not in referenced:
+                store.delete(key)
+                deleted += 1
+    return deleted
+
+
+def image_response(request: Request, db: Session, key: Optional[str],
+                   load_inline: Callable[[], Optional[bytes]],
+                   thumbnail: bool, not_found: str, store: BlobStore = blob_store) -> Response:
+    """
+    Отдает изображение из хранилища по ключу, ETag — сам ключ.
+    Если миниатюры нет (маленькое изображение, нет Pillow), отдается оригинал.
+    Строки, еще не перенесенные миграцией, отдаются из таблицы (load_inline)
+    """
+    if key is None:
+        return blob_response(request, load_inline(), not_found=not_found)
+
+    image = db.get(StoredImage, key)
+    if image is None:
+        raise HTTPException(status_code=404, detail=not_found)
+    if thumbnail and image.thumbnail_key:
+        key, media_type = image.thumbnail_key, image.thumbnail_media_type
+    else:
+        media_type = image.media_type
+
+    size = store.size(key)
+    if size is None:
+        logger.error(f"Изображение {key} отсутствует в хранилище")
+        raise HTTPException(status_code=404, detail=not_found)
+    return send_blob(
+        request, size, lambda first, last: store.iter_range(key, first, last), media_type, f'"{key}"'
+    )
@@ -0,0 +1,531 @@
+import codecs
+import csv
+import os
+import tempfile
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+from itertools import islice
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from fastapi import HTTPException, UploadFile
+from openpyxl import load_workbook
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from backend.configurations.config import (
+    IMPORT_BATCH_SIZE, IMPORT_WORKERS, IMPORT_JOB_HISTORY,
+    IMPORT_MAX_FILE_MB, IMPORT_MAX_REPORTED_ERRORS
+)
+from backend.configurations.database import SessionLocal
+from backend.core.entities import (
+    User, Room, InventoryCategory, InventoryItem, Consumable, ConsumableMovement,
+    InventoryCondition, Log, LogType
+)
+from backend.core.repositories import InventoryItemRepository
+from backend.core.schemas import ImportKind
+from backend.services.audit_log import audit_log
+
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+HEADER_SEARCH_ROWS = 10  # в выгрузках отчетов заголовок таблицы идет после названия и даты
+
+IMPORT_FORMATS = {".csv": "csv", ".xlsx": "xlsx"}
+
+# Заголовки колонок: имена полей API и названия из Excel-отчетов (backend/services/report_stream.py)
+ITEM_COLUMNS = {
+    "inventory_number": "inventory_number", "инвентарный номер": "inventory_number",
+    "name": "name", "название": "name",
+    "description": "description", "описание": "description",
+    "category": "category", "category_name": "category", "категория": "category",
+    "condition": "condition", "состояние": "condition",
+    "room": "room", "room_name": "room", "помещение": "room",
+    "user": "user", "username": "user", "пользователь": "user", "ответственный": "user",
+    "purchase_date": "purchase_date", "дата покупки": "purchase_date",
+    "purchase_price": "purchase_price", "цена покупки": "purchase_price",
+    "warranty_until": "warranty_until", "гарантия до": "warranty_until",
+}
+
+CONSUMABLE_COLUMNS = {
+    "name": "name", "название": "name",
+    "description": "description", "описание": "description",
+    "quantity": "quantity", "количество": "quantity", "текущее количество": "quantity",
+    "min_quantity": "min_quantity", "мин. количество": "min_quantity",
+    "unit": "unit", "единица измерения": "unit",
+}
+
+CONDITION_LABELS = {
+    "нормальное": InventoryCondition.NORMAL,
+    "требует ремонта": InventoryCondition.REQUIRES_REPAIR,
+    "списано": InventoryCondition.WRITTEN_OFF,
+}
+
+
+class RowError(ValueError):
+    pass
+
+
+# --- Чтение файлов ---
+
+def _csv_encoding(path: str) -> str:
+    with open(path, "rb") as f:
+        sample = f.read(64 * 1024)
+    try:
+        codecs.getincrementaldecoder("utf-8-sig")().decode(sample, final=False)
+        return "utf-8-sig"
+    except UnicodeDecodeError:
+        # Excel под Windows сохраняет CSV в cp1251
+        return "cp1251"
+
+
+def iter_csv_rows(path: str) -> Iterator[list]:
+    with open(path, newline="", encoding=_csv_encoding(path)) as f:
+        sample = f.read(4096)
+        f.seek(0)
+        try:
+            dialect = csv.Sniffer().sniff(sample, delimiters=",;\t")
+        except csv.Error:
+            dialect = csv.excel
+        yield from csv.reader(f, dialect)
+
+
+def open_xlsx_rows(path: str) -> Tuple[Iterator[list], Optional[int]]:
+    """
+    Строки первого листа и их число из размеров листа (тег dimension), если книга их указывает.
+    read_only: строки читаются потоком из XML, книга целиком в память не загружается
+    """
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    worksheet = workbook.worksheets[0]
+
+    def rows() -> Iterator[list]:
+        try:
+            for row in worksheet.iter_rows(values_only=True):
+                yield list(row)
+        finally:
+            workbook.close()
+
+    return rows(), worksheet.max_row
+
+
+def _find_header(rows: Iterator[list], columns: Dict[str, str], required: set) -> Tuple[Dict[str, int], int]:
+    for line in range(1, HEADER_SEARCH_ROWS + 1):
+        row = next(rows, None)
+        if row is None:
+            break
+        mapping = {}
+        for index, cell in enumerate(row):
+            field = columns.get(str(cell).strip().lower()) if cell is not None else None
+            if field and field not in mapping:
+                mapping[field] = index
+        if required <= mapping.keys():
+            return mapping, line
+    raise HTTPException(status_code=400, detail=f"Header row with columns {', '.join(sorted(required))} not found")
+
+
+# --- Разбор значений ---
+
+def _text(value) -> Optional[str]:
+    if value is None:
+        return None
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    value = str(value).strip()
+    return value or None
+
+
+def _decimal(value) -> Optional[Decimal]:
+    if value is None or value == "":
+        return None
+    try:
+        return Decimal(str(value).strip().replace(" ", "").replace(",", "."))
+    except InvalidOperation:
+        raise RowError(f"Invalid number: {value}")
+
+
+def _int(value, default: int) -> int:
+    number = _decimal(value)
+    if number is None:
+        return default
+    if number != number.to_integral_value() or number < 0:
+        raise RowError(f"Invalid quantity: {value}")
+    return int(number)
+
+
+def _date(value) -> Optional[datetime]:
+    if value is None or value == "":
+        return None
+    if isinstance(value, datetime):
+        return value
+    text = str(value).strip()
+    for fmt in ("%Y-%m-%d", "%d.%m.%Y", "%Y-%m-%d %H:%M:%S"):
+        try:
+            return datetime.strptime(text, fmt)
+        except ValueError:
+            pass
+    try:
+        return datetime.fromisoformat(text)
+    except ValueError:
+        raise RowError(f"Invalid date: {value}")
+
+
+def _condition(value) -> InventoryCondition:
+    text = _text(value)
+    if text is None:
+        return InventoryCondition.NORMAL
+    condition = CONDITION_LABELS.get(text.lower())
+    if condition is not None:
+        return condition
+    try:
+        return InventoryCondition(text.upper())
+    except ValueError:
+        raise RowError(f"Invalid condition: {value}")
+
+
+# --- Типы импорта ---
+
+class _ItemImport:
+    columns = ITEM_COLUMNS
+    required = {"inventory_number", "name", "category"}
+
+    def __init__(self, db: Session):
+        self.db = db
+        # Справочники небольшие: загружаем целиком, чтобы не искать названия запросом на каждую строку
+        self.categories = {}
+        for category_id, name, short_name in db.query(
+                InventoryCategory.id, InventoryCategory.name, InventoryCategory.short_name):
+            self.categories[name.lower()] = category_id
+            self.categories.setdefault(short_name.lower(), category_id)
+        self.rooms = {name.lower(): room_id for room_id, name in db.query(Room.id, Room.name)}
+        self.users = {}
+        ambiguous = set()
+        for user_id, username, full_name in db.query(User.id, User.username, User.full_name):
+            self.users[username.lower()] = user_id
+            key = full_name.lower()
+            if key in self.users and self.users[key] != user_id:
+                ambiguous.add(key)
+            self.users.setdefault(key, user_id)
+        for key in ambiguous:
+            self.users[key] = None
+        self.repo = InventoryItemRepository(db)
+
+    def prepare(self, values: Dict[str, object]) -> dict:
+        number = _text(values.get("inventory_number"))
+        name = _text(values.get("name"))
+        if not number:
+            raise RowError("Inventory number is required")
+        if not name:
+            raise RowError("Name is required")
+
+        category = _text(values.get("category"))
+        category_id = self.categories.get(category.lower()) if category else None
+        if category_id is None:
+            raise RowError(f"Category not found: {category}")
+
+        room_id = None
+        room = _text(values.get("room"))
+        if room:
+            room_id = self.rooms.get(room.lower())
+            if room_id is None:
+                raise RowError(f"Room not found: {room}")
+
+        user_id = None
+        user = _text(values.get("user"))
+        if user:
+            if user.lower() not in self.users:
+                raise RowError(f"User not found: {user}")
+            user_id = self.users[user.lower()]
+            if user_id is None:
+                raise RowError(f"Several users match: {user}, use username")
+
+        return {
+            "inventory_number": number,
+            "name": name,
+            "description": _text(values.get("description")),
+            "category_id": category_id,
+            "condition": _condition(values.get("condition")),
+            "room_id": room_id,
+            "user_id": user_id,
+            "purchase_date": _date(values.get("purchase_date")),
+            "purchase_price": _decimal(values.get("purchase_price")),
+            "warranty_until": _date(values.get("warranty_until")),
+        }
+
+    def insert(self, rows: List[dict], user_id: Optional[int]):
+        self.db.execute(insert(InventoryItem), rows)
+
+    def conflicts(self, rows: List[Tuple[int, dict]]) -> Dict[int, str]:
+        """
+        Дубликаты inventory_number внутри пачки и уже существующие в БД — одним запросом.
+        Номера из предыдущих пачек к этому моменту уже записаны и находятся тем же запросом
+        """
+        existing = self.repo.get_ids_by_numbers(row["inventory_number"] for _, row in rows)
+        seen = set()
+        errors = {}
+        for line, row in rows:
+            number = row["inventory_number"]
+            if number in existing:
+                errors[line] = f"Item with this inventory number already exists: {number}"
+            elif number in seen:
+                errors[line] = f"Duplicate inventory number in file: {number}"
+            seen.add(number)
+        return errors
+
+
+class _ConsumableImport:
+    columns = CONSUMABLE_COLUMNS
+    required = {"name"}
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def prepare(self, values: Dict[str, object]) -> dict:
+        name = _text(values.get("name"))
+        if not name:
+            raise RowError("Name is required")
+        return {
+            "name": name,
+            "description": _text(values.get("description")),
+            "quantity": _int(values.get("quantity"), 0),
+            "min_quantity": _int(values.get("min_quantity"), 1),
+            "unit": _text(values.get("unit")) or "шт.",
+        }
+
+    def insert(self, rows: List[dict], user_id: Optional[int]):
+        # Начальный остаток записывается и в журнал движения, иначе остаток на дату не сойдется
+        created = self.db.execute(insert(Consumable).returning(Consumable.id, Consumable.quantity), rows)
+        movements = [
+            {"consumable_id": consumable_id, "delta": quantity, "quantity_after": quantity,
+             "reason": "import", "user_id": user_id}
+            for consumable_id, quantity in created if quantity
+        ]
+        if movements:
+            self.db.execute(insert(ConsumableMovement), movements)
+
+    def conflicts(self, rows: List[Tuple[int, dict]]) -> Dict[int, str]:
+        return {}
+
+
+IMPORTS = {
+    ImportKind.INVENTORY_ITEMS: _ItemImport,
+    ImportKind.CONSUMABLES: _ConsumableImport,
+}
+
+
+# --- Задачи импорта ---
+
+class ImportJob:
+    def __init__(self, kind: ImportKind, filename: str, file_format: str, path: str, user_id: Optional[int]):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.filename = filename
+        self.file_format = file_format
+        self.path = path
+        self.user_id = user_id
+        self.status = "queued"
+        self.detail: Optional[str] = None
+        self.rows_total: Optional[int] = None
+        self.rows_read = 0
+        self.inserted = 0
+        self.rejected = 0
+        self.errors: List[dict] = []
+        self.created_at = datetime.now()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def add_error(self, line: int, detail: str):
+        self.rejected += 1
+        if len(self.errors) < IMPORT_MAX_REPORTED_ERRORS:
+            self.errors.append({"line": line, "detail": detail})
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            elapsed = None
+            if self.started_at is not None:
+                elapsed = (self.finished_at or time.perf_counter()) - self.started_at
+            return {
+                "id": self.id,
+                "kind": self.kind.value,
+                "filename": self.filename,
+                "status": self.status,
+                "detail": self.detail,
+                "rows_total": self.rows_total,
+                "rows_read": self.rows_read,
+                "inserted": self.inserted,
+                "rejected": self.rejected,
+                "errors": list(self.errors),
+                "created_at": self.created_at,
+                "elapsed_seconds": round(elapsed, 3) if elapsed is not None else None,
+                "rows_per_second": round(self.rows_read / elapsed) if elapsed else None,
+            }
+
+
+def _insert_row_by_row(db: Session, importer, batch: List[Tuple[int, dict]], user_id: Optional[int],
+                       row_errors: List[Tuple[int, str]]) -> List[Tuple[int, dict]]:
+    """
+    Пачка отклонена ограничением БД (например, номер параллельно занят другим запросом):
+    пишем ее построчно, каждую строку в своем SAVEPOINT, чтобы отклонить только виновные
+    """
+    inserted = []
+    for row_line, row in batch:
+        try:
+            with db.begin_nested():
+                importer.insert([row], user_id)
+        except IntegrityError as e:
+            row_errors.append((row_line, f"Rejected by database: {e.orig}"))
+        else:
+            inserted.append((row_line, row))
+    return inserted
+
+
+def run_import(job: ImportJob, session_factory: Callable[[], Session] = SessionLocal):
+    """
+    Читает файл потоком и пишет пачками по IMPORT_BATCH_SIZE строк (executemany, commit на пачку).
+    Память ограничена размером пачки, а не файла.
+    rows_total во время импорта — оценка по размерам листа XLSX (для CSV неизвестна),
+    по завершении — число прочитанных строк
+    """
+    db = session_factory()
+    try:
+        importer = IMPORTS[job.kind](db)
+        if job.file_format == "xlsx":
+            rows, declared_rows = open_xlsx_rows(job.path)
+        else:
+            rows, declared_rows = iter_csv_rows(job.path), None
+        mapping, header_line = _find_header(rows, importer.columns, importer.required)
+        with job._lock:
+            job.rows_total = declared_rows - header_line if declared_rows else None
+
+        line = header_line
+        while True:
+            chunk = list(islice(rows, IMPORT_BATCH_SIZE))
+            if not chunk:
+                break
+
+            prepared = []
+            row_errors = []
+            for row in chunk:
+                line += 1
+                if all(cell in (None, "") for cell in row):
+                    continue
+                values = {field: row[index] if index < len(row) else None for field, index in mapping.items()}
+                try:
+                    prepared.append((line, importer.prepare(values)))
+                except RowError as e:
+                    row_errors.append((line, str(e)))
+
+            rows_read = len(prepared) + len(row_errors)
+            conflicts = importer.conflicts(prepared)
+            row_errors.extend(conflicts.items())
+            batch = [(row_line, row) for row_line, row in prepared if row_line not in conflicts]
+            try:
+                if batch:
+                    importer.insert([row for _, row in batch], job.user_id)
+                db.commit()
+            except IntegrityError:
+                db.rollback()
+                batch = _insert_row_by_row(db, importer, batch, job.user_id, row_errors)
+                db.commit()
+
+            with job._lock:
+                job.rows_read += rows_read
+                for row_line, detail in sorted(row_errors):
+                    job.add_error(row_line, detail)
+                job.inserted += len(batch)
+
+        with job._lock:
+            job.rows_total = job.rows_read
+            job.status = "done"
+    except HTTPException as e:
+        with job._lock:
+            job.status = "failed"
+            job.detail = e.detail
+    except Exception as e:
+        db.rollback()
+        with job._lock:
+            job.status = "failed"
+            job.detail = f"Import failed: {e}"
+    finally:
+        db.close()
+        with job._lock:
+            job.finished_at = time.perf_counter()
+        os.remove(job.path)
+
+    audit_log.submit(Log.create(
+        description=(
+            f"Import of {job.kind.value} from {job.filename}: {job.status}, "
+            f"inserted {job.inserted}, rejected {job.rejected}"
+        ),
+        type=LogType.INFO.value if job.status == "done" else LogType.ERROR.value,
+        related_entity_link=f"/import/{job.id}",
+        user_id=job.user_id
+    ))
+
+
+class ImportJobs:
+    """
+    Очередь задач импорта: файл сохраняется на диск, разбор идет в фоновом потоке,
+    прогресс доступен по id задачи. Хранятся последние IMPORT_JOB_HISTORY задач
+    """
+
+    def __init__(self, max_workers: int = IMPORT_WORKERS, history: int = IMPORT_JOB_HISTORY):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="import")
+        self._jobs: "OrderedDict[str, ImportJob]" = OrderedDict()
+        self._history = history
+        self._lock = threading.Lock()
+
+    def submit(self, kind: ImportKind, upload: UploadFile, user_id: Optional[int] = None) -> ImportJob:
+        extension = os.path.splitext(upload.filename or "")[1].lower()
+        file_format = IMPORT_FORMATS.get(extension)
+        if file_format is None:
+            raise HTTPException(status_code=400, detail="Only .csv and .xlsx files are supported")
+
+        path = save_upload(upload, extension)
+        job = ImportJob(kind, upload.filename, file_format, path, user_id)
+        with self._lock:
+            self._jobs[job.id] = job
+            while len(self._jobs) > self._history:
+                self._jobs.popitem(last=False)
+
+        def task():
+            with job._lock:
+                job.status = "running"
+                job.started_at = time.perf_counter()
+            run_import(job)
+
+        self._executor.submit(task)
+        return job
+
+    def get(self, job_id: str) -> Optional[ImportJob]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=True)
+
+
+def save_upload(upload: UploadFile, suffix: str) -> str:
+    """
+    Копирует загруженный файл на диск кусками, проверяя ограничение размера
+    """
+    limit = IMPORT_MAX_FILE_MB * 1024 * 1024
+    fd, path = tempfile.mkstemp(suffix=suffix, prefix="import-")
+    written = 0
+    try:
+        with os.fdopen(fd, "wb") as target:
+            while chunk := upload.file.read(UPLOAD_CHUNK_SIZE):
+                written += len(chunk)
+                if written > limit:
+                    raise HTTPException(status_code=413, detail=f"File is larger than {IMPORT_MAX_FILE_MB} MB")
+                target.write(chunk)
+    except BaseException:
+        os.remove(path)
+        raise
+    return path
+
+
+import_jobs = ImportJobs()
@@ -0,0 +1,262 @@
+from datetime import datetime
+from typing import Dict, List
+
+from fastapi import HTTPException
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from backend.configurations.config import BULK_ITEMS_MAX_ROWS
+from backend.core.entities import User, Room, InventoryCategory, InventoryCondition
+from backend.core.repositories import InventoryItemRepository, get_existing_ids
+from backend.core.schemas import InventoryItemBulkRequest
+from backend.services.images import store_image
+
+# Колонки NOT NULL: явный null в update отклоняем до записи, а не ловим ошибку БД
+_REQUIRED_FIELDS = ("inventory_number", "name", "category_id", "condition", "is_written_off")
+
+_CONFLICT = "Row conflicts with concurrent changes or related records"
+_OPERATIONS = ("create", "update", "delete")
+
+
+class _BulkContext:
+    """
+    Все справочные данные для проверки пакета, загруженные заранее:
+    по одному IN-запросу на таблицу и один запрос на inventory_number
+    """
+
+    def __init__(self, db: Session, request: InventoryItemBulkRequest):
+        rows = list(request.create) + list(request.update)
+        repo = InventoryItemRepository(db)
+        self.category_ids = get_existing_ids(
+            db, InventoryCategory, {row.category_id for row in rows if row.category_id is not None}
+        )
+        self.room_ids = get_existing_ids(db, Room, {row.room_id for row in rows if row.room_id})
+        self.user_ids = get_existing_ids(db, User, {row.user_id for row in rows if row.user_id})
+        # Текущие номера изменяемых и удаляемых предметов: пакет может их освободить
+        self.current_numbers = repo.get_numbers_by_ids({row.id for row in request.update} | set(request.delete))
+        self.item_ids = set(self.current_numbers)
+        self.numbers = repo.get_ids_by_numbers({row.inventory_number for row in rows if row.inventory_number})
+        self.delete_ids = set(request.delete)
+
+    def reference_error(self, row) -> str:
+        if row.category_id is not None and row.category_id not in self.category_ids:
+            return "Category not found"
+        if row.room_id and row.room_id not in self.room_ids:
+            return "Room not found"
+        if row.user_id and row.user_id not in self.user_ids:
+            return "User not found"
+        return ""
+
+    def released_numbers(self, to_update: Dict[int, dict], to_delete: Dict[int, int]) -> set:
+        """
+        Номера, которые пакет освобождает: у удаляемых предметов и у переименованных
+        """
+        released = {self.current_numbers[item_id] for item_id in to_delete.values()}
+        for values in to_update.values():
+            number = values.get("inventory_number")
+            if number and number != self.current_numbers[values["id"]]:
+                released.add(self.current_numbers[values["id"]])
+        return released
+
+
+def _condition(value) -> InventoryCondition:
+    return InventoryCondition(value.value if hasattr(value, "value") else str(value).upper())
+
+
+def _check_numbers(context: _BulkContext, to_create: Dict[int, dict], to_update: Dict[int, dict],
+                   to_delete: Dict[int, int], error):
+    """
+    Проверяет уникальность inventory_number в состоянии после пакета: номер можно
+    занять, если его освобождает удаление или переименование в том же запросе
+    (в том числе обмен номерами). Отклоненная строка номер не освобождает,
+    поэтому проверка повторяется, пока отклонять больше нечего
+    """
+    while True:
+        released = context.released_numbers(to_update, to_delete)
+        claims = [("create", index, None, values["inventory_number"]) for index, values in to_create.items()]
+        claims += [
+            ("update", index, values["id"], values["inventory_number"])
+            for index, values in to_update.items() if values.get("inventory_number")
+        ]
+        claimed = set()
+        rejected = []
+        for operation, index, item_id, number in claims:
+            owner = context.numbers.get(number)
+            if owner is not None and owner != item_id and number not in released:
+                rejected.append((operation, index, "Item with this inventory number already exists"))
+            elif number in claimed:
+                rejected.append((operation, index, "Duplicate inventory number in request"))
+            else:
+                claimed.add(number)
+        if not rejected:
+            return
+        for operation, index, detail in rejected:
+            error(operation, index, detail)
+            (to_create if operation == "create" else to_update).pop(index)
+
+
+def _with_photo(db: Session, values: dict) -> dict:
+    """
+    Копия строки с photo, замененным на ключ в хранилище.
+    Изображения кладутся при записи, чтобы после отката их записи images создавались заново
+    """
+    if "photo" not in values:
+        return values
+    values = dict(values)
+    photo = values.pop("photo")
+    values["photo_key"] = store_image(db, photo) if photo else None
+    values["photo"] = None
+    return values
+
+
+def _placeholder(item_id: int) -> str:
+    return f"~bulk~{item_id}"
+
+
+def _write(db: Session, context: _BulkContext, to_create: Dict[int, dict], to_update: Dict[int, dict],
+           to_delete: Dict[int, int]) -> Dict[int, int]:
+    """
+    Записывает пакет: сначала удаления, затем изменения и вставки, чтобы освобожденные
+    номера можно было занять. Переименования в уже занятый другим предметом пакета номер
+    сначала получают временный номер: уникальность проверяется после каждой строки.
+    Возвращает id созданных предметов по индексу строки
+    """
+    repo = InventoryItemRepository(db)
+    repo.delete_many(to_delete.values())
+    moved = [
+        values["id"] for values in to_update.values()
+        if context.numbers.get(values.get("inventory_number")) not in (None, values["id"])
+    ]
+    repo.update_many([{"id": item_id, "inventory_number": _placeholder(item_id)} for item_id in moved])
+    repo.update_many([_with_photo(db, values) for values in to_update.values()])
+    created = repo.create_many([_with_photo(db, values) for values in to_create.values()])
+    return {index: created[values["inventory_number"]] for index, values in to_create.items()}
+
+
+def _write_row_by_row(db: Session, to_create: Dict[int, dict], to_update: Dict[int, dict],
+                      to_delete: Dict[int, int], error) -> Dict[int, int]:
+    """
+    Запасной путь, если пакетная запись нарушила ограничение БД (параллельное изменение,
+    ссылки из других таблиц): каждая строка пишется в своем SAVEPOINT, строки с ошибкой
+    попадают в errors, остальные сохраняются. Обмен номерами здесь не поддерживается
+    """
+    repo = InventoryItemRepository(db)
+
+    def attempt(operation: str, index: int, write) -> bool:
+        try:
+            with db.begin_nested():
+                write()
+        except IntegrityError:
+            error(operation, index, _CONFLICT)
+            return False
+        return True
+
+    for index, item_id in list(to_delete.items()):
+        if not attempt("delete", index, lambda: repo.delete_many([item_id])):
+            to_delete.pop(index)
+    for index, values in list(to_update.items()):
+        if not attempt("update", index, lambda: repo.update_many([_with_photo(db, values)])):
+            to_update.pop(index)
+    created = {}
+    for index, values in list(to_create.items()):
+        ids = {}
+        if attempt("create", index, lambda: ids.update(repo.create_many([_with_photo(db, values)]))):
+            created[index] = ids[values["inventory_number"]]
+        else:
+            to_create.pop(index)
+    return created
+
+
+def apply_bulk_items(db: Session, request: InventoryItemBulkRequest) -> dict:
+    """
+    Пакетное создание, изменение и удаление предметов инвентаря.
+    Некорректные строки попадают в errors и пропускаются, остальные
+    записываются в одной транзакции многострочными INSERT/UPDATE/DELETE
+    """
+    total = len(request.create) + len(request.update) + len(request.delete)
+    if total > BULK_ITEMS_MAX_ROWS:
+        raise HTTPException(status_code=413, detail=f"Too many rows in request, maximum is {BULK_ITEMS_MAX_ROWS}")
+
+    context = _BulkContext(db, request)
+    errors: List[dict] = []
+    now = datetime.now()
+
+    def error(operation: str, index: int, detail: str):
+        errors.append({"operation": operation, "index": index, "detail": detail})
+
+    to_create: Dict[int, dict] = {}
+    for index, row in enumerate(request.create):
+        if not row.inventory_number:
+            error("create", index, "Inventory number is required")
+            continue
+        detail = context.reference_error(row)
+        if detail:
+            error("create", index, detail)
+            continue
+        to_create[index] = {
+            "inventory_number": row.inventory_number,
+            "name": row.name,
+            "description": row.description,
+            "category_id": row.category_id,
+            "condition": _condition(row.condition or InventoryCondition.NORMAL),
+            "room_id": row.room_id,
+            "user_id": row.user_id,
+            "photo": row.photo,
+            "purchase_date": row.purchase_date,
+            "purchase_price": row.purchase_price,
+            "warranty_until": row.warranty_until,
+        }
+
+    to_update: Dict[int, dict] = {}
+    seen_update_ids = set()
+    for index, row in enumerate(request.update):
+        if row.id not in context.item_ids:
+            error("update", index, "Item not found")
+            continue
+        if row.id in seen_update_ids:
+            error("update", index, "Duplicate item id in request")
+            continue
+        if row.id in context.delete_ids:
+            error("update", index, "Item is also listed for deletion")
+            continue
+        values = row.dict(exclude_unset=True)
+        detail = next(
+            (f"Field {field} cannot be null" for field in _REQUIRED_FIELDS
+             if field in values and values[field] is None),
+            ""
+        )
+        detail = detail or context.reference_error(row)
+        if detail:
+            error("update", index, detail)
+            continue
+
+        if "condition" in values:
+            values["condition"] = _condition(values["condition"])
+        values["updated_at"] = now
+
+        seen_update_ids.add(row.id)
+        to_update[index] = values
+
+    to_delete: Dict[int, int] = {}
+    for index, item_id in enumerate(request.delete):
+        if item_id not in context.item_ids:
+            error("delete", index, "Item not found")
+        elif item_id not in to_delete.values():
+            to_delete[index] = item_id
+
+    _check_numbers(context, to_create, to_update, to_delete, error)
+
+    try:
+        created_ids = _write(db, context, to_create, to_update, to_delete)
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        created_ids = _write_row_by_row(db, to_create, to_update, to_delete, error)
+        db.commit()
+
+    return {
+        "created": [{"index": index, "id": item_id} for index, item_id in sorted(created_ids.items())],
+        "updated": [values["id"] for values in to_update.values()],
+        "deleted": list(to_delete.values()),
+        "errors": sorted(errors, key=lambda row: (_OPERATIONS.index(row["operation"]), row["index"])),
+    }
@@ -0,0 +1,354 @@
+"""
+Обслуживание журнала: месячные партиции logs и срок хранения.
+
+    python -m backend.services.log_retention [--dry-run]
+
+В PostgreSQL (после миграции 0003_partition_logs) logs разбит на партиции logs_pYYYYMM
+по created_at: заранее создаются партиции на LOG_PARTITIONS_AHEAD месяцев вперед,
+месяцы старше LOG_RETENTION_MONTHS выгружаются в LOG_ARCHIVE_PATH (CSV, gzip)
+и удаляются целой партицией (DETACH + DROP), без DELETE и VACUUM.
+Записи, попавшие в logs_default (месяц без партиции), выгружаются и удаляются по тем же
+месяцам через DELETE.
+В остальных СУБД старые месяцы выгружаются так же, но удаляются через DELETE
+"""
+import argparse
+import csv
+import gzip
+import io
+import logging
+import os
+import re
+import threading
+from datetime import datetime, timedelta
+from typing import Callable, List, Optional, Tuple
+
+from pytz import timezone
+from sqlalchemy import delete, func, select, text
+from sqlalchemy.engine import Connection, Engine
+
+from backend.configurations.config import (
+    LOG_RETENTION_MONTHS, LOG_ARCHIVE_PATH, LOG_PARTITIONS_AHEAD, LOG_MAINTENANCE_INTERVAL_HOURS
+)
+from backend.configurations.database import engine
+from backend.core.entities import Log
+from backend.services.conditional import bump_versions
+
+logger = logging.getLogger(__name__)
+
+MOSCOW = timezone('Europe/Moscow')
+ARCHIVE_COLUMNS = ("id", "description", "type", "created_at", "related_entity_link", "user_id")
+ARCHIVE_FETCH_SIZE = 10000
+DEFAULT_PARTITION = "logs_default"
+_PARTITION_NAME = re.compile(r"^logs_p(\d{4})(\d{2})$")
+
+
+def month_start(moment: datetime) -> datetime:
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(MOSCOW).replace(tzinfo=None)
+    return MOSCOW.localize(datetime(moment.year, moment.month, 1))
+
+
+def add_months(month: datetime, count: int) -> datetime:
+    index = month.year * 12 + month.month - 1 + count
+    return MOSCOW.localize(datetime(index // 12, index % 12 + 1, 1))
+
+
+def partition_name(month: datetime) -> str:
+    return f"logs_p{month:%Y%m}"
+
+
+def is_partitioned(connection: Connection) -> bool:
+    if connection.dialect.name != "postgresql":
+        return False
+    kind = connection.execute(text(
+        "SELECT c.relkind FROM pg_class c WHERE c.oid = to_regclass('logs')"
+    )).scalar()
+    return kind == "p"
+
+
+def list_partitions(connection: Connection) -> List[Tuple[str, datetime]]:
+    """
+    Месячные партиции logs (имя, начало месяца) по возрастанию; logs_default не входит
+    """
+    names = connection.execute(text(
+        "SELECT c.relname FROM pg_inherits i "
+        "JOIN pg_class c ON c.oid = i.inhrelid "
+        "WHERE i.inhparent = to_regclass('logs')"
+    )).scalars()
+    partitions = []
+    for name in names:
+        match = _PARTITION_NAME.match(name)
+        if match:
+            partitions.append((name, MOSCOW.localize(datetime(int(match[1]), int(match[2]), 1))))
+    return sorted(partitions, key=lambda partition: partition[1])
+
+
+def ensure_partitions(connection: Connection, now: datetime, months_ahead: int = LOG_PARTITIONS_AHEAD) -> List[str]:
+    """
+    Создает партиции с текущего месяца на months_ahead вперед.
+    Заранее — чтобы новые записи не попадали в logs_default
+    """
+    existing = {name for name, _ in list_partitions(connection)}
+    created = []
+    current = month_start(now)
+    for offset in range(months_ahead + 1):
+        start = add_months(current, offset)
+        name = partition_name(start)
+        if name in existing:
+            continue
+        connection.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF logs "
+            f"FOR VALUES FROM ('{start.isoformat()}') TO ('{add_months(start, 1).isoformat()}')"
+        ))
+        created.append(name)
+    return created
+
+
+def _archive_file(archive_path: str, month: datetime) -> str:
+    os.makedirs(archive_path, exist_ok=True)
+    path = os.path.join(archive_path, f"logs_{month:%Y_%m}.csv.gz")
+    # Повторная выгрузка того же месяца (записи, добавленные задним числом) не затирает прежний архив
+    suffix = 1
+    while os.path.exists(path):
+        path = os.path.join(archive_path, f"logs_{month:%Y_%m}.{suffix}.csv.gz")
+        suffix += 1
+    return path
+
+
+class _ArchiveWriter:
+    """
+    Файловый объект для архива: пишет в gzip и считает несжатые байты
+    """
+
+    def __init__(self, archive):
+        self.archive = archive
+        self.size = 0
+
+    def write(self, data) -> int:
+        self.archive.write(data)
+        self.size += len(data)
+        return len(data)
+
+
+def _write_archive(path: str, write: Callable[[_ArchiveWriter], None]) -> int:
+    """
+    Пишет архив во временный файл и переименовывает его только после fsync:
+    месяц удаляется из БД, когда архив уже гарантированно на диске
+    """
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "wb") as raw:
+        with gzip.GzipFile(fileobj=raw, mode="wb") as archive:
+            writer = _ArchiveWriter(archive)
+            write(writer)
+        raw.flush()
+        os.fsync(raw.fileno())
+    os.replace(temp_path, path)
+    return writer.size
+
+
+def _copy_out(connection: Connection, source: str, out: _ArchiveWriter, header: bool):
+    """
+    COPY TO STDOUT: PostgreSQL отдает данные потоком, без выборки строк в Python;
+    куски сразу пишутся в архив
+    """
+    sql = f"COPY {source} TO STDOUT (FORMAT csv{', HEADER' if header else ''})"
+    cursor = connection.connection.driver_connection.cursor()
+    try:
+        if hasattr(cursor, "copy"):  # psycopg 3
+            with cursor.copy(sql) as copy:
+                for data in copy:
+                    out.write(bytes(data))
+        else:  # psycopg2 сам вызывает out.write для каждого куска
+            cursor.copy_expert(sql, out)
+    finally:
+        cursor.close()
+
+
+def _month_range_sql(month: datetime) -> str:
+    return f"created_at >= '{month.isoformat()}' AND created_at < '{add_months(month, 1).isoformat()}'"
+
+
+def _select_month(connection: Connection, start: datetime, end: datetime, out: _ArchiveWriter):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(ARCHIVE_COLUMNS)
+    result = connection.execution_options(yield_per=ARCHIVE_FETCH_SIZE).execute(
+        select(*(getattr(Log, column) for column in ARCHIVE_COLUMNS))
+        .where(Log.created_at >= start, Log.created_at < end)
+        .order_by(Log.created_at, Log.id)
+    )
+    for row in result:
+        writer.writerow(row)
+        if buffer.tell() > 1024 * 1024:
+            out.write(buffer.getvalue().encode("utf-8"))
+            buffer.seek(0)
+            buffer.truncate()
+    out.write(buffer.getvalue().encode("utf-8"))
+
+
+def _default_months(connection: Connection, before: datetime) -> List[datetime]:
+    """
+    Месяцы записей в logs_default старше before. Туда попадают записи, для месяца которых
+    не нашлось партиции (задним числом или пока обслуживание не запускалось)
+    """
+    if connection.execute(text(f"SELECT to_regclass('{DEFAULT_PARTITION}')")).scalar() is None:
+        return []
+    months = connection.execute(text(
+        f"SELECT DISTINCT date_trunc('month', created_at AT TIME ZONE 'Europe/Moscow') "
+        f"FROM {DEFAULT_PARTITION} WHERE created_at < :before"
+    ), {"before": before}).scalars()
+    return [MOSCOW.localize(month) for month in months]
+
+
+def expired_months(connection: Connection, now: datetime, keep_months: int) -> List[datetime]:
+    """
+    Начала месяцев, целиком вышедших за срок хранения
+    """
+    cutoff = add_months(month_start(now), -keep_months)
+    if is_partitioned(connection):
+        months = {month for _, month in list_partitions(connection) if add_months(month, 1) <= cutoff}
+        months.update(_default_months(connection, cutoff))
+        return sorted(months)
+
+    oldest = connection.execute(select(func.min(Log.created_at))).scalar()
+    if oldest is None:
+        return []
+    if oldest.tzinfo is None:
+        oldest = MOSCOW.localize(oldest)
+    months = []
+    month = month_start(oldest)
+    while add_months(month, 1) <= cutoff:
+        months.append(month)
+        month = add_months(month, 1)
+    return months
+
+
+def retire_month(connection: Connection, month: datetime, archive_path: Optional[str]) -> dict:
+    """
+    Выгружает месяц в архив (если задан путь) и удаляет его из БД.
+    В PostgreSQL месяц — партиция logs_pYYYYMM и/или записи этого месяца в logs_default
+    """
+    end = add_months(month, 1)
+    result = {"month": f"{month:%Y-%m}", "archive": None, "archived_bytes": 0}
+
+    if not is_partitioned(connection):
+        if archive_path:
+            path = _archive_file(archive_path, month)
+            result["archived_bytes"] = _write_archive(path, lambda out: _select_month(connection, month, end, out))
+            result["archive"] = path
+        connection.execute(delete(Log).where(Log.created_at >= month, Log.created_at < end))
+        return result
+
+    name = partition_name(month)
+    has_partition = name in {partition for partition, _ in list_partitions(connection)}
+    has_default_rows = month in _default_months(connection, end)
+    sources = []
+    if has_partition:
+        sources.append(f"{name} ({', '.join(ARCHIVE_COLUMNS)})")
+    if has_default_rows:
+        sources.append(
+            f"(SELECT {', '.join(ARCHIVE_COLUMNS)} FROM {DEFAULT_PARTITION} "
+            f"WHERE {_month_range_sql(month)} ORDER BY created_at, id)"
+        )
+
+    if archive_path and sources:
+        def write(out: _ArchiveWriter):
+            for index, source in enumerate(sources):
+                _copy_out(connection, source, out, header=index == 0)
+
+        path = _archive_file(archive_path, month)
+        result["archived_bytes"] = _write_archive(path, write)
+        result["archive"] = path
+
+    if has_partition:
+        connection.execute(text(f"ALTER TABLE logs DETACH PARTITION {name}"))
+        connection.execute(text(f"DROP TABLE {name}"))
+    if has_default_rows:
+        connection.execute(text(f"DELETE FROM {DEFAULT_PARTITION} WHERE {_month_range_sql(month)}"))
+    return result
+
+
+def run_maintenance(db_engine: Engine = engine, now: Optional[datetime] = None,
+                    keep_months: int = LOG_RETENTION_MONTHS, archive_path: Optional[str] = LOG_ARCHIVE_PATH,
+                    dry_run: bool = False) -> dict:
+    now = now or datetime.now(MOSCOW)
+    report = {"created_partitions": [], "retired": []}
+    with db_engine.begin() as connection:
+        if is_partitioned(connection) and not dry_run:
+            report["created_partitions"] = ensure_partitions(connection, now)
+
+    if keep_months <= 0:
+        return report
+
+    with db_engine.connect() as connection:
+        months = expired_months(connection, now, keep_months)
+    for month in months:
+        if dry_run:
+            report["retired"].append({"month": f"{month:%Y-%m}", "archive": None, "archived_bytes": 0})
+            continue
+        # Каждый месяц — отдельная транзакция: сбой не откатывает уже выгруженные месяцы
+        with db_engine.begin() as connection:
+            report["retired"].append(retire_month(connection, month, archive_path))
+            bump_versions(connection, [Log.__tablename__])
+    return report
+
+
+class LogMaintenance:
+    """
+    Фоновый поток: run_maintenance при старте и далее раз в interval_hours
+    """
+
+    def __init__(self, db_engine: Engine = engine, interval_hours: float = LOG_MAINTENANCE_INTERVAL_HOURS):
+        self.db_engine = db_engine
+        self.interval = timedelta(hours=interval_hours)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if self.running or self.interval <= timedelta(0):
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="log-maintenance", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 10.0):
+        if not self.running:
+            return
+        self._stop.set()
+        self._thread.join(timeout)
+        self._thread = None
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                report = run_maintenance(self.db_engine)
+                if report["created_partitions"] or report["retired"]:
+                    logger.info(f"Обслуживание журнала: {report}")
+            except Exception:
+                logger.error("Ошибка обслуживания журнала", exc_info=True)
+            self._stop.wait(self.interval.total_seconds())
+
+
+log_maintenance = LogMaintenance()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Партиции и срок хранения журнала")
+    parser.add_argument("--dry-run", action="store_true", help="только показать, какие месяцы будут удалены")
+    args = parser.parse_args()
+
+    report = run_maintenance(dry_run=args.dry_run)
+    for name in report["created_partitions"]:
+        print(f"создана партиция {name}")
+    for month in report["retired"]:
+        action = "будет удален" if args.dry_run else "удален"
+        archive = f", архив {month['archive']}" if month["archive"] else ""
+        print(f"{month['month']}: {action}{archive}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+from typing import AsyncIterator, Callable, Type
+
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.configurations.config import NDJSON_FETCH_SIZE
+from backend.configurations.database import async_session
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+def ndjson_response(rows: Callable[[AsyncSession], AsyncIterator], model: Type[BaseModel],
+                    filename: str = None) -> StreamingResponse:
+    """
+    Потоковая выгрузка всей выборки в NDJSON — по объекту JSON на строку.
+    rows(db) читает курсор порциями по NDJSON_FETCH_SIZE, каждая порция сразу уходит
+    клиенту, поэтому память воркера не зависит от размера таблицы.
+    Сессия открывается внутри генератора: ответ читается дольше, чем живет get_async_db
+    """
+    async def lines():
+        async with async_session() as db:
+            batch = []
+            async for row in rows(db):
+                batch.append(model.model_validate(row, from_attributes=True).model_dump_json())
+                if len(batch) >= NDJSON_FETCH_SIZE:
+                    yield "\n".join(batch) + "\n"
+                    batch = []
+            if batch:
+                yield "\n".join(batch) + "\n"
+
+    headers = {"Content-Disposition": f'attachment; filename="{filename}"'} if filename else None
+    return StreamingResponse(lines(), media_type=NDJSON_MEDIA_TYPE, headers=headers)
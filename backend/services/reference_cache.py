@@ -0,0 +1,276 @@
+"""
+Кеш справочников (помещения, категории) с чтением через кеш.
+
+Хранятся готовые JSON-ответы, поэтому повторный запрос не трогает БД,
+а по совпавшему If-None-Match отдается 304. Кеш сбрасывается после
+коммита любой сессии, в которой менялись Room или InventoryCategory.
+
+Бэкенды:
+- "memory" — в памяти процесса (TTL + LRU). При нескольких воркерах
+  сброс виден только в своем процессе, остальные обновятся по TTL;
+- "redis" — общий Redis-совместимый сервер (нужен пакет redis), сброс виден всем воркерам;
+  обращения к нему из async-эндпоинтов выполняются в пуле потоков, а не в цикле событий
+"""
+import logging
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Type
+
+from fastapi import Request, Response
+from pydantic import BaseModel, TypeAdapter
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from backend.configurations.config import (
+    REFERENCE_CACHE_BACKEND, REFERENCE_CACHE_TTL_SECONDS,
+    REFERENCE_CACHE_MAX_ENTRIES, REFERENCE_CACHE_REDIS_URL
+)
+from backend.core.entities import Room, InventoryCategory
+from backend.services.blob_response import etag_matches, make_etag
+
+logger = logging.getLogger(__name__)
+
+ROOMS = "rooms"
+CATEGORIES = "categories"
+
+_NAMESPACES = {Room: ROOMS, InventoryCategory: CATEGORIES}
+_TABLE_NAMESPACES = {entity.__tablename__: namespace for entity, namespace in _NAMESPACES.items()}
+
+
+class CacheBackend(ABC):
+    """
+    Хранилище значений по ключу. Ключ включает поколение пространства имен:
+    сброс пространства только увеличивает поколение, старые ключи вытесняются сами
+    """
+
+    # True — методы блокируют (обращение по сети): ReferenceCache вызывает их в пуле потоков
+    blocking = False
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[bytes]:
+        ...
+
+    @abstractmethod
+    def set(self, key: str, value: bytes, ttl: float):
+        ...
+
+    @abstractmethod
+    def generation(self, namespace: str) -> int:
+        ...
+
+    @abstractmethod
+    def invalidate(self, namespace: str):
+        ...
+
+
+class MemoryCache(CacheBackend):
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._generations: Dict[str, int] = {}
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: bytes, ttl: float):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def generation(self, namespace: str) -> int:
+        with self._lock:
+            return self._generations.get(namespace, 0)
+
+    def invalidate(self, namespace: str):
+        with self._lock:
+            self._generations[namespace] = self._generations.get(namespace, 0) + 1
+            prefix = f"{namespace}:"
+            for key in [key for key in self._entries if key.startswith(prefix)]:
+                del self._entries[key]
+
+
+class RedisCache(CacheBackend):
+    """
+    Синхронный клиент redis; ReferenceCache вызывает его из пула потоков.
+    Сброс (invalidate) выполняется при коммите — в потоке синхронного эндпоинта
+    """
+
+    blocking = True
+
+    def __init__(self, client, prefix: str = "refcache:"):
+        self.client = client
+        self.prefix = prefix
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self.client.get(self.prefix + key)
+
+    def set(self, key: str, value: bytes, ttl: float):
+        self.client.set(self.prefix + key, value, px=int(ttl * 1000))
+
+    def generation(self, namespace: str) -> int:
+        return int(self.client.get(f"{self.prefix}{namespace}:generation") or 0)
+
+    def invalidate(self, namespace: str):
+        self.client.incr(f"{self.prefix}{namespace}:generation")
+
+
+class ReferenceCache:
+    def __init__(self, backend: Optional[CacheBackend], ttl: float = REFERENCE_CACHE_TTL_SECONDS):
+        self.backend = backend
+        self.ttl = ttl
+        self._stats_lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "invalidations": 0, "errors": 0}
+
+    def _count(self, name: str):
+        with self._stats_lock:
+            self._stats[name] += 1
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            return {"backend": type(self.backend).__name__ if self.backend else None, **self._stats}
+
+    async def get_or_load(self, namespace: str, key: str,
+                          load: Callable[[], Awaitable[Optional[bytes]]]) -> Optional[bytes]:
+        """
+        Значение из кеша или load(). None от load (например, запись не найдена) не кешируется.
+        Ошибка бэкенда не ломает запрос: значение просто читается из БД
+        """
+        if self.backend is None:
+            return await load()
+
+        def lookup():
+            # Поколение читается до запроса к БД: если во время загрузки справочник
+            # изменится, значение уйдет под старым поколением и не будет прочитано
+            full_key = f"{namespace}:{self.backend.generation(namespace)}:{key}"
+            return full_key, self.backend.get(full_key)
+
+        try:
+            full_key, value = await self._call(lookup)
+        except Exception:
+            logger.warning("Кеш справочников недоступен", exc_info=True)
+            self._count("errors")
+            return await load()
+
+        if value is not None:
+            self._count("hits")
+            return value
+
+        self._count("misses")
+        value = await load()
+        if value is not None:
+            try:
+                await self._call(self.backend.set, full_key, value, self.ttl)
+            except Exception:
+                logger.warning("Не удалось записать в кеш справочников", exc_info=True)
+                self._count("errors")
+        return value
+
+    async def _call(self, fn, *args):
+        if self.backend.blocking:
+            return await run_in_threadpool(fn, *args)
+        return fn(*args)
+
+    def invalidate(self, namespace: str):
+        if self.backend is None:
+            return
+        try:
+            self.backend.invalidate(namespace)
+            self._count("invalidations")
+        except Exception:
+            logger.error(f"Не удалось сбросить кеш справочника {namespace}", exc_info=True)
+            self._count("errors")
+
+
+def create_cache_backend(backend: Optional[str] = REFERENCE_CACHE_BACKEND) -> Optional[CacheBackend]:
+    if not backend:
+        return None
+    if backend == "memory":
+        return MemoryCache(REFERENCE_CACHE_MAX_ENTRIES)
+    if backend == "redis":
+        # redis нужен только для этого варианта
+        import redis
+        return RedisCache(redis.Redis.from_url(REFERENCE_CACHE_REDIS_URL))
+    raise ValueError(f"Unknown reference cache backend: {backend}")
+
+
+reference_cache = ReferenceCache(create_cache_backend())
+
+
+def _changed_namespaces(session: Session) -> set:
+    namespaces = set()
+    for instance in (*session.new, *session.dirty, *session.deleted):
+        namespace = _NAMESPACES.get(type(instance))
+        if namespace is not None:
+            namespaces.add(namespace)
+    return namespaces
+
+
+def _remember(session: Session, namespaces: set):
+    if namespaces:
+        session.info.setdefault("reference_cache_changed", set()).update(namespaces)
+
+
+@event.listens_for(Session, "before_flush")
+def _collect_changes(session: Session, flush_context, instances):
+    _remember(session, _changed_namespaces(session))
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _collect_statement_changes(state):
+    # session.execute(insert/update/delete(Room)) идет мимо flush
+    if state.is_insert or state.is_update or state.is_delete:
+        namespace = _TABLE_NAMESPACES.get(state.statement.table.name)
+        if namespace is not None:
+            _remember(state.session, {namespace})
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_changed(session: Session):
+    for namespace in session.info.pop("reference_cache_changed", ()):
+        reference_cache.invalidate(namespace)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_changes(session: Session):
+    session.info.pop("reference_cache_changed", None)
+
+
+def serialize(model: Type[BaseModel], value: Any, many: bool = False) -> bytes:
+    if many:
+        return TypeAdapter(List[model]).dump_json([model.model_validate(row, from_attributes=True) for row in value])
+    return model.model_validate(value, from_attributes=True).model_dump_json().encode()
+
+
+async def cached_json(request: Request, namespace: str, key: str,
+                      load: Callable[[], Awaitable[Optional[bytes]]]) -> Optional[Response]:
+    """
+    JSON-ответ из кеша с ETag; 304 без тела, если у клиента та же версия.
+    None — load ничего не нашел (решение об ответе остается за эндпоинтом)
+    """
+    body = await reference_cache.get_or_load(namespace, key, load)
+    if body is None:
+        return None
+
+    headers = {
+        "ETag": make_etag(body),
+        # Справочник доступен только после входа; браузер хранит его, но каждый раз сверяет ETag
+        "Cache-Control": "private, no-cache",
+    }
+    if etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
@@ -0,0 +1,89 @@
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy.orm import Session
+
+from backend.core.entities import (
+    User, Room, InventoryCategory, InventoryItem,
+    Consumable, Log, InventoryCondition
+)
+
+FETCH_BATCH_SIZE = 1000  # строк на одну выборку серверного курсора
+
+
+# Выборки для отчетов. Каждая выполняется одним запросом: имена связанных
+# сущностей подтягиваются join'ом, а не отдельным запросом на каждую строку,
+# бинарные колонки (фото, аватары) не выбираются.
+
+def users_rows(db: Session):
+    return (
+        db.query(
+            User.id, User.username, User.email, User.full_name,
+            User.phone_number, User.is_admin, User.is_active, User.registered_at
+        )
+        .order_by(User.id)
+        .yield_per(FETCH_BATCH_SIZE)
+    )
+
+
+def rooms_rows(db: Session):
+    return (
+        db.query(Room.id, Room.name, Room.description)
+        .order_by(Room.id)
+        .yield_per(FETCH_BATCH_SIZE)
+    )
+
+
+def categories_rows(db: Session):
+    return (
+        db.query(InventoryCategory.id, InventoryCategory.name,
+                 InventoryCategory.short_name, InventoryCategory.description)
+        .order_by(InventoryCategory.id)
+        .yield_per(FETCH_BATCH_SIZE)
+    )
+
+
+def inventory_items_rows(db: Session, condition: Optional[InventoryCondition] = None):
+    query = (
+        db.query(
+            InventoryItem.id,
+            InventoryItem.inventory_number,
+            InventoryItem.name,
+            InventoryItem.condition,
+            InventoryItem.purchase_date,
+            InventoryItem.purchase_price,
+            InventoryItem.updated_at,
+            InventoryCategory.name.label("category_name"),
+            Room.name.label("room_name"),
+            User.full_name.label("user_full_name")
+        )
+        .outerjoin(InventoryCategory, InventoryItem.category_id == InventoryCategory.id)
+        .outerjoin(Room, InventoryItem.room_id == Room.id)
+        .outerjoin(User, InventoryItem.user_id == User.id)
+    )
+    if condition is not None:
+        query = query.filter(InventoryItem.condition == condition)
+    return query.order_by(InventoryItem.id).yield_per(FETCH_BATCH_SIZE)
+
+
+def consumables_rows(db: Session, low_stock_only: bool = False):
+    query = db.query(
+        Consumable.id, Consumable.name, Consumable.description,
+        Consumable.quantity, Consumable.min_quantity, Consumable.unit
+    )
+    if low_stock_only:
+        query = query.filter(Consumable.quantity <= Consumable.min_quantity)
+    return query.order_by(Consumable.id).yield_per(FETCH_BATCH_SIZE)
+
+
+def logs_rows(db: Session, date_from: Optional[datetime] = None, date_to: Optional[datetime] = None):
+    # Период по created_at ограничивает чтение нужными партициями журнала
+    query = (
+        db.query(Log.id, Log.description, Log.type, Log.created_at, User.username)
+        .outerjoin(User, Log.user_id == User.id)
+    )
+    if date_from is not None:
+        query = query.filter(Log.created_at >= date_from)
+    if date_to is not None:
+        query = query.filter(Log.created_at < date_to)
+    return query.order_by(Log.created_at.desc(), Log.id.desc()).yield_per(FETCH_BATCH_SIZE)
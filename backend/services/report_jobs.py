@@ -0,0 +1,458 @@
+"""
+Фоновое формирование Excel-отчетов.
+
+POST создает задачу в локальной очереди — файле SQLite в REPORT_JOBS_PATH, внешний
+брокер не нужен. Поток-диспетчер забирает задачи из очереди и отдает их пулу из
+REPORT_JOB_WORKERS процессов: отчет строится build_report / write_report в отдельном
+процессе и не занимает ни поток, ни GIL веб-воркера. Готовый файл лежит на диске
+REPORT_JOB_TTL_HOURS часов и скачивается по постоянному адресу задачи.
+
+Одинаковые запросы (тип отчета и параметры, от любого пользователя), пока задача
+в очереди или выполняется, получают ту же задачу; доступ к ней проверяется по типу отчета.
+Очередь общая для всех воркеров uvicorn на одной машине: задачу забирает тот,
+кто первым освободился. Если упал процесс пула, пул сразу пересоздается, а его задачи
+возвращаются в очередь (не больше MAX_ATTEMPTS попыток на задачу). Задачи, оставшиеся
+«выполняемыми» после падения веб-воркера, возвращаются в очередь при следующем запуске
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Optional
+
+from fastapi import HTTPException
+from pytz import timezone
+from starlette.concurrency import run_in_threadpool
+
+from backend.configurations.config import (
+    REPORT_JOBS_PATH, REPORT_JOB_WORKERS, REPORT_JOB_MAX_QUEUE, REPORT_JOB_TTL_HOURS
+)
+from backend.core.entities import InventoryCondition
+from backend.core.schemas import ReportType
+
+logger = logging.getLogger(__name__)
+
+MOSCOW = timezone('Europe/Moscow')
+POLL_INTERVAL_SECONDS = 1.0  # как часто диспетчер заглядывает в очередь без сигнала о новой задаче
+WAIT_POLL_SECONDS = 0.5  # как часто ожидающий запрос перечитывает статус
+CLEANUP_INTERVAL_SECONDS = 300
+MAX_ATTEMPTS = 2  # задача, при которой процесс пула падает снова и снова, в итоге завершается ошибкой
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS report_jobs (
+    id TEXT PRIMARY KEY,
+    request_key TEXT NOT NULL,
+    report_type TEXT NOT NULL,
+    params TEXT NOT NULL,
+    status TEXT NOT NULL,
+    detail TEXT,
+    filename TEXT NOT NULL,
+    size INTEGER,
+    user_id INTEGER,
+    worker_pid INTEGER,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    expires_at REAL
+);
+CREATE INDEX IF NOT EXISTS ix_report_jobs_status ON report_jobs (status, created_at);
+CREATE INDEX IF NOT EXISTS ix_report_jobs_request_key ON report_jobs (request_key, status);
+"""
+
+
+def generate_report_file(report_type: str, params: dict, path: str) -> int:
+    """
+    Выполняется в процессе пула: своя сессия БД, файл пишется рядом и
+    переименовывается, поэтому недописанный отчет по адресу задачи не появится
+    """
+    from backend.configurations.database import SessionLocal
+    from backend.services.report_stream import build_report, write_report
+
+    date_from = datetime.fromisoformat(params["date_from"]) if params.get("date_from") else None
+    date_to = datetime.fromisoformat(params["date_to"]) if params.get("date_to") else None
+    partial = f"{path}.part"
+    db = SessionLocal()
+    try:
+        report = build_report(db, ReportType(report_type), params.get("condition"), date_from, date_to)
+        try:
+            write_report(report, partial)
+        except BaseException:
+            if os.path.exists(partial):
+                os.remove(partial)
+            raise
+        os.replace(partial, path)
+        return os.path.getsize(path)
+    except HTTPException as e:
+        # HTTPException плохо переживает передачу между процессами
+        raise RuntimeError(e.detail)
+    finally:
+        db.close()
+
+
+def _normalize_condition(report_type: ReportType, condition: Optional[str]) -> Optional[str]:
+    # Те же проверки, что в build_report, — до постановки в очередь, чтобы ошибка пришла сразу
+    if report_type != ReportType.INVENTORY_BY_CONDITION:
+        return None
+    if not condition:
+        raise HTTPException(status_code=400,
+                            detail="Condition parameter is required for inventory_by_condition report")
+    try:
+        return InventoryCondition(condition.upper()).value
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Некорректное состояние: {condition}")
+
+
+def _pid_alive(pid: Optional[int]) -> bool:
+    if not pid:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _timestamp(value: Optional[float]) -> Optional[datetime]:
+    return datetime.fromtimestamp(value, MOSCOW) if value is not None else None
+
+
+class ReportJobQueue:
+    def __init__(self, path: str = REPORT_JOBS_PATH, workers: int = REPORT_JOB_WORKERS,
+                 max_queue: int = REPORT_JOB_MAX_QUEUE, ttl_hours: float = REPORT_JOB_TTL_HOURS):
+        self.path = path
+        self.files_path = os.path.join(path, "files")
+        self.database = os.path.join(path, "queue.sqlite3")
+        self.workers = workers
+        self.max_queue = max_queue
+        self.ttl = ttl_hours * 3600
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._broken = False
+        self._running: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopping = False
+        self._thread: Optional[threading.Thread] = None
+        self._initialized = False
+
+    @contextmanager
+    def _connect(self):
+        if not self._initialized:
+            self._initialize()
+        connection = sqlite3.connect(self.database, timeout=30, isolation_level=None)
+        connection.row_factory = sqlite3.Row
+        try:
+            yield connection
+        finally:
+            connection.close()
+
+    def _initialize(self):
+        os.makedirs(self.files_path, exist_ok=True)
+        connection = sqlite3.connect(self.database, timeout=30, isolation_level=None)
+        try:
+            # WAL: чтение статуса не ждет записи других воркеров
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.executescript(_SCHEMA)
+            columns = {row[1] for row in connection.execute("PRAGMA table_info(report_jobs)")}
+            if "attempts" not in columns:  # очередь, созданная до появления счетчика попыток
+                connection.execute("ALTER TABLE report_jobs ADD COLUMN attempts INTEGER NOT NULL DEFAULT 0")
+        finally:
+            connection.close()
+        self._initialized = True
+
+    def file_path(self, job_id: str) -> str:
+        return os.path.join(self.files_path, f"{job_id}.xlsx")
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if self.running or self.workers <= 0:
+            return
+        self._recover()
+        self._stopping = False
+        self._executor = self._new_executor()
+        self._thread = threading.Thread(target=self._run, name="report-jobs", daemon=True)
+        self._thread.start()
+
+    def _new_executor(self) -> ProcessPoolExecutor:
+        # spawn: дочерние процессы не наследуют соединения пулов SQLAlchemy и потоки веб-воркера
+        return ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"))
+
+    def stop(self, timeout: float = 10.0):
+        if not self.running:
+            return
+        self._stopping = True
+        self._wakeup.set()
+        self._thread.join(timeout)
+        self._thread = None
+        # Начатые отчеты дописываются: иначе они вернутся в очередь и начнутся заново
+        self._executor.shutdown(wait=True)
+        self._executor = None
+
+    def submit(self, report_type: ReportType, condition: Optional[str] = None,
+               date_from: Optional[datetime] = None, date_to: Optional[datetime] = None,
+               user_id: Optional[int] = None) -> dict:
+        params = {
+            "condition": _normalize_condition(report_type, condition),
+            "date_from": date_from.isoformat() if date_from else None,
+            "date_to": date_to.isoformat() if date_to else None,
+        }
+        # Автор в ключ не входит: одинаковые запросы разных пользователей формируют отчет один раз.
+        # user_id сохраняется только как автор задачи
+        request_key = hashlib.sha256(
+            json.dumps([report_type.value, params], sort_keys=True).encode("utf-8")
+        ).hexdigest()
+
+        with self._connect() as connection:
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                row = connection.execute(
+                    "SELECT * FROM report_jobs WHERE request_key = ? AND status IN (?, ?) "
+                    "ORDER BY created_at LIMIT 1",
+                    (request_key, QUEUED, RUNNING)
+                ).fetchone()
+                if row is not None:
+                    connection.execute("COMMIT")
+                    return self._to_dict(row)
+
+                queued = connection.execute(
+                    "SELECT count(*) FROM report_jobs WHERE status = ?", (QUEUED,)
+                ).fetchone()[0]
+                if queued >= self.max_queue:
+                    raise HTTPException(status_code=503, detail="Report queue is full, try again later")
+
+                now = time.time()
+                job_id = uuid.uuid4().hex
+                filename = f"{report_type.value}_{_timestamp(now).strftime('%Y%m%d_%H%M%S')}.xlsx"
+                connection.execute(
+                    "INSERT INTO report_jobs (id, request_key, report_type, params, status, filename, user_id, created_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (job_id, request_key, report_type.value, json.dumps(params), QUEUED, filename, user_id, now)
+                )
+                row = connection.execute("SELECT * FROM report_jobs WHERE id = ?", (job_id,)).fetchone()
+                connection.execute("COMMIT")
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+
+        self._wakeup.set()
+        return self._to_dict(row)
+
+    def get(self, job_id: str) -> Optional[dict]:
+        with self._connect() as connection:
+            row = connection.execute("SELECT * FROM report_jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._to_dict(row) if row is not None else None
+
+    async def wait(self, job_id: str, timeout: float) -> Optional[dict]:
+        """
+        Статус задачи; если она еще не завершена — ждет до timeout секунд
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            job = await run_in_threadpool(self.get, job_id)
+            if job is None or job["status"] in (DONE, FAILED) or time.monotonic() >= deadline:
+                return job
+            await asyncio.sleep(min(WAIT_POLL_SECONDS, max(deadline - time.monotonic(), 0)))
+
+    def metrics(self) -> dict:
+        with self._connect() as connection:
+            counts = dict(connection.execute("SELECT status, count(*) FROM report_jobs GROUP BY status").fetchall())
+        with self._lock:
+            active = len(self._running)
+        return {
+            "workers": self.workers,
+            "active_in_process": active,
+            **{status: counts.get(status, 0) for status in (QUEUED, RUNNING, DONE, FAILED)},
+        }
+
+    def _to_dict(self, row: sqlite3.Row) -> dict:
+        expired = row["expires_at"] is not None and row["expires_at"] <= time.time()
+        return {
+            "id": row["id"],
+            "report_type": row["report_type"],
+            "status": row["status"],
+            "detail": row["detail"],
+            "filename": row["filename"],
+            "size": row["size"],
+            "created_at": _timestamp(row["created_at"]),
+            "started_at": _timestamp(row["started_at"]),
+            "finished_at": _timestamp(row["finished_at"]),
+            "expires_at": _timestamp(row["expires_at"]),
+            "expired": expired,
+            "user_id": row["user_id"],
+        }
+
+    def _recover(self):
+        """
+        Возвращает в очередь задачи, процесс которых завершился, не успев их закончить.
+        Свой pid тоже считается завершенным: в контейнере он совпадает у каждого запуска
+        """
+        with self._connect() as connection:
+            rows = connection.execute(
+                "SELECT id, worker_pid FROM report_jobs WHERE status = ?", (RUNNING,)
+            ).fetchall()
+        for row in rows:
+            if row["worker_pid"] == os.getpid() or not _pid_alive(row["worker_pid"]):
+                self._requeue(row["id"])
+
+    def _requeue(self, job_id: str):
+        """
+        Возвращает в очередь выполняемую задачу, процесс которой погиб.
+        После MAX_ATTEMPTS попыток задача завершается ошибкой
+        """
+        now = time.time()
+        with self._connect() as connection:
+            connection.execute(
+                "UPDATE report_jobs SET status = CASE WHEN attempts >= ? THEN ? ELSE ? END, "
+                "detail = CASE WHEN attempts >= ? THEN ? ELSE detail END, "
+                "finished_at = CASE WHEN attempts >= ? THEN ? END, "
+                "expires_at = CASE WHEN attempts >= ? THEN ? END, "
+                "worker_pid = NULL, started_at = NULL "
+                "WHERE id = ? AND status = ?",
+                (MAX_ATTEMPTS, FAILED, QUEUED, MAX_ATTEMPTS, "Report worker process crashed",
+                 MAX_ATTEMPTS, now, MAX_ATTEMPTS, now + self.ttl, job_id, RUNNING)
+            )
+        logger.warning(f"Задача отчета {job_id} прервана падением процесса")
+
+    def _claim(self) -> Optional[sqlite3.Row]:
+        with self._connect() as connection:
+            connection.execute("BEGIN IMMEDIATE")
+            row = connection.execute(
+                "SELECT * FROM report_jobs WHERE status = ? ORDER BY created_at LIMIT 1", (QUEUED,)
+            ).fetchone()
+            if row is not None:
+                connection.execute(
+                    "UPDATE report_jobs SET status = ?, worker_pid = ?, started_at = ?, attempts = attempts + 1 "
+                    "WHERE id = ?",
+                    (RUNNING, os.getpid(), time.time(), row["id"])
+                )
+            connection.execute("COMMIT")
+            return row
+
+    def _unclaim(self, job_id: str):
+        with self._connect() as connection:
+            connection.execute(
+                "UPDATE report_jobs SET status = ?, worker_pid = NULL, started_at = NULL, attempts = attempts - 1 "
+                "WHERE id = ? AND status = ?",
+                (QUEUED, job_id, RUNNING)
+            )
+
+    def _reset_pool(self):
+        """
+        Процесс пула упал (например, по памяти): пул непригоден. Создаем новый сразу,
+        а задачи, которые выполнял старый пул, возвращаем в очередь
+        """
+        with self._lock:
+            lost = list(self._running)
+            self._running.clear()
+            self._broken = False
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._executor = self._new_executor()
+        for job_id in lost:
+            self._requeue(job_id)
+
+    def _dispatch(self):
+        if self._broken:
+            self._reset_pool()
+        while True:
+            with self._lock:
+                if len(self._running) >= self.workers:
+                    return
+            row = self._claim()
+            if row is None:
+                return
+            try:
+                future = self._executor.submit(
+                    generate_report_file, row["report_type"], json.loads(row["params"]), self.file_path(row["id"])
+                )
+            except Exception as e:
+                # Задача уже помечена выполняемой под живым pid: без возврата в очередь
+                # ее не подхватил бы ни _recover, ни другой воркер
+                self._unclaim(row["id"])
+                if not isinstance(e, BrokenProcessPool):
+                    raise
+                self._reset_pool()
+                continue
+            with self._lock:
+                self._running[row["id"]] = future
+            future.add_done_callback(lambda done, job_id=row["id"]: self._finish(job_id, done))
+
+    def _finish(self, job_id: str, future: Future):
+        with self._lock:
+            if self._running.get(job_id) is not future:
+                # Пул уже пересоздан, и задача возвращена в очередь в _reset_pool
+                return
+        now = time.time()
+        error = future.exception() if not future.cancelled() else RuntimeError("cancelled")
+        if isinstance(error, BrokenProcessPool):
+            # Задачу вернет в очередь _reset_pool в потоке-диспетчере
+            self._broken = True
+            self._wakeup.set()
+            return
+        with self._connect() as connection:
+            if error is None:
+                connection.execute(
+                    "UPDATE report_jobs SET status = ?, size = ?, finished_at = ?, expires_at = ? WHERE id = ?",
+                    (DONE, future.result(), now, now + self.ttl, job_id)
+                )
+            else:
+                logger.error(f"Ошибка формирования отчета {job_id}: {error!r}")
+                connection.execute(
+                    "UPDATE report_jobs SET status = ?, detail = ?, finished_at = ?, expires_at = ? WHERE id = ?",
+                    (FAILED, str(error) or type(error).__name__, now, now + self.ttl, job_id)
+                )
+        with self._lock:
+            self._running.pop(job_id, None)
+        self._wakeup.set()
+
+    def cleanup(self) -> int:
+        """
+        Удаляет файлы и записи задач, срок хранения которых истек
+        """
+        with self._connect() as connection:
+            rows = connection.execute(
+                "SELECT id FROM report_jobs WHERE status IN (?, ?) AND expires_at <= ?", (DONE, FAILED, time.time())
+            ).fetchall()
+            for row in rows:
+                path = self.file_path(row["id"])
+                if os.path.exists(path):
+                    os.remove(path)
+                connection.execute("DELETE FROM report_jobs WHERE id = ?", (row["id"],))
+        return len(rows)
+
+    def _run(self):
+        last_cleanup = 0.0
+        while not self._stopping:
+            try:
+                self._dispatch()
+                if time.monotonic() - last_cleanup >= CLEANUP_INTERVAL_SECONDS:
+                    last_cleanup = time.monotonic()
+                    removed = self.cleanup()
+                    if removed:
+                        logger.info(f"Удалено устаревших отчетов: {removed}")
+            except Exception:
+                logger.error("Ошибка очереди отчетов", exc_info=True)
+            self._wakeup.wait(POLL_INTERVAL_SECONDS)
+            self._wakeup.clear()
+
+
+report_jobs = ReportJobQueue()
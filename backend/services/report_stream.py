@@ -0,0 +1,358 @@
+import os
+import pickle
+import tempfile
+from datetime import datetime, timedelta
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
+
+from fastapi import HTTPException
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Alignment, Border, Font, NamedStyle, PatternFill, Side
+from openpyxl.utils import get_column_letter
+from pytz import timezone
+from sqlalchemy.orm import Session
+
+from backend.configurations.config import LOG_REPORT_DEFAULT_DAYS
+from backend.core.entities import InventoryCondition
+from backend.core.schemas import ReportType
+from backend.services import report_data
+
+XLSX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+STREAM_CHUNK_SIZE = 64 * 1024  # размер чанка ответа, байт
+MIN_COLUMN_WIDTH = 12
+SHEET_TITLE_MAX_LENGTH = 31  # Excel не принимает имена листов длиннее
+
+LOG_TYPES = {
+    1: "Информация",
+    2: "Предупреждение",
+    3: "Ошибка",
+    4: "Критическая"
+}
+
+LOG_STYLES = {
+    2: "report_warning",
+    3: "report_error",
+    4: "report_critical",
+}
+
+# Отчеты с персональными данными и журналом — только для администраторов
+ADMIN_REPORTS = {ReportType.USERS, ReportType.LOGS}
+
+Row = Tuple[list, str]
+
+
+class ColumnWidths:
+    """
+    Ширины колонок, накапливаемые по мере записи строк
+    """
+
+    def __init__(self, min_width: int = 12):
+        self.min_width = min_width
+        self._widths = {}
+
+    def update(self, column: int, value):
+        if value:
+            length = len(str(value))
+            if length > self._widths.get(column, 0):
+                self._widths[column] = length
+
+    def update_row(self, values, start: int = 1):
+        for column, value in enumerate(values, start=start):
+            self.update(column, value)
+
+    def apply(self, ws):
+        for column, width in self._widths.items():
+            ws.column_dimensions[get_column_letter(column)].width = max(width, self.min_width)
+
+
+def _build_named_styles() -> List[NamedStyle]:
+    """
+    Именованные стили отчета. Создаются заново для каждой книги,
+    так как NamedStyle привязывается к книге при регистрации
+    """
+    thin = Side(style="thin")
+    thin_border = Border(left=thin, right=thin, top=thin, bottom=thin)
+    cell_alignment = Alignment(wrap_text=True, vertical="center")
+
+    def filled_cell(name, color):
+        return NamedStyle(
+            name=name,
+            border=thin_border,
+            alignment=cell_alignment,
+            fill=PatternFill(start_color=color, end_color=color, fill_type="solid")
+        )
+
+    return [
+        NamedStyle(name="report_title", font=Font(bold=True, size=12), alignment=Alignment(horizontal="center")),
+        NamedStyle(
+            name="report_header",
+            font=Font(bold=True, size=11, color="FFFFFF"),
+            fill=PatternFill(start_color="4F81BD", end_color="4F81BD", fill_type="solid"),
+            alignment=Alignment(horizontal="center", vertical="center", wrap_text=True),
+            border=thin_border
+        ),
+        NamedStyle(name="report_cell", border=thin_border, alignment=cell_alignment),
+        filled_cell("report_warning", "FFEB9C"),
+        filled_cell("report_error", "FFC7CE"),
+        filled_cell("report_critical", "FF0000"),
+        NamedStyle(name="report_summary", font=Font(bold=True)),
+    ]
+
+
+class StreamingReport:
+    """
+    Описание отчета: заголовки и генератор строк вида (значения, имя стиля)
+    """
+
+    def __init__(
+            self,
+            title: str,
+            sheet_title: str,
+            headers: List[str],
+            rows: Iterable[Row],
+            summary: Optional[Callable[[int], str]] = None
+    ):
+        self.title = title
+        self.sheet_title = sheet_title[:SHEET_TITLE_MAX_LENGTH]
+        self.headers = headers
+        self.rows = rows
+        self.summary = summary
+
+
+def _styled_row(ws, values, style_name) -> list:
+    cells = []
+    for value in values:
+        cell = WriteOnlyCell(ws, value=value)
+        cell.style = style_name
+        cells.append(cell)
+    return cells
+
+
+def _spool_rows(rows: Iterable[Row], widths: ColumnWidths, spool) -> int:
+    """
+    Переписывает строки во временный файл, попутно учитывая ширины колонок
+    """
+    count = 0
+    for values, style_name in rows:
+        widths.update_row(values)
+        pickle.dump((values, style_name), spool, protocol=pickle.HIGHEST_PROTOCOL)
+        count += 1
+    return count
+
+
+def write_report(report: StreamingReport, target) -> None:
+    """
+    Записывает отчет в write-only книгу. Строки проходят через временные файлы
+    (промежуточный и файл openpyxl), поэтому память не зависит от объема
+    """
+    wb = Workbook(write_only=True)
+    for style in _build_named_styles():
+        wb.add_named_style(style)
+
+    ws = wb.create_sheet(title=report.sheet_title)
+
+    with tempfile.TemporaryFile() as spool:
+        # В write-only режиме ширины колонок пишутся до данных: сначала все строки
+        # проходят через ColumnWidths и промежуточный файл, затем пишутся в лист
+        widths = ColumnWidths(MIN_COLUMN_WIDTH)
+        widths.update_row(report.headers)
+        count = _spool_rows(report.rows, widths, spool)
+        widths.apply(ws)
+
+        ws.merged_cells.add(f"A1:{get_column_letter(len(report.headers))}1")
+        ws.append(_styled_row(ws, [report.title], "report_title"))
+        ws.append([f"Сформирован: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"])
+        ws.append([])
+        ws.append(_styled_row(ws, report.headers, "report_header"))
+
+        spool.seek(0)
+        for _ in range(count):
+            values, style_name = pickle.load(spool)
+            ws.append(_styled_row(ws, values, style_name))
+
+    if report.summary:
+        ws.append([])
+        ws.append(_styled_row(ws, [report.summary(count)], "report_summary"))
+
+    wb.save(target)
+
+
+def stream_report(report: StreamingReport) -> Tuple[Iterator[bytes], int]:
+    """
+    Формирует отчет во временном файле и возвращает итератор его чанков
+    и размер. Файл удаляется после отдачи последнего чанка.
+
+    Потоковой здесь является сборка, а не отдача: строки читаются курсором
+    и сразу уходят на диск, память не растет с объемом. Первый байт клиент
+    получает только после сборки всего файла: ширины колонок известны лишь
+    после последней строки, а оглавление ZIP-контейнера XLSX пишется в конце.
+    Зато известен Content-Length, и оборванная сборка дает ошибку, а не битый файл
+    """
+    fd, path = tempfile.mkstemp(suffix=".xlsx")
+    os.close(fd)
+    try:
+        write_report(report, path)
+        size = os.path.getsize(path)
+    except Exception:
+        os.remove(path)
+        raise
+
+    def iter_chunks():
+        try:
+            with open(path, "rb") as file:
+                while chunk := file.read(STREAM_CHUNK_SIZE):
+                    yield chunk
+        finally:
+            os.remove(path)
+
+    return iter_chunks(), size
+
+
+def _format_datetime(value, fmt='%Y-%m-%d %H:%M:%S'):
+    return value.strftime(fmt) if value else ""
+
+
+def _users_rows(db: Session) -> Iterator[Row]:
+    for user in report_data.users_rows(db):
+        yield [
+            user.id,
+            user.username,
+            user.email,
+            user.full_name,
+            user.phone_number,
+            "Да" if user.is_admin else "Нет",
+            "Да" if user.is_active else "Нет",
+            _format_datetime(user.registered_at),
+        ], "report_cell"
+
+
+def _rooms_rows(db: Session) -> Iterator[Row]:
+    for room in report_data.rooms_rows(db):
+        yield [room.id, room.name, room.description or ""], "report_cell"
+
+
+def _categories_rows(db: Session) -> Iterator[Row]:
+    for category in report_data.categories_rows(db):
+        yield [category.id, category.name, category.short_name, category.description or ""], "report_cell"
+
+
+def _inventory_items_rows(db: Session) -> Iterator[Row]:
+    for item in report_data.inventory_items_rows(db):
+        yield [
+            item.id,
+            item.inventory_number,
+            item.name,
+            item.category_name or "",
+            item.condition.value if item.condition else "",
+            item.room_name or "",
+            item.user_full_name or "",
+            _format_datetime(item.purchase_date, '%Y-%m-%d'),
+            float(item.purchase_price) if item.purchase_price else "",
+        ], "report_cell"
+
+
+def _inventory_by_condition_rows(db: Session, condition: InventoryCondition) -> Iterator[Row]:
+    for item in report_data.inventory_items_rows(db, condition):
+        yield [
+            item.id,
+            item.inventory_number,
+            item.name,
+            item.category_name or "",
+            item.room_name or "",
+            item.user_full_name or "",
+            _format_datetime(item.purchase_date, '%Y-%m-%d'),
+            float(item.purchase_price) if item.purchase_price else "",
+            _format_datetime(item.updated_at),
+        ], "report_cell"
+
+
+def _consumables_rows(db: Session, low_stock_only: bool = False) -> Iterator[Row]:
+    for consumable in report_data.consumables_rows(db, low_stock_only):
+        is_low = consumable.quantity <= consumable.min_quantity
+        yield [
+            consumable.id,
+            consumable.name,
+            consumable.description or "",
+            consumable.quantity,
+            consumable.min_quantity,
+            consumable.unit,
+        ], "report_error" if is_low else "report_cell"
+
+
+def _logs_rows(db: Session, date_from: Optional[datetime], date_to: Optional[datetime]) -> Iterator[Row]:
+    for log in report_data.logs_rows(db, date_from, date_to):
+        yield [
+            log.id,
+            log.description,
+            LOG_TYPES.get(log.type, str(log.type)),
+            _format_datetime(log.created_at),
+            log.username or "",
+        ], LOG_STYLES.get(log.type, "report_cell")
+
+
+def build_report(db: Session, report_type: ReportType, condition: Optional[str] = None,
+                 date_from: Optional[datetime] = None, date_to: Optional[datetime] = None) -> StreamingReport:
+    if report_type == ReportType.USERS:
+        return StreamingReport(
+            "Отчет по пользователям", "Отчет по пользователям",
+            ["ID", "Логин", "Email", "ФИО", "Телефон", "Админ", "Активен", "Дата регистрации"],
+            _users_rows(db)
+        )
+    if report_type == ReportType.ROOMS:
+        return StreamingReport(
+            "Отчет по помещениям", "Отчет по помещениям",
+            ["ID", "Название", "Описание"],
+            _rooms_rows(db)
+        )
+    if report_type == ReportType.INVENTORY_CATEGORIES:
+        return StreamingReport(
+            "Отчет по категориям инвентаря", "Отчет по категориям",
+            ["ID", "Название", "Короткое название", "Описание"],
+            _categories_rows(db)
+        )
+    if report_type == ReportType.INVENTORY_ITEMS:
+        return StreamingReport(
+            "Отчет по инвентарным объектам", "Отчет по инвентарю",
+            ["ID", "Инвентарный номер", "Название", "Категория", "Состояние", "Помещение", "Пользователь",
+             "Дата покупки", "Цена покупки"],
+            _inventory_items_rows(db)
+        )
+    if report_type == ReportType.CONSUMABLES:
+        return StreamingReport(
+            "Отчет по расходным материалам", "Отчет по расходникам",
+            ["ID", "Название", "Описание", "Количество", "Мин. количество", "Единица измерения"],
+            _consumables_rows(db)
+        )
+    if report_type == ReportType.LOGS:
+        # Без периода выгружаем последние LOG_REPORT_DEFAULT_DAYS дней, а не всю историю журнала
+        if date_from is None and date_to is None:
+            date_from = datetime.now(timezone('Europe/Moscow')) - timedelta(days=LOG_REPORT_DEFAULT_DAYS)
+        return StreamingReport(
+            "Отчет по системным логам", "Отчет по логам",
+            ["ID", "Описание", "Тип", "Дата создания", "Пользователь"],
+            _logs_rows(db, date_from, date_to)
+        )
+    if report_type == ReportType.LOW_STOCK:
+        return StreamingReport(
+            "Отчет по расходникам с низкими запасами", "Отчет по низким запасам",
+            ["ID", "Название", "Описание", "Текущее количество", "Мин. количество", "Единица измерения"],
+            _consumables_rows(db, low_stock_only=True),
+            summary=lambda count: f"Всего позиций с низким запасом: {count}"
+        )
+    if report_type == ReportType.INVENTORY_BY_CONDITION:
+        if not condition:
+            raise HTTPException(status_code=400,
+                                detail="Condition parameter is required for inventory_by_condition report")
+        try:
+            condition_enum = InventoryCondition(condition.upper())
+        except ValueError:
+            raise HTTPException(status_code=400, detail=f"Некорректное состояние: {condition}")
+        return StreamingReport(
+            f"Отчет по инвентарю в состоянии {condition_enum.value}", f"Отчет по состоянию {condition}",
+            ["ID", "Инвентарный номер", "Название", "Категория", "Помещение", "Пользователь",
+             "Дата покупки", "Цена покупки", "Последнее обновление"],
+            _inventory_by_condition_rows(db, condition_enum),
+            summary=lambda count: f"Всего объектов в состоянии {condition_enum.value}: {count}"
+        )
+    raise HTTPException(status_code=400, detail=f"Unknown report type: {report_type}")
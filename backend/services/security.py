@@ -1,9 +1,20 @@
+from collections import OrderedDict
 from datetime import datetime, timedelta
 import hashlib
+import hmac
+import threading
+import time
 
 import bcrypt
 import jwt
-from backend.configurations.config import SECRET_KEY, ALGORITHM, DEFAULT_JWT_EXPIRES_HOURS
+from backend.configurations.config import (
+    SECRET_KEY, ALGORITHM, DEFAULT_JWT_EXPIRES_HOURS,
+    PASSWORD_HASH_ROUNDS, PASSWORD_VERIFY_CACHE_TTL_SECONDS, PASSWORD_VERIFY_CACHE_SIZE,
+    JWT_CACHE_SIZE
+)
+
+# Ключ подписи кодируется один раз, а не при каждой проверке токена
+_SECRET_KEY_BYTES = SECRET_KEY.encode('utf-8')
 
 
 def create_jwt_token(data: dict, expires_delta_hours: timedelta = None) -> str:
@@ -18,7 +29,7 @@ def create_jwt_token(data: dict, expires_delta_hours: timedelta = None) -> str:
         expire = datetime.utcnow() + timedelta(hours=DEFAULT_JWT_EXPIRES_HOURS)
 
     to_encode.update({'exp': expire})
-    return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+    return jwt.encode(to_encode, _SECRET_KEY_BYTES, algorithm=ALGORITHM)
 
 
 def validate_jwt_token(token: str) -> dict:
@@ -26,17 +37,148 @@ def validate_jwt_token(token: str) -> dict:
     Валидирует JWT токен и возвращает его payload
     """
     try:
-        return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        return jwt.decode(token, _SECRET_KEY_BYTES, algorithms=[ALGORITHM])
     except jwt.ExpiredSignatureError:
         raise ValueError('Token expired')
     except jwt.InvalidTokenError:
         raise ValueError('Token invalid')
 
 
+class _TokenCache:
+    """
+    LRU уже проверенных токенов: повторный запрос с тем же токеном
+    не проверяет подпись заново, пока не истек срок действия токена
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, token: str):
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                return None
+            payload, expires_at = entry
+            if expires_at <= time.time():
+                del self._entries[token]
+                return None
+            self._entries.move_to_end(token)
+            return payload
+
+    def add(self, token: str, payload: dict):
+        if self.max_size <= 0 or 'exp' not in payload:
+            return
+        with self._lock:
+            self._entries[token] = (payload, payload['exp'])
+            self._entries.move_to_end(token)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+_token_cache = _TokenCache(JWT_CACHE_SIZE)
+
+
+def validate_jwt_token_cached(token: str) -> dict:
+    """
+    То же, что validate_jwt_token, но с кешем проверенных токенов
+    """
+    payload = _token_cache.get(token)
+    if payload is not None:
+        return payload
+    payload = validate_jwt_token(token)
+    _token_cache.add(token, payload)
+    return payload
+
+
 def hash_data(data: str) -> str:
     """
     Хеширует данные с помощью bcrypt
     """
-    salt = bcrypt.gensalt(rounds=12)
+    salt = bcrypt.gensalt(rounds=PASSWORD_HASH_ROUNDS)
     hashed = bcrypt.hashpw(data.encode('utf-8'), salt)
     return hashed.decode('utf-8')
+
+
+def get_hash_rounds(password_hash: str) -> int:
+    """
+    Возвращает стоимость (cost) bcrypt-хеша вида $2b$12$...
+    """
+    try:
+        return int(password_hash.split('$')[2])
+    except (IndexError, ValueError):
+        return 0
+
+
+def needs_rehash(password_hash: str) -> bool:
+    """
+    Проверяет, отличается ли стоимость хеша от настроенной PASSWORD_HASH_ROUNDS
+    """
+    return get_hash_rounds(password_hash) != PASSWORD_HASH_ROUNDS
+
+
+class _VerificationCache:
+    """
+    Кеш успешных проверок пароля с ограничением по размеру и времени жизни.
+    Ключ — HMAC от (user_id, хеш, пароль), сам пароль не хранится
+    """
+
+    def __init__(self, ttl_seconds: int, max_size: int):
+        self.ttl = ttl_seconds
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0 and self.max_size > 0
+
+    @staticmethod
+    def _key(user_id: int, password_hash: str, password: str) -> bytes:
+        message = f"{user_id}\0{password_hash}\0{password}".encode('utf-8')
+        return hmac.new(_SECRET_KEY_BYTES, message, hashlib.sha256).digest()
+
+    def contains(self, user_id: int, password_hash: str, password: str) -> bool:
+        key = self._key(user_id, password_hash, password)
+        now = time.monotonic()
+        with self._lock:
+            expires_at = self._entries.get(key)
+            if expires_at is None:
+                return False
+            if expires_at <= now:
+                del self._entries[key]
+                return False
+            self._entries.move_to_end(key)
+            return True
+
+    def add(self, user_id: int, password_hash: str, password: str):
+        key = self._key(user_id, password_hash, password)
+        with self._lock:
+            self._entries[key] = time.monotonic() + self.ttl
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+_verification_cache = _VerificationCache(PASSWORD_VERIFY_CACHE_TTL_SECONDS, PASSWORD_VERIFY_CACHE_SIZE)
+
+
+def verify_password(user_id: int, password: str, password_hash: str) -> bool:
+    """
+    Проверяет пароль по bcrypt-хешу. Успешные проверки кешируются на
+    PASSWORD_VERIFY_CACHE_TTL_SECONDS, повторный вход не тратит раунд bcrypt
+    """
+    cache = _verification_cache
+    if cache.enabled and cache.contains(user_id, password_hash, password):
+        return True
+
+    if not bcrypt.checkpw(password.encode('utf-8'), password_hash.encode('utf-8')):
+        return False
+
+    if cache.enabled:
+        cache.add(user_id, password_hash, password)
+    return True
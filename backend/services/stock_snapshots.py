@@ -0,0 +1,85 @@
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Optional
+
+from pytz import timezone
+
+from backend.configurations.config import STOCK_SNAPSHOT_INTERVAL_HOURS
+from backend.configurations.database import SessionLocal
+from backend.core.repositories import ConsumableMovementRepository
+
+logger = logging.getLogger(__name__)
+
+
+class StockSnapshotScheduler:
+    """
+    Периодические снимки остатков расходников (consumable_snapshots).
+    Запрос остатка на дату читает ближайший снимок и движения после него,
+    поэтому журнал движений не приходится перебирать с начала
+    """
+
+    def __init__(self, session_factory=SessionLocal, interval_hours: float = STOCK_SNAPSHOT_INTERVAL_HOURS):
+        self.session_factory = session_factory
+        self.interval = timedelta(hours=interval_hours)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if self.running or self.interval <= timedelta(0):
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="stock-snapshots", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 10.0):
+        if not self.running:
+            return
+        self._stop.set()
+        self._thread.join(timeout)
+        self._thread = None
+
+    def take_snapshot(self) -> int:
+        db = self.session_factory()
+        try:
+            count = ConsumableMovementRepository(db).take_snapshots(datetime.now(timezone('Europe/Moscow')))
+            db.commit()
+            return count
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def _due_in(self) -> float:
+        db = self.session_factory()
+        try:
+            last = ConsumableMovementRepository(db).get_last_snapshot_time()
+        finally:
+            db.close()
+        if last is None:
+            return 0
+        if last.tzinfo is None:
+            last = timezone('Europe/Moscow').localize(last)
+        return max((last + self.interval - datetime.now(timezone('Europe/Moscow'))).total_seconds(), 0)
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                # После перезапуска не снимаем повторно, если интервал еще не прошел
+                delay = self._due_in()
+                if delay == 0:
+                    count = self.take_snapshot()
+                    logger.info(f"Снимок остатков: {count} расходников")
+                    delay = self.interval.total_seconds()
+            except Exception:
+                logger.error("Ошибка снимка остатков расходников", exc_info=True)
+                delay = self.interval.total_seconds()
+            self._stop.wait(delay)
+
+
+stock_snapshots = StockSnapshotScheduler()
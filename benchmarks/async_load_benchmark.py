@@ -0,0 +1,173 @@
+"""
+Нагрузочный замер списка предметов: синхронный обработчик в пуле потоков
+против асинхронного на AsyncSession (core/async_repositories.py).
+
+    python -m benchmarks.async_load_benchmark --database-url URL [--requests N] [--concurrency N] [--limit N]
+
+Запускается из корня репозитория.
+
+Только для отдельной пустой базы: схема создается, таблицы заполняются тестовыми данными.
+Оба маршрута отдают одну и ту же страницу через одни и те же репозитории,
+что и /inventory/items/; сервер uvicorn работает в отдельном процессе.
+Для асинхронного маршрута нужен драйвер (asyncpg или aiosqlite)
+"""
+import argparse
+import asyncio
+import multiprocessing
+import socket
+import statistics
+import time
+
+import httpx
+from fastapi import Depends, FastAPI
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, sessionmaker
+
+from backend.configurations.config import Base
+from backend.configurations.database import async_database_url, create_async_db_engine, create_db_engine
+from backend.core.async_repositories import AsyncInventoryItemRepository
+from backend.core.entities import User, Room, InventoryCategory, InventoryItem, InventoryCondition
+from backend.core.repositories import InventoryItemRepository
+from backend.services.fast_json import fast_json
+
+ITEMS = 1000
+STARTUP_TIMEOUT_SECONDS = 30
+
+
+def create_app(database_url: str, limit: int) -> FastAPI:
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=create_db_engine(database_url))
+    async_session_factory = sessionmaker(
+        bind=create_async_db_engine(async_database_url(database_url)),
+        class_=AsyncSession, autoflush=False, expire_on_commit=False
+    )
+
+    def get_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    async def get_async_db():
+        async with async_session_factory() as db:
+            yield db
+
+    app = FastAPI()
+
+    @app.get("/sync")
+    def read_sync(db: Session = Depends(get_db)):
+        return fast_json(InventoryItemRepository(db).get_all_with_details(limit=limit))
+
+    @app.get("/async")
+    async def read_async(db: AsyncSession = Depends(get_async_db)):
+        return fast_json(await AsyncInventoryItemRepository(db).get_all_with_details(limit=limit))
+
+    return app
+
+
+def serve(database_url: str, limit: int, port: int):
+    import uvicorn
+    uvicorn.run(create_app(database_url, limit), host="127.0.0.1", port=port, log_level="warning")
+
+
+def seed(database_url: str):
+    db_engine = create_db_engine(database_url)
+    Base.metadata.create_all(bind=db_engine)
+    with Session(db_engine) as db:
+        if db.execute(select(func.count()).select_from(InventoryItem)).scalar():
+            raise SystemExit("База не пустая: замер заполняет таблицы тестовыми данными")
+        user = User.create("bench", "-", "bench@example.com", "Bench", "0")
+        room = Room.create("bench room")
+        category = InventoryCategory.create("bench category", "BENCH")
+        db.add_all([user, room, category])
+        db.flush()
+        db.add_all(
+            InventoryItem.create(f"INV-{i:08d}", f"item {i}", None, category.id, InventoryCondition.NORMAL,
+                                 room_id=room.id, user_id=user.id)
+            for i in range(ITEMS)
+        )
+        db.commit()
+    db_engine.dispose()
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def _wait_ready(client: httpx.AsyncClient):
+    deadline = time.monotonic() + STARTUP_TIMEOUT_SECONDS
+    while True:
+        try:
+            (await client.get("/sync")).raise_for_status()
+            return
+        except httpx.TransportError:
+            if time.monotonic() > deadline:
+                raise
+            await asyncio.sleep(0.2)
+
+
+async def _load(client: httpx.AsyncClient, path: str, requests: int, concurrency: int) -> dict:
+    latencies = []
+    errors = 0
+    remaining = iter(range(requests))
+
+    async def worker():
+        nonlocal errors
+        for _ in remaining:
+            started = time.perf_counter()
+            response = await client.get(path)
+            latencies.append((time.perf_counter() - started) * 1000)
+            if response.status_code != 200:
+                errors += 1
+
+    await client.get(path)  # прогрев пула соединений и кешей
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "route": path,
+        "rps": round(requests / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies), 1),
+        "p95_ms": round(latencies[int(len(latencies) * 0.95) - 1], 1),
+        "errors": errors,
+    }
+
+
+async def run(port: int, requests: int, concurrency: int) -> list:
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", limits=limits, timeout=60) as client:
+        await _wait_ready(client)
+        return [await _load(client, path, requests, concurrency) for path in ("/sync", "/async")]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Нагрузочный замер sync и async обработчиков")
+    parser.add_argument("--database-url", required=True, help="отдельная пустая база для замера")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--limit", type=int, default=20, help="предметов на странице")
+    args = parser.parse_args()
+
+    seed(args.database_url)
+    port = _free_port()
+    server = multiprocessing.get_context("spawn").Process(
+        target=serve, args=(args.database_url, args.limit, port), daemon=True
+    )
+    server.start()
+    try:
+        results = asyncio.run(run(port, args.requests, args.concurrency))
+    finally:
+        server.terminate()
+        server.join()
+
+    for row in results:
+        print(f"{row['route']}: {row['rps']} rps, p50 {row['p50_ms']} мс, p95 {row['p95_ms']} мс, "
+              f"ошибок {row['errors']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""
+Замер запросов по горячим колонкам без индексов и с индексами (миграция 0002_lookup_indexes).
+
+    python -m benchmarks.index_benchmark --database-url URL [--items N] [--logs N] [--runs N]
+
+Запускается из корня репозитория.
+
+Только для отдельной пустой базы: схема создается, таблицы заполняются тестовыми данными.
+Для каждого запроса выводится план (EXPLAIN) и медиана времени выполнения
+без индексов и с ними
+"""
+import argparse
+import random
+import statistics
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, func, insert, select, text
+from sqlalchemy.engine import Connection
+
+from backend.configurations.config import Base
+from backend.core.entities import (
+    User, Room, InventoryCategory, InventoryItem, Consumable, Log, InventoryCondition
+)
+
+SEED_BATCH_SIZE = 10000
+USERS = 500
+ROOMS = 300
+CATEGORIES = 50
+
+BENCHMARK_INDEXES = {
+    InventoryItem.__table__: (
+        'ix_inventory_items_category_id', 'ix_inventory_items_room_id',
+        'ix_inventory_items_user_id', 'ix_inventory_items_condition',
+    ),
+    Log.__table__: ('ix_logs_created_at_id', 'ix_logs_type_created_at', 'ix_logs_user_id_created_at'),
+    Consumable.__table__: ('ix_consumables_low_stock',),
+}
+
+# Те же условия, что в InventoryItemRepository, LogRepository и ConsumableRepository
+QUERIES = (
+    ("items by category", "SELECT id FROM inventory_items WHERE category_id = 7"),
+    ("items by room", "SELECT id FROM inventory_items WHERE room_id = 42"),
+    ("items by user", "SELECT id FROM inventory_items WHERE user_id = 17"),
+    ("items requiring repair", "SELECT id FROM inventory_items WHERE condition = 'REQUIRES_REPAIR'"),
+    ("logs feed page", "SELECT id FROM logs ORDER BY created_at DESC, id DESC LIMIT 100"),
+    ("logs by type", "SELECT id FROM logs WHERE type = 3 ORDER BY created_at DESC LIMIT 100"),
+    ("logs by user", "SELECT id FROM logs WHERE user_id = 17 ORDER BY created_at DESC LIMIT 100"),
+    ("low stock consumables", "SELECT id FROM consumables WHERE quantity <= min_quantity"),
+)
+
+
+def _insert_batches(connection: Connection, table, rows):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == SEED_BATCH_SIZE:
+            connection.execute(insert(table), batch)
+            batch = []
+    if batch:
+        connection.execute(insert(table), batch)
+
+
+def seed(connection: Connection, items: int, logs: int, consumables: int):
+    rnd = random.Random(42)
+    now = datetime.now()
+    _insert_batches(connection, User.__table__, (
+        {"username": f"user{i}", "password_hash": "-", "email": f"user{i}@example.com",
+         "full_name": f"User {i}", "phone_number": "0", "registered_at": now,
+         "is_admin": False, "is_active": True}
+        for i in range(USERS)
+    ))
+    _insert_batches(connection, Room.__table__, ({"name": f"room {i}"} for i in range(ROOMS)))
+    _insert_batches(connection, InventoryCategory.__table__, (
+        {"name": f"category {i}", "short_name": f"C{i}"} for i in range(CATEGORIES)
+    ))
+    # Состояния распределены как в жизни: почти все предметы в норме
+    conditions = [InventoryCondition.NORMAL] * 90 + [InventoryCondition.REQUIRES_REPAIR] * 5 + \
+                 [InventoryCondition.WRITTEN_OFF] * 5
+    _insert_batches(connection, InventoryItem.__table__, (
+        {"inventory_number": f"INV-{i:08d}", "name": f"item {i}", "created_at": now,
+         "condition": rnd.choice(conditions), "category_id": rnd.randint(1, CATEGORIES),
+         "room_id": rnd.randint(1, ROOMS), "user_id": rnd.randint(1, USERS), "is_written_off": False}
+        for i in range(items)
+    ))
+    _insert_batches(connection, Log.__table__, (
+        {"description": f"event {i}", "type": rnd.choice((1, 1, 1, 1, 2, 2, 3, 4)),
+         "created_at": now - timedelta(seconds=logs - i), "user_id": rnd.randint(1, USERS)}
+        for i in range(logs)
+    ))
+    _insert_batches(connection, Consumable.__table__, (
+        {"name": f"consumable {i}", "quantity": rnd.randint(0, 500) if rnd.random() > 0.02 else 0,
+         "min_quantity": 1, "unit": "шт."}
+        for i in range(consumables)
+    ))
+
+
+def _explain(connection: Connection, sql: str) -> str:
+    prefix = "EXPLAIN QUERY PLAN" if connection.dialect.name == "sqlite" else "EXPLAIN"
+    rows = connection.execute(text(f"{prefix} {sql}")).fetchall()
+    return "; ".join(str(row[-1]) for row in rows)
+
+
+def _measure(connection: Connection, sql: str, runs: int) -> float:
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        connection.execute(text(sql)).fetchall()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def _set_indexes(connection: Connection, enabled: bool):
+    for table, names in BENCHMARK_INDEXES.items():
+        for index in table.indexes:
+            if index.name in names:
+                if enabled:
+                    index.create(connection, checkfirst=True)
+                else:
+                    index.drop(connection, checkfirst=True)
+        if connection.dialect.name == "postgresql":
+            connection.execute(text(f"ANALYZE {table.name}"))
+        else:
+            connection.execute(text("ANALYZE"))
+
+
+def run(connection: Connection, runs: int) -> list:
+    results = []
+    for enabled in (False, True):
+        _set_indexes(connection, enabled)
+        for name, sql in QUERIES:
+            results.append({
+                "query": name,
+                "indexes": enabled,
+                "plan": _explain(connection, sql),
+                "median_ms": round(_measure(connection, sql, runs), 3),
+            })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Замер запросов с индексами и без")
+    parser.add_argument("--database-url", required=True, help="отдельная пустая база для замера")
+    parser.add_argument("--items", type=int, default=200000)
+    parser.add_argument("--logs", type=int, default=1000000)
+    parser.add_argument("--consumables", type=int, default=20000)
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    db_engine = create_engine(args.database_url)
+    Base.metadata.create_all(bind=db_engine)
+    with db_engine.begin() as connection:
+        if connection.execute(select(func.count()).select_from(User.__table__)).scalar():
+            raise SystemExit("База не пустая: замер заполняет таблицы тестовыми данными")
+        started = time.perf_counter()
+        seed(connection, args.items, args.logs, args.consumables)
+        print(f"Данные созданы за {time.perf_counter() - started:.1f} с")
+
+    with db_engine.begin() as connection:
+        results = run(connection, args.runs)
+
+    without = {row["query"]: row for row in results if not row["indexes"]}
+    for row in results:
+        if not row["indexes"]:
+            continue
+        before = without[row["query"]]
+        print(f"\n{row['query']}: {before['median_ms']} мс -> {row['median_ms']} мс")
+        print(f"  без индексов: {before['plan']}")
+        print(f"  с индексами:  {row['plan']}")
+
+
+if __name__ == "__main__":
+    main()
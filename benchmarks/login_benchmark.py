@@ -0,0 +1,126 @@
+"""
+Замер одновременных входов: проверка пароля в auth_executor против прежней
+проверки прямо в event loop.
+
+    python -m benchmarks.login_benchmark [--logins N] [--mode executor|inline|both]
+
+Запускается из корня репозитория против базы из DATABASE_URL, в которой нет пользователей:
+для каждого режима создаются свои N пользователей, так что ни один вход не повторяется;
+после замера они удаляются. Пока идут входы, отправляется дешевый запрос-зонд:
+его задержка показывает, блокирует ли bcrypt остальные запросы воркера
+"""
+import argparse
+import asyncio
+import time
+
+import httpx
+from sqlalchemy import delete, func, select
+
+from backend.api import app
+from backend.configurations.database import SessionLocal
+from backend.core.entities import User, Log
+from backend.services.executors import auth_executor
+from backend.services.security import hash_data
+
+PASSWORD = "benchmark-password"
+PROBE_PATH = "/docs"
+PROBE_DELAY_SECONDS = 0.05
+
+
+def _username(mode: str, i: int) -> str:
+    return f"bench_{mode}{i}"
+
+
+def seed(logins: int, modes: list):
+    password_hash = hash_data(PASSWORD)
+    db = SessionLocal()
+    try:
+        if db.execute(select(func.count()).select_from(User)).scalar():
+            raise SystemExit("В базе уже есть пользователи: замер создает и удаляет своих")
+        db.add_all(
+            User.create(username, password_hash, f"{username}@example.com", username, "0")
+            for username in (_username(mode, i) for mode in modes for i in range(logins))
+        )
+        db.commit()
+    finally:
+        db.close()
+
+
+def cleanup():
+    db = SessionLocal()
+    try:
+        db.execute(delete(Log))
+        db.execute(delete(User))
+        db.commit()
+    finally:
+        db.close()
+
+
+async def _inline_run(fn, *args, **kwargs):
+    # Прежняя модель: bcrypt и запросы к БД прямо в event loop
+    return fn(*args, **kwargs)
+
+
+async def measure(logins: int, mode: str) -> dict:
+    inline = mode == "inline"
+    original_run = auth_executor.run
+    if inline:
+        auth_executor.run = _inline_run
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+            async def login(i: int) -> int:
+                response = await client.post("/api/login", json={"username": _username(mode, i), "password": PASSWORD})
+                return response.status_code
+
+            async def probe() -> float:
+                # Задержка считается от момента, когда зонд должен был уйти:
+                # при заблокированном loop он просыпается позже срока
+                scheduled = time.perf_counter() + PROBE_DELAY_SECONDS
+                await asyncio.sleep(PROBE_DELAY_SECONDS)
+                await client.get(PROBE_PATH)
+                return (time.perf_counter() - scheduled) * 1000
+
+            started = time.perf_counter()
+            statuses, probe_ms = await asyncio.gather(
+                asyncio.gather(*(login(i) for i in range(logins))), probe()
+            )
+            elapsed = time.perf_counter() - started
+    finally:
+        auth_executor.run = original_run
+
+    return {
+        "mode": mode,
+        "logins": logins,
+        "ok": sum(1 for code in statuses if code == 200),
+        "seconds": round(elapsed, 2),
+        "logins_per_second": round(logins / elapsed, 2),
+        "probe_ms": round(probe_ms, 1),
+    }
+
+
+async def run(logins: int, modes: list) -> list:
+    async with app.router.lifespan_context(app):
+        return [await measure(logins, mode) for mode in modes]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Замер одновременных входов")
+    parser.add_argument("--logins", type=int, default=16)
+    parser.add_argument("--mode", choices=("executor", "inline", "both"), default="both")
+    args = parser.parse_args()
+
+    modes = ["inline", "executor"] if args.mode == "both" else [args.mode]
+    seed(args.logins, modes)
+    try:
+        results = asyncio.run(run(args.logins, modes))
+    finally:
+        cleanup()
+
+    for row in results:
+        print(f"{row['mode']}: {row['ok']}/{row['logins']} входов за {row['seconds']} с "
+              f"({row['logins_per_second']}/с), зонд {row['probe_ms']} мс")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Замер выдачи страницы предметов: прежний путь (ORM-объекты -> словари -> валидация
+response_model -> JSON Pydantic) против нового (кортежи колонок -> InventoryItemRow -> fast_json).
+
+    python -m benchmarks.serialization_benchmark --database-url URL [--items N] [--page N] [--runs N]
+
+Запускается из корня репозитория.
+
+Только для отдельной пустой базы: схема создается, таблицы заполняются тестовыми данными.
+Выборка и сериализация замеряются отдельно, выводится медиана; перед замером
+проверяется, что оба пути дают одинаковый JSON
+"""
+import argparse
+import json
+import statistics
+import time
+from typing import List
+
+from pydantic import TypeAdapter
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import Session
+
+from backend.configurations.config import Base
+from backend.core.entities import User, InventoryItem, InventoryCategory, Room
+from backend.core.repositories import InventoryItemRepository
+from backend.core.schemas import InventoryItemResponse
+from backend.services.fast_json import dumps, orjson
+from benchmarks.index_benchmark import seed
+
+
+def fetch_orm(db: Session, limit: int) -> list:
+    # Так строки выбирались до перехода на InventoryItemRow
+    results = (
+        db.query(InventoryItem, InventoryCategory.name.label("category_name"), Room.name.label("room_name"))
+        .join(InventoryCategory, InventoryItem.category_id == InventoryCategory.id)
+        .outerjoin(Room, InventoryItem.room_id == Room.id)
+        .order_by(InventoryItem.id)
+        .limit(limit)
+        .all()
+    )
+    return [
+        {**item.__dict__, "category_name": category_name, "room_name": room_name}
+        for item, category_name, room_name in results
+    ]
+
+
+def fetch_rows(db: Session, limit: int) -> list:
+    return InventoryItemRepository(db).get_all_with_details(limit=limit)
+
+
+_adapter = TypeAdapter(List[InventoryItemResponse])
+
+
+def serialize_pydantic(rows: list) -> bytes:
+    # То же, что делает FastAPI с response_model: валидация, затем dump_json
+    return _adapter.dump_json(_adapter.validate_python(rows, from_attributes=True))
+
+
+def _median_ms(action, runs: int) -> float:
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        action()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def run(db_engine, page: int, runs: int) -> dict:
+    with Session(db_engine) as db:
+        orm_rows = fetch_orm(db, page)
+        rows = fetch_rows(db, page)
+        if json.loads(serialize_pydantic(orm_rows)) != json.loads(dumps(rows)):
+            raise SystemExit("JSON нового пути отличается от ответа Pydantic")
+
+        results = {}
+        for name, fetch, serialize in (
+            ("orm + pydantic", fetch_orm, serialize_pydantic),
+            ("rows + fast_json", fetch_rows, dumps),
+        ):
+            # Новая сессия на каждый прогон: ORM-объекты не должны браться из identity map
+            def fetch_once():
+                with Session(db_engine) as session:
+                    return fetch(session, page)
+
+            fetched = fetch_once()
+            results[name] = {
+                "fetch_ms": round(_median_ms(fetch_once, runs), 3),
+                "serialize_ms": round(_median_ms(lambda: serialize(fetched), runs), 3),
+            }
+        return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Замер сериализации списка предметов")
+    parser.add_argument("--database-url", required=True, help="отдельная пустая база для замера")
+    parser.add_argument("--items", type=int, default=20000)
+    parser.add_argument("--page", type=int, default=1000)
+    parser.add_argument("--runs", type=int, default=30)
+    args = parser.parse_args()
+
+    db_engine = create_engine(args.database_url)
+    Base.metadata.create_all(bind=db_engine)
+    with db_engine.begin() as connection:
+        if connection.execute(select(func.count()).select_from(User.__table__)).scalar():
+            raise SystemExit("База не пустая: замер заполняет таблицы тестовыми данными")
+        seed(connection, args.items, logs=0, consumables=0)
+
+    print(f"Страница {args.page} строк, JSON: {'orjson' if orjson is not None else 'json (orjson не установлен)'}")
+    for name, row in run(db_engine, args.page, args.runs).items():
+        total = row["fetch_ms"] + row["serialize_ms"]
+        print(f"{name}: выборка {row['fetch_ms']} мс, сериализация {row['serialize_ms']} мс, всего {total:.3f} мс")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,7 @@
 import React from 'react';
 import {NavLink, useNavigate} from 'react-router-dom';
 import Button from '../common/Button';
+import authApi from '../../services/authApi';
 import "../../assets/styles/Header.css"
 
 const Header = () => {
@@ -36,9 +37,12 @@ const Header = () => {
         ? [...baseNavItems, ...adminNavItems]
         : baseNavItems;
 
-    const handleLogout = () => {
-        localStorage.removeItem('userData');
-        navigate('/login');
+    const handleLogout = async () => {
+        try {
+            await authApi.logout();
+        } finally {
+            navigate('/login');
+        }
     };
 
     return (
@@ -14,6 +14,7 @@ const InventoryItemForm = () => {
     const [users, setUsers] = useState([]);
     const [loading, setLoading] = useState(true);
     const [formErrors, setFormErrors] = useState({});
+    const [currentPhotoUrl, setCurrentPhotoUrl] = useState(null);
 
     const [formData, setFormData] = useState({
         inventory_number: '',
@@ -52,11 +53,12 @@ const InventoryItemForm = () => {
                         condition: item.condition || 'NORMAL',
                         room_id: item.room_id || '',
                         user_id: item.user_id || '',
-                        photo: item.photo || null,
+                        photo: null,
                         purchase_date: item.purchase_date ? item.purchase_date.split('T')[0] : '',
                         purchase_price: item.purchase_price || '',
                         warranty_until: item.warranty_until ? item.warranty_until.split('T')[0] : '',
                     });
+                    if (item.has_photo) setCurrentPhotoUrl(api.inventoryItems.getPhotoUrl(item.id));
                 }
 
                 setLoading(false);
@@ -239,10 +241,10 @@ const InventoryItemForm = () => {
                                 onChange={handleFileChange}
                                 className="form-control"
                             />
-                            {formData.photo && (
+                            {(formData.photo || currentPhotoUrl) && (
                                 <div className="mt-2">
                                     <img
-                                        src={formData.photo}
+                                        src={formData.photo ? `data:image/*;base64,${formData.photo}` : currentPhotoUrl}
                                         alt="Item"
                                         className="h-20 object-cover rounded"
                                     />
@@ -109,10 +109,12 @@ const InventoryView = () => {
                 setItem(data);
 
                 if (data.category_id) {
-                    const allItems = await api.inventoryItems.getAll();
-                    const related = allItems.filter(
-                        i => i.category_id === data.category_id && i.id !== data.id
-                    ).slice(0, 5);
+                    const { items } = await api.inventoryItems.searchItems({
+                        category_id: data.category_id,
+                        limit: 6,
+                        total: 'none'
+                    });
+                    const related = items.filter(i => i.id !== data.id).slice(0, 5);
                     setRelatedItems(related);
                 }
 
@@ -277,12 +279,12 @@ const InventoryView = () => {
                 </div>
 
                 <div className="sidebar-section">
-                    {item.photo && (
+                    {item.has_photo && (
                         <Card className="photo-card">
                             <h3 className="card-title">Фотография</h3>
                             <div className="photo-container">
                                 <img
-                                    src={item.photo}
+                                    src={api.inventoryItems.getPhotoUrl(item.id)}
                                     alt={item.name}
                                     className="item-photo"
                                     onError={(e) => {
@@ -21,6 +21,7 @@ const UserForm = () => {
     });
 
     const [loading, setLoading] = useState(true);
+    const [currentAvatarUrl, setCurrentAvatarUrl] = useState(null);
 
     useEffect(() => {
         if (isEditMode) {
@@ -35,8 +36,9 @@ const UserForm = () => {
                         is_admin: user.is_admin,
                         is_active: user.is_active,
                         password_hash: '',
-                        avatar: user.avatar,
+                        avatar: null,
                     });
+                    if (user.has_avatar) setCurrentAvatarUrl(api.users.getAvatarUrl(user.id));
                     setLoading(false);
                 } catch (error) {
                     console.error('Error fetching user:', error);
@@ -77,7 +79,9 @@ const UserForm = () => {
 
         try {
             if (isEditMode) {
-                await api.users.updateUser(parseInt(id), formData);
+                // Аватар не загружается вместе с пользователем: отправляем его только если выбран новый
+                const { avatar, ...userData } = formData;
+                await api.users.updateUser(parseInt(id), avatar ? formData : userData);
             } else {
                 await api.users.createUser(formData);
             }
@@ -166,10 +170,10 @@ const UserForm = () => {
                                 onChange={handleFileChange}
                                 className="form-control"
                             />
-                            {formData.avatar && (
+                            {(formData.avatar || currentAvatarUrl) && (
                                 <div className="mt-2">
                                     <img
-                                        src={formData.avatar}
+                                        src={formData.avatar || currentAvatarUrl}
                                         alt="Avatar"
                                         className="h-20 w-20 object-cover rounded-full"
                                     />
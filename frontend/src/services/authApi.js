@@ -15,12 +15,15 @@ const authApi = {
     },
 
     /**
-     * Logout user (clears local storage)
-     * Note: This is client-side only, you may want to add an API endpoint for server-side logout
+     * Logout user (clears session cookie on the server and local storage)
      */
-    logout: () => {
-        localStorage.removeItem('authToken');
-        localStorage.removeItem('userData');
+    logout: async () => {
+        try {
+            await apiClient.post('/logout');
+        } finally {
+            localStorage.removeItem('authToken');
+            localStorage.removeItem('userData');
+        }
     },
 
     /**
@@ -18,7 +18,7 @@ const categoryApi = {
      * @returns {Promise} - Array of categories
      */
     getCategories: () => {
-        return apiClient.get('/inventory/categories/');
+        return apiClient.get('/inventory/categories/?limit=1000');
     },
 
     /**
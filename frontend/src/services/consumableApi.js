@@ -18,7 +18,7 @@ const consumableApi = {
      * @returns {Promise} - Array of consumables
      */
     getConsumables: () => {
-        return apiClient.get('/consumables/');
+        return apiClient.get('/consumables/?limit=1000');
     },
 
     /**
@@ -64,6 +64,7 @@ const consumableApi = {
             console.log(amount);
             const response = await fetch(`${API_BASE_URL}/consumables/increase`, {
                 method: 'POST',
+                credentials: 'include',
                 headers: {
                     'Content-Type': 'application/json'
                 },
@@ -89,6 +90,7 @@ const consumableApi = {
     decreaseConsumable: async (id, amount) => {
         const response = await fetch(`${API_BASE_URL}/consumables/decrease`, {
             method: 'POST',
+            credentials: 'include',
             headers: {
                 'Content-Type': 'application/json'
             },
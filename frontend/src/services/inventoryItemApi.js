@@ -1,4 +1,4 @@
-import apiClient from './apiClient';
+import apiClient, { API_BASE_URL } from './apiClient';
 
 /**
  * API functions for inventory item management
@@ -27,6 +27,22 @@ const inventoryItemApi = {
         return apiClient.get(`/inventory/items/`);
     },
 
+    /**
+     * Search items on the server with filters, sorting and pagination
+     * @param {Object} params - q, category_id, room_id, user_id, condition (values or arrays),
+     *                          is_written_off, sort, order, limit, cursor (next_cursor of the previous page),
+     *                          total ('exact' | 'estimated' | 'none')
+     * @returns {Promise} - { items, next_cursor, total, total_estimated }
+     */
+    searchItems: (params = {}) => {
+        const query = new URLSearchParams();
+        Object.entries(params).forEach(([key, value]) => {
+            if (value === undefined || value === null || value === '') return;
+            (Array.isArray(value) ? value : [value]).forEach(v => query.append(key, v));
+        });
+        return apiClient.get(`/inventory/items/search?${query.toString()}`);
+    },
+
 
     prepareInventoryItemData: (formData) => {
         const data = {
@@ -57,6 +73,15 @@ const inventoryItemApi = {
         return apiClient.get(`/inventory/items/${itemId}`);
     },
 
+    /**
+     * Get URL of the item photo (served separately from item data)
+     * @param {number} itemId - Item ID
+     * @returns {string} - Photo URL
+     */
+    getPhotoUrl: (itemId) => {
+        return `${API_BASE_URL}/inventory/items/${itemId}/photo`;
+    },
+
     /**
      * Get items by condition
      * @param {string} condition - Condition type (NORMAL, REQUIRES_REPAIR, WRITTEN_OFF)
@@ -1,47 +1,67 @@
 /**
  * API functions for report generation
  */
+
+// How long the server holds a status request while the report is being built, seconds
+const REPORT_WAIT_SECONDS = 25;
+
+const request = async (url, options = {}) => {
+    const token = localStorage.getItem('authToken');
+    const headers = { ...(options.headers || {}) };
+
+    if (token) {
+        headers['Authorization'] = `Bearer ${token}`;
+    }
+
+    const response = await fetch(url, {
+        ...options,
+        headers,
+        credentials: 'include'
+    });
+
+    if (!response.ok) {
+        throw new Error(`HTTP error! status: ${response.status}`);
+    }
+
+    return response;
+};
+
 const reportApi = {
     /**
-     * Generate and download Excel report
+     * Generate and download Excel report.
+     * The report is built by a background job: the job is created, its status is polled
+     * until the file is ready, then the file is downloaded by the job's URL
      * @param {string} reportType - Type of report to generate
      * @param {string} [condition] - Optional condition for inventory_by_condition report
      * @returns {Promise<Blob>} - Resolves with blob data for the report
      */
     generateExcelReport: async (reportType, condition = null) => {
         const baseUrl = process.env.REACT_APP_API_BASE_URL || 'http://localhost:1234/api';
-        const params = new URLSearchParams();
-        params.append('report_type', reportType);
-
-        if (condition) {
-            params.append('condition', condition);
-        }
 
-        const url = `${baseUrl}/reports/excel?${params.toString()}`;
-        const token = localStorage.getItem('authToken');
+        const created = await request(`${baseUrl}/reports/jobs`, {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ report_type: reportType, condition })
+        });
+        let job = await created.json();
 
-        const headers = {
-            'Accept': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-        };
+        while (job.status === 'queued' || job.status === 'running') {
+            const status = await request(`${baseUrl}/reports/jobs/${job.id}?wait=${REPORT_WAIT_SECONDS}`);
+            job = await status.json();
+        }
 
-        if (token) {
-            headers['Authorization'] = `Bearer ${token}`;
+        if (job.status !== 'done') {
+            throw new Error(job.detail || `Report job ${job.status}`);
         }
 
-        const response = await fetch(url, {
-            method: 'GET',
-            headers,
-            credentials: 'include'
+        const file = await request(new URL(job.download_url, baseUrl).toString(), {
+            headers: { 'Accept': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet' }
         });
 
-        if (!response.ok) {
-            throw new Error(`HTTP error! status: ${response.status}`);
-        }
-
-        return await response.blob();
+        return await file.blob();
     }
 };
 
 
 
-export default reportApi;
\ No newline at end of file
+export default reportApi;
@@ -18,7 +18,7 @@ const roomApi = {
      * @returns {Promise} - Array of rooms
      */
     getRooms: () => {
-        return apiClient.get('/rooms/');
+        return apiClient.get('/rooms/?limit=1000');
     },
 
     /**
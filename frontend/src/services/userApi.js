@@ -1,4 +1,4 @@
-import apiClient from './apiClient';
+import apiClient, { API_BASE_URL } from './apiClient';
 
 /**
  * API functions for user management
@@ -32,6 +32,15 @@ const userApi = {
         return apiClient.get(`/users/${userId}`);
     },
 
+    /**
+     * Get URL of the user avatar (served separately from user data)
+     * @param {number} userId - User ID
+     * @returns {string} - Avatar URL
+     */
+    getAvatarUrl: (userId) => {
+        return `${API_BASE_URL}/users/${userId}/avatar`;
+    },
+
     /**
      * Update user information
      * @param {number} userId - User ID
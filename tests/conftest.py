@@ -0,0 +1,37 @@
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from backend.configurations.config import Base
+import backend.core.entities  # noqa: F401  регистрирует таблицы в Base.metadata
+
+
+@pytest.fixture
+def engine(tmp_path):
+    # Файловая SQLite: с ней работают и отдельные соединения из разных потоков
+    # timeout: параллельные писатели ждут блокировку базы, а не падают с database is locked
+    db_engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}", connect_args={"timeout": 30})
+    Base.metadata.create_all(db_engine)
+    yield db_engine
+    db_engine.dispose()
+
+
+@pytest.fixture
+def sqlite_savepoints(engine):
+    # pysqlite сам не начинает транзакцию перед SAVEPOINT, и без явного BEGIN
+    # begin_nested() фиксирует данные мимо внешней транзакции (рецепт из документации SQLAlchemy)
+    engine.dispose()
+    event.listen(engine, "connect", lambda dbapi_connection, _: setattr(dbapi_connection, "isolation_level", None))
+    event.listen(engine, "begin", lambda connection: connection.exec_driver_sql("BEGIN"))
+
+
+@pytest.fixture
+def session_factory(engine):
+    return sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+@pytest.fixture
+def db(session_factory):
+    session = session_factory()
+    yield session
+    session.close()
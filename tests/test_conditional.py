@@ -0,0 +1,84 @@
+import asyncio
+
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from backend.configurations.database import get_async_db
+from backend.core.entities import Room, TableVersion
+from backend.services import conditional
+from backend.services.conditional import NotModified, conditional_get, not_modified_handler, read_versions
+
+ROOMS = (Room.__tablename__,)
+
+
+@pytest.fixture
+def async_url(engine):
+    return str(engine.url).replace("sqlite://", "sqlite+aiosqlite://")
+
+
+def _version(url: str) -> int:
+    async def read():
+        engine = create_async_engine(url)
+        try:
+            async with AsyncSession(engine) as db:
+                return (await read_versions(db, ROOMS))[Room.__tablename__][0]
+        finally:
+            await engine.dispose()
+
+    return asyncio.run(read())
+
+
+def test_version_is_sum_over_shards(db, async_url, monkeypatch):
+    shards = iter([0, 3, 3])
+    monkeypatch.setattr(conditional.random, "randrange", lambda stop: next(shards))
+    for name in ("101", "102", "103"):
+        db.add(Room.create(name))
+        db.commit()
+
+    assert db.query(TableVersion.shard).filter_by(table_name=Room.__tablename__).count() == 2
+    assert _version(async_url) == 3
+
+
+def test_commit_without_changes_keeps_version(db, async_url):
+    room = Room.create("101")
+    db.add(room)
+    db.commit()
+    version = _version(async_url)
+
+    db.execute(update(Room).where(Room.name == "missing").values(description="-"))
+    room.name = room.name
+    db.commit()
+    assert _version(async_url) == version
+
+    db.execute(update(Room).where(Room.name == "101").values(description="-"))
+    db.commit()
+    assert _version(async_url) == version + 1
+
+
+def test_not_modified_is_bare_response(db, async_url):
+    db.add(Room.create("101"))
+    db.commit()
+    engine = create_async_engine(async_url)
+
+    async def async_db():
+        async with AsyncSession(engine) as session:
+            yield session
+
+    app = FastAPI()
+    app.add_exception_handler(NotModified, not_modified_handler)
+    app.dependency_overrides[get_async_db] = async_db
+
+    @app.get("/rooms", dependencies=[Depends(conditional_get(Room))])
+    async def rooms():
+        return ["101"]
+
+    with TestClient(app) as client:
+        first = client.get("/rooms")
+        second = client.get("/rooms", headers={"If-None-Match": first.headers["etag"]})
+
+    assert first.status_code == 200 and first.json() == ["101"]
+    assert second.status_code == 304 and second.content == b""
+    assert second.headers["etag"] == first.headers["etag"]
@@ -0,0 +1,90 @@
+"""
+Одновременные списания расходника: ни одно не теряется, остаток не уходит в минус
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import func
+
+from backend.core.entities import Consumable, ConsumableMovement
+from backend.core.repositories import ConsumableRepository
+
+THREADS = 8
+DECREMENTS_PER_THREAD = 50
+STOCK = 300  # меньше THREADS * DECREMENTS_PER_THREAD: часть списаний должна получить отказ
+
+
+def _create_consumables(session_factory, count: int, quantity: int) -> list:
+    db = session_factory()
+    try:
+        consumables = [Consumable.create(f"Consumable {i}", quantity=quantity) for i in range(count)]
+        db.add_all(consumables)
+        db.commit()
+        return [consumable.id for consumable in consumables]
+    finally:
+        db.close()
+
+
+def _run_in_threads(worker) -> list:
+    with ThreadPoolExecutor(max_workers=THREADS) as pool:
+        return [result for results in pool.map(worker, range(THREADS)) for result in results]
+
+
+def _assert_consistent(db, consumable_id: int, applied: int):
+    quantity = db.query(Consumable.quantity).filter(Consumable.id == consumable_id).scalar()
+    movements = db.query(ConsumableMovement).filter(ConsumableMovement.consumable_id == consumable_id)
+    assert quantity == STOCK - applied
+    assert quantity >= 0
+    assert movements.count() == applied
+    assert movements.with_entities(func.sum(ConsumableMovement.delta)).scalar() == -applied
+    assert movements.filter(ConsumableMovement.quantity_after < 0).count() == 0
+
+
+def test_parallel_decrements(session_factory):
+    consumable_id, = _create_consumables(session_factory, 1, STOCK)
+
+    def worker(_):
+        db = session_factory()
+        try:
+            repository = ConsumableRepository(db)
+            return [repository.decrease_quantity(consumable_id, 1) is not None
+                    for _ in range(DECREMENTS_PER_THREAD)]
+        finally:
+            db.close()
+
+    results = _run_in_threads(worker)
+
+    assert results.count(True) == STOCK
+    db = session_factory()
+    try:
+        _assert_consistent(db, consumable_id, STOCK)
+    finally:
+        db.close()
+
+
+def test_parallel_batch_adjustments(session_factory):
+    first_id, second_id = _create_consumables(session_factory, 2, STOCK)
+
+    def worker(index):
+        db = session_factory()
+        try:
+            repository = ConsumableRepository(db)
+            # Пакеты с разным порядком ключей: adjust_quantities сам упорядочивает строки
+            deltas = {first_id: -1, second_id: -1} if index % 2 else {second_id: -1, first_id: -1}
+            results = []
+            for _ in range(DECREMENTS_PER_THREAD):
+                results.append(repository.adjust_quantities(deltas))
+                db.commit()
+            return results
+        finally:
+            db.close()
+
+    results = _run_in_threads(worker)
+
+    db = session_factory()
+    try:
+        for consumable_id in (first_id, second_id):
+            applied = sum(1 for result in results if consumable_id in result)
+            assert applied == STOCK
+            _assert_consistent(db, consumable_id, applied)
+    finally:
+        db.close()
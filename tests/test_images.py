@@ -0,0 +1,66 @@
+import base64
+import os
+import time
+from datetime import timedelta
+
+import pytest
+
+from backend.services.blob_store import BLOB_CHUNK_SIZE, LocalBlobStore, blob_key
+from backend.services.images import collect_orphan_blobs, store_image
+
+pytestmark = pytest.mark.usefixtures("sqlite_savepoints")
+
+PNG = b"\x89PNG\r\n\x1a\n" + b"\x00" * 100
+
+
+def _age(store: LocalBlobStore, key: str, hours: int):
+    past = time.time() - hours * 3600
+    os.utime(store._path(key), (past, past))
+
+
+def test_blob_of_rolled_back_upload_is_collected(db, tmp_path):
+    store = LocalBlobStore(str(tmp_path / "blobs"))
+    orphan = PNG + b"orphan"
+    kept = PNG + b"kept"
+
+    store_image(db, base64.b64encode(orphan), store=store)
+    db.rollback()
+    store_image(db, base64.b64encode(kept), store=store)
+    db.commit()
+    for data in (orphan, kept):
+        _age(store, blob_key(data), hours=48)
+
+    assert collect_orphan_blobs(db, store=store, grace=timedelta(hours=24)) == 1
+    assert not store.exists(blob_key(orphan))
+    assert store.exists(blob_key(kept))
+
+
+def test_fresh_blob_is_not_collected(db, tmp_path):
+    # Транзакция, записавшая blob, могла еще не закоммитить запись images
+    store = LocalBlobStore(str(tmp_path / "blobs"))
+    key = store.put(PNG)
+
+    assert collect_orphan_blobs(db, store=store, grace=timedelta(hours=24)) == 0
+    assert store.exists(key)
+
+
+def test_reupload_refreshes_orphan_blob(db, tmp_path):
+    store = LocalBlobStore(str(tmp_path / "blobs"))
+    key = store.put(PNG)
+    _age(store, key, hours=48)
+
+    store_image(db, PNG, store=store)
+
+    assert collect_orphan_blobs(db, store=store, grace=timedelta(hours=24)) == 0
+
+
+def test_range_is_read_in_chunks(tmp_path):
+    store = LocalBlobStore(str(tmp_path / "blobs"))
+    data = os.urandom(BLOB_CHUNK_SIZE * 2 + 10)
+    key = store.put(data)
+
+    chunks = list(store.iter_range(key, 5, BLOB_CHUNK_SIZE * 2 + 4))
+
+    assert [len(chunk) for chunk in chunks] == [BLOB_CHUNK_SIZE, BLOB_CHUNK_SIZE]
+    assert b"".join(chunks) == data[5:BLOB_CHUNK_SIZE * 2 + 5]
+    assert store.size(key) == len(data)
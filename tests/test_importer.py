@@ -0,0 +1,48 @@
+import pytest
+from openpyxl import Workbook
+
+from backend.core.entities import InventoryCategory, InventoryItem
+from backend.core.schemas import ImportKind
+from backend.services import importer
+from backend.services.importer import ImportJob, run_import
+
+pytestmark = pytest.mark.usefixtures("sqlite_savepoints")
+
+
+@pytest.fixture(autouse=True)
+def no_audit(monkeypatch):
+    monkeypatch.setattr(importer.audit_log, "submit", lambda log: None)
+
+
+@pytest.fixture
+def category(db):
+    db.add(InventoryCategory.create("Техника", "ТХ"))
+    db.commit()
+
+
+def _xlsx(path, rows):
+    workbook = Workbook()
+    for row in rows:
+        workbook.active.append(row)
+    workbook.save(path)
+    return str(path)
+
+
+def test_rejected_batch_is_retried_row_by_row(db, session_factory, category, tmp_path, monkeypatch):
+    path = _xlsx(tmp_path / "items.xlsx", [
+        ["Инвентарный номер", "Название", "Категория"],
+        ["N1", "Ноутбук", "ТХ"],
+        ["N2", "Монитор", "ТХ"],
+        ["N1", "Дубликат", "ТХ"],
+        ["N3", "Принтер", "ТХ"],
+    ])
+    # Проверка дубликатов до вставки ничего не нашла: как если бы N1 занял параллельный импорт
+    monkeypatch.setattr(importer._ItemImport, "conflicts", lambda self, rows: {})
+
+    job = ImportJob(ImportKind.INVENTORY_ITEMS, "items.xlsx", "xlsx", path, user_id=None)
+    run_import(job, session_factory)
+
+    assert job.status == "done"
+    assert (job.inserted, job.rejected, job.rows_total) == (3, 1, 4)
+    assert [error["line"] for error in job.errors] == [4]
+    assert sorted(number for number, in db.query(InventoryItem.inventory_number)) == ["N1", "N2", "N3"]
@@ -0,0 +1,74 @@
+import pytest
+from sqlalchemy import select
+
+from backend.core.entities import InventoryCategory, InventoryItem
+from backend.core.repositories import InventoryItemRepository
+from backend.core.schemas import InventoryItemBulkRequest
+from backend.services.item_bulk import apply_bulk_items
+
+pytestmark = pytest.mark.usefixtures("sqlite_savepoints")
+
+
+@pytest.fixture
+def category_id(db):
+    category = InventoryCategory.create("Техника", "ТХ")
+    db.add(category)
+    db.commit()
+    return category.id
+
+
+def _items(db, category_id, *numbers):
+    rows = [{"inventory_number": number, "name": number, "category_id": category_id, "condition": "NORMAL"}
+            for number in numbers]
+    result = apply_bulk_items(db, InventoryItemBulkRequest(create=rows))
+    assert not result["errors"]
+    return [row["id"] for row in result["created"]]
+
+
+def _numbers(db):
+    return dict(db.execute(select(InventoryItem.id, InventoryItem.inventory_number)).all())
+
+
+def test_numbers_are_checked_against_state_after_batch(db, category_id):
+    a, b, c, d = _items(db, category_id, "N1", "N2", "N3", "N4")
+
+    result = apply_bulk_items(db, InventoryItemBulkRequest(
+        # Обмен номерами, переименование в освобожденный номер и номер удаляемого предмета
+        update=[{"id": a, "inventory_number": "N2"}, {"id": b, "inventory_number": "N1"},
+                {"id": c, "inventory_number": "N5"}],
+        create=[{"inventory_number": "N3", "name": "new", "category_id": category_id},
+                {"inventory_number": "N4", "name": "new", "category_id": category_id}],
+        delete=[d],
+    ))
+
+    assert result["errors"] == []
+    created = {row["index"]: row["id"] for row in result["created"]}
+    assert _numbers(db) == {a: "N2", b: "N1", c: "N5", created[0]: "N3", created[1]: "N4"}
+
+
+def test_rejected_rename_does_not_release_number(db, category_id):
+    a, b = _items(db, category_id, "N1", "N2")
+
+    result = apply_bulk_items(db, InventoryItemBulkRequest(
+        update=[{"id": a, "inventory_number": "N2"}],
+        create=[{"inventory_number": "N1", "name": "new", "category_id": category_id}],
+    ))
+
+    # N2 занят b, поэтому a остается N1, и создать N1 тоже нельзя
+    assert [(row["operation"], row["index"]) for row in result["errors"]] == [("create", 0), ("update", 0)]
+    assert _numbers(db) == {a: "N1", b: "N2"}
+
+
+def test_constraint_violation_names_the_row(db, category_id, monkeypatch):
+    _items(db, category_id, "N1")
+    # Номер занят параллельной транзакцией уже после проверки пакета
+    monkeypatch.setattr(InventoryItemRepository, "get_ids_by_numbers", lambda self, numbers: {})
+
+    result = apply_bulk_items(db, InventoryItemBulkRequest(create=[
+        {"inventory_number": "N2", "name": "new", "category_id": category_id},
+        {"inventory_number": "N1", "name": "new", "category_id": category_id},
+    ]))
+
+    assert [(row["operation"], row["index"]) for row in result["errors"]] == [("create", 1)]
+    assert [row["index"] for row in result["created"]] == [0]
+    assert sorted(_numbers(db).values()) == ["N1", "N2"]
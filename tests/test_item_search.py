@@ -0,0 +1,75 @@
+import asyncio
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from backend.core.async_repositories import AsyncInventoryItemRepository
+from backend.core.entities import InventoryCategory, InventoryItem, InventoryCondition, Room
+from backend.core.pagination import decode_cursor, encode_cursor
+from backend.core.schemas import InventoryItemSearch, ItemSortField, SortOrder, TotalMode
+
+ITEMS = 23
+PAGE = 4
+
+
+@pytest.fixture
+def seeded_url(engine, db):
+    rooms = [Room.create("Room A"), Room.create("Room B")]
+    category = InventoryCategory.create("Category", "CAT")
+    db.add_all(rooms + [category])
+    db.flush()
+    start = datetime(2025, 1, 1)
+    db.add_all(
+        # Повторы и NULL в ключах сортировки: страницы должны стыковаться и на них
+        InventoryItem.create(
+            f"INV-{i:03d}", f"Item {i % 5}", None, category.id, InventoryCondition.NORMAL,
+            room_id=rooms[i % 2].id if i % 3 else None,
+            purchase_date=start + timedelta(days=i % 4) if i % 6 else None,
+            purchase_price=Decimal(f"{i % 7}.50") if i % 4 else None,
+        )
+        for i in range(ITEMS)
+    )
+    db.commit()
+    return str(engine.url).replace("sqlite://", "sqlite+aiosqlite://")
+
+
+async def _search(url: str, **params) -> dict:
+    engine = create_async_engine(url)
+    try:
+        async with AsyncSession(engine) as db:
+            return await AsyncInventoryItemRepository(db).search(InventoryItemSearch(**params))
+    finally:
+        await engine.dispose()
+
+
+def _walk(url: str, **params) -> list:
+    ids, after = [], None
+    while True:
+        page = asyncio.run(_search(url, limit=PAGE, after=after, total=TotalMode.NONE, **params))
+        ids.extend(item.id for item in page["items"])
+        if page["next_cursor"] is None:
+            return ids
+        after = decode_cursor(page["next_cursor"])
+
+
+@pytest.mark.parametrize("order", list(SortOrder))
+@pytest.mark.parametrize("sort", [
+    ItemSortField.ID, ItemSortField.NAME, ItemSortField.ROOM_NAME,
+    ItemSortField.PURCHASE_DATE, ItemSortField.PURCHASE_PRICE,
+])
+def test_cursor_pages_match_single_query(seeded_url, sort, order):
+    full = asyncio.run(_search(seeded_url, sort=sort, order=order, limit=ITEMS + 1))
+
+    assert _walk(seeded_url, sort=sort, order=order) == [item.id for item in full["items"]]
+    assert full["total"] == ITEMS
+
+
+def test_cursor_from_another_sort_is_rejected(seeded_url):
+    cursor = asyncio.run(_search(seeded_url, sort=ItemSortField.ID, limit=PAGE))["next_cursor"]
+
+    with pytest.raises(ValueError):
+        asyncio.run(_search(seeded_url, sort=ItemSortField.PURCHASE_DATE, limit=PAGE, after=decode_cursor(cursor)))
+    with pytest.raises(ValueError):
+        asyncio.run(_search(seeded_url, sort=ItemSortField.NAME, limit=PAGE, after=decode_cursor(encode_cursor([1, 2]))))
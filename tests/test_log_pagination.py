@@ -0,0 +1,26 @@
+from datetime import datetime
+
+from pytz import timezone
+
+from backend.core.entities import Log, LogType
+from backend.core.repositories import LogRepository
+
+
+def test_log_pages_cover_every_row_once(db):
+    # Половина записей с одинаковым created_at: порядок внутри них задает id
+    moscow = timezone('Europe/Moscow')
+    moment = moscow.localize(datetime(2026, 1, 1))
+    logs = [Log.create(f"Event {i}", LogType.INFO.value) for i in range(25)]
+    for i, log in enumerate(logs):
+        log.created_at = moment if i % 2 else moscow.localize(datetime(2026, 1, 1, 0, i))
+    db.add_all(logs)
+    db.commit()
+
+    repository = LogRepository(db)
+    seen, before = [], None
+    while page := repository.get_page(before=before, limit=7):
+        seen.extend(log.id for log in page)
+        before = (page[-1].created_at, page[-1].id)
+
+    expected = sorted(logs, key=lambda log: (log.created_at, log.id), reverse=True)
+    assert seen == [log.id for log in expected]
@@ -0,0 +1,56 @@
+import asyncio
+import threading
+
+import pytest
+from sqlalchemy import insert, update
+
+from backend.core.entities import Room
+from backend.services import reference_cache as cache_module
+from backend.services.reference_cache import ROOMS, MemoryCache, ReferenceCache
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    cache = ReferenceCache(MemoryCache(max_entries=16), ttl=60)
+    monkeypatch.setattr(cache_module, "reference_cache", cache)
+    return cache
+
+
+def test_core_statements_invalidate_cache(db, cache):
+    db.execute(insert(Room).values(name="101"))
+    db.commit()
+    generation = cache.backend.generation(ROOMS)
+
+    db.execute(update(Room).where(Room.name == "101").values(name="102"))
+    db.commit()
+
+    assert cache.backend.generation(ROOMS) == generation + 1
+
+
+def test_rolled_back_statement_keeps_cache(db, cache):
+    db.execute(insert(Room).values(name="101"))
+    db.rollback()
+
+    assert cache.backend.generation(ROOMS) == 0
+
+
+def test_blocking_backend_runs_off_event_loop():
+    class RecordingCache(MemoryCache):
+        blocking = True
+        threads = set()
+
+        def get(self, key):
+            self.threads.add(threading.get_ident())
+            return super().get(key)
+
+    cache = ReferenceCache(RecordingCache(max_entries=16), ttl=60)
+
+    async def load():
+        return b"[]"
+
+    async def main():
+        assert await cache.get_or_load(ROOMS, "all", load) == b"[]"
+        return threading.get_ident()
+
+    loop_thread = asyncio.run(main())
+    assert RecordingCache.threads and loop_thread not in RecordingCache.threads
@@ -0,0 +1,66 @@
+import os
+import time
+
+import pytest
+
+from backend.core.schemas import ReportType
+from backend.services import report_jobs as report_jobs_module
+from backend.services.report_jobs import DONE, FAILED, ReportJobQueue
+
+
+def crash_once(report_type: str, params: dict, path: str) -> int:
+    # Первая попытка убивает процесс пула, повторная пишет файл
+    marker = f"{path}.crashed"
+    if not os.path.exists(marker):
+        open(marker, "w").close()
+        os._exit(1)
+    with open(path, "wb") as file:
+        file.write(b"report")
+    return os.path.getsize(path)
+
+
+def crash_always(report_type: str, params: dict, path: str) -> int:
+    os._exit(1)
+
+
+def _wait_finished(queue: ReportJobQueue, job_id: str, timeout: float = 60.0) -> dict:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = queue.get(job_id)
+        if job["status"] in (DONE, FAILED):
+            return job
+        time.sleep(0.1)
+    pytest.fail(f"Report job {job_id} is still {job['status']}")
+
+
+@pytest.fixture
+def queue(tmp_path):
+    job_queue = ReportJobQueue(path=str(tmp_path / "report_jobs"), workers=1)
+    yield job_queue
+    job_queue.stop()
+
+
+def test_same_request_of_different_users_shares_job(queue):
+    first = queue.submit(ReportType.INVENTORY_BY_CONDITION, "normal", user_id=1)
+    second = queue.submit(ReportType.INVENTORY_BY_CONDITION, "NORMAL", user_id=2)
+    other = queue.submit(ReportType.INVENTORY_BY_CONDITION, "written_off", user_id=2)
+
+    assert second["id"] == first["id"]
+    assert second["user_id"] == 1
+    assert other["id"] != first["id"]
+
+
+@pytest.mark.parametrize("generate, status", [(crash_once, DONE), (crash_always, FAILED)])
+def test_crashed_pool_is_recreated_and_job_requeued(queue, monkeypatch, generate, status):
+    monkeypatch.setattr(report_jobs_module, "generate_report_file", generate)
+    job = queue.submit(ReportType.INVENTORY_ITEMS)
+    queue.start()
+
+    finished = _wait_finished(queue, job["id"])
+
+    assert finished["status"] == status
+    assert queue.metrics()["running"] == 0
+    if status == DONE:
+        assert os.path.getsize(queue.file_path(job["id"])) == finished["size"]
+    else:
+        assert finished["detail"] == "Report worker process crashed"
@@ -0,0 +1,56 @@
+"""
+Каждый отчет читает данные одним запросом: имена связанных сущностей
+подтягиваются join'ом, а не отдельным запросом на каждую строку
+"""
+import io
+
+import pytest
+from sqlalchemy import event
+
+from backend.core.entities import (
+    User, Room, InventoryCategory, InventoryItem, Consumable, Log, LogType, InventoryCondition
+)
+from backend.core.schemas import ReportType
+from backend.services.report_stream import build_report, write_report
+
+ROWS = 20
+
+
+@pytest.fixture
+def seeded_db(db):
+    users = [User.create(f"user{i}", "hash", f"user{i}@example.com", f"User {i}", "0") for i in range(ROWS)]
+    rooms = [Room.create(f"Room {i}") for i in range(ROWS)]
+    categories = [InventoryCategory.create(f"Category {i}", f"C{i}") for i in range(ROWS)]
+    db.add_all(users + rooms + categories)
+    db.flush()
+    conditions = list(InventoryCondition)
+    db.add_all(
+        InventoryItem.create(f"INV-{i}", f"Item {i}", None, categories[i].id, conditions[i % len(conditions)],
+                             room_id=rooms[i].id, user_id=users[i].id)
+        for i in range(ROWS)
+    )
+    db.add_all(Consumable.create(f"Consumable {i}", quantity=i % 3, min_quantity=1) for i in range(ROWS))
+    db.add_all(Log.create(f"Event {i}", LogType.INFO.value, user_id=users[i].id) for i in range(ROWS))
+    db.commit()
+    return db
+
+
+@pytest.fixture
+def statements(engine):
+    executed = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        executed.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    yield executed
+    event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+@pytest.mark.parametrize("report_type", list(ReportType))
+def test_report_runs_one_query(seeded_db, statements, report_type):
+    condition = InventoryCondition.NORMAL.value if report_type == ReportType.INVENTORY_BY_CONDITION else None
+
+    write_report(build_report(seeded_db, report_type, condition), io.BytesIO())
+
+    assert len(statements) == 1, statements
@@ -0,0 +1,18 @@
+import io
+
+from openpyxl import load_workbook
+
+from backend.core.entities import InventoryCondition
+from backend.core.schemas import ReportType
+from backend.services.report_stream import SHEET_TITLE_MAX_LENGTH, build_report, write_report
+
+
+def test_long_sheet_title_is_clamped(db):
+    report = build_report(db, ReportType.INVENTORY_BY_CONDITION, InventoryCondition.REQUIRES_REPAIR.value.lower())
+    target = io.BytesIO()
+
+    write_report(report, target)
+
+    sheet_title, = load_workbook(target, read_only=True).sheetnames
+    assert len(sheet_title) == SHEET_TITLE_MAX_LENGTH
+    assert sheet_title == report.sheet_title